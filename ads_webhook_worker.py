@@ -0,0 +1,374 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlparse
+
+from ingest_service import load_secrets, percentile
+from kommo_fields import get_extractor, normalize_lead_id
+from pg_bulk import BulkWriter, connect_postgres
+
+
+TABLE_NAME = "Algonova_Calls_Raw"
+DEBOUNCE_SEC = 2.0
+MAX_DELAY_SEC = 10.0
+MAX_BATCH_LEADS = 1000
+TICK_SEC = 0.25
+LATENCY_WINDOW = 5000
+STATE_PATH = os.path.join(".cache", "ads_webhook_state.sqlite")
+WEBHOOK_EVENTS = ("add", "update", "status")
+
+_KEY_PART_RE = re.compile(r"\[([^\]]*)\]")
+
+
+def _nest(pairs):
+    # leads[update][0][custom_fields][1][values][0][value]=x -> nested dicts keyed by path segment.
+    root = {}
+    for key, value in pairs:
+        head = key.split("[", 1)[0]
+        parts = [head] + _KEY_PART_RE.findall(key[len(head):])
+        node = root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        node[parts[-1]] = value
+    return root
+
+
+def _as_list(node):
+    if isinstance(node, list):
+        return node
+    if isinstance(node, dict):
+        return [node[k] for k in sorted(node, key=lambda k: int(k) if str(k).isdigit() else 0)]
+    return []
+
+
+def _to_api_lead(hook_lead):
+    """Webhook lead (custom_fields with id/name/code/values) -> /api/v4/leads shape expected by FieldExtractor."""
+    custom_fields = []
+    for cf in _as_list(hook_lead.get("custom_fields")):
+        field_id = str(cf.get("id", ""))
+        custom_fields.append({
+            "field_id": int(field_id) if field_id.isdigit() else field_id,
+            "field_name": cf.get("name"),
+            "field_code": cf.get("code"),
+            "values": [
+                v if isinstance(v, dict) else {"value": v} for v in _as_list(cf.get("values"))
+            ],
+        })
+    updated_at = str(hook_lead.get("updated_at") or hook_lead.get("last_modified") or "")
+    return {
+        "id": hook_lead.get("id"),
+        "updated_at": int(updated_at) if updated_at.isdigit() else None,
+        "custom_fields_values": custom_fields,
+    }
+
+
+def parse_webhook(body, content_type=""):
+    """
+    Returns the leads carried by a Kommo webhook, in /api/v4/leads shape.
+    Kommo posts form-encoded `leads[update][0][...]`; a JSON body with the same nesting,
+    or a list-endpoint response / list of API leads (e.g. forwarded by n8n), is accepted too.
+    """
+    if "json" in content_type:
+        payload = json.loads(body)
+        if isinstance(payload, list):
+            return payload
+        if "_embedded" in payload:
+            return (payload.get("_embedded") or {}).get("leads") or []
+    else:
+        payload = _nest(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+    leads = payload.get("leads") or {}
+    return [_to_api_lead(lead) for event in WEBHOOK_EVENTS for lead in _as_list(leads.get(event))]
+
+
+class AdsState:
+    """Last ads values written per lead: drops out-of-order events and counts which fields actually changed."""
+
+    def __init__(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS lead_ads (lead_id TEXT PRIMARY KEY, updated_at INTEGER, fields TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, lead_ids):
+        found = {}
+        ids = list(lead_ids)
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            for lead_id, updated_at, fields in self.conn.execute(
+                f"SELECT lead_id, updated_at, fields FROM lead_ads WHERE lead_id IN ({placeholders})", chunk
+            ):
+                found[lead_id] = (updated_at, json.loads(fields))
+        return found
+
+    def put_many(self, items):
+        self.conn.executemany(
+            "INSERT INTO lead_ads (lead_id, updated_at, fields) VALUES (?, ?, ?) "
+            "ON CONFLICT(lead_id) DO UPDATE SET updated_at = excluded.updated_at, fields = excluded.fields",
+            [(lead_id, updated_at, json.dumps(fields)) for lead_id, (updated_at, fields) in items.items()],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class EnrichmentWorker:
+    """
+    Coalesces webhook events per lead and applies them in batches.
+    A lead is flushed once it has been quiet for `debounce` seconds (or pending for `max_delay`);
+    its ads fields are written to the call rows of that lead that do not hold them yet, with one UPDATE ... FROM per batch.
+    """
+
+    def __init__(self, db_cfg, table_name=TABLE_NAME, state_path=STATE_PATH, debounce=DEBOUNCE_SEC,
+                 max_delay=MAX_DELAY_SEC, max_batch=MAX_BATCH_LEADS):
+        self.db_cfg = db_cfg
+        self.table_name = table_name
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.extractor = get_extractor()
+        self.state = AdsState(state_path)
+        self.conn = None
+        self.lock = threading.Lock()
+        # lead_id -> {"updated_at", "fields", "first_seen", "last_seen"}
+        self.pending = {}
+        self.started = time.time()
+        self.counters = {
+            "events": 0,
+            "leads_received": 0,
+            "coalesced": 0,
+            "stale_skipped": 0,
+            "unchanged": 0,
+            "leads_updated": 0,
+            "fields_updated": 0,
+            "rows_updated": 0,
+            "batches": 0,
+            "errors": 0,
+        }
+        self.lag_ms = deque(maxlen=LATENCY_WINDOW)
+        self.flush_ms = deque(maxlen=LATENCY_WINDOW)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ads-enrichment", daemon=True)
+
+    def start(self):
+        self.conn = connect_postgres(self.db_cfg)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._flush(force=True)
+        self.state.close()
+        if self.conn is not None:
+            self.conn.close()
+
+    def submit(self, leads):
+        now = time.monotonic()
+        with self.lock:
+            self.counters["events"] += 1
+            for lead in leads:
+                lead_id = normalize_lead_id(lead.get("id"))
+                if not lead_id:
+                    continue
+                self.counters["leads_received"] += 1
+                fields = self.extractor.extract(lead)
+                updated_at = lead.get("updated_at")
+                entry = self.pending.get(lead_id)
+                if entry is None:
+                    self.pending[lead_id] = {
+                        "updated_at": updated_at, "fields": fields, "first_seen": now, "last_seen": now,
+                    }
+                    continue
+                self.counters["coalesced"] += 1
+                entry["last_seen"] = now
+                if updated_at is not None and entry["updated_at"] is not None and updated_at < entry["updated_at"]:
+                    # Kommo does not guarantee delivery order; an older snapshot must not win.
+                    self.counters["stale_skipped"] += 1
+                    continue
+                entry["updated_at"] = updated_at
+                entry["fields"] = fields
+
+    def _ready(self, force):
+        now = time.monotonic()
+        with self.lock:
+            ready = [
+                lead_id for lead_id, e in self.pending.items()
+                if force or now - e["last_seen"] >= self.debounce or now - e["first_seen"] >= self.max_delay
+            ]
+            ready.sort(key=lambda lead_id: self.pending[lead_id]["first_seen"])
+            return {lead_id: self.pending.pop(lead_id) for lead_id in ready[:None if force else self.max_batch]}
+
+    def _run(self):
+        while not self._stop.wait(TICK_SEC):
+            self._flush()
+
+    def _flush(self, force=False):
+        batch = self._ready(force)
+        if not batch:
+            return
+        started = time.monotonic()
+        known = self.state.get_many(batch)
+        # Every lead re-sends its known values: call rows inserted after the last write for the lead still
+        # have NULL ads columns, and only_changed limits the UPDATE to rows that actually differ.
+        writer = BulkWriter(self.conn, self.table_name, batch_size=len(batch) + 1, only_changed=True)
+        new_state = {}
+        changed_fields = stale = unchanged = 0
+        for lead_id, entry in batch.items():
+            prev_updated_at, prev_fields = known.get(lead_id, (None, {}))
+            if entry["updated_at"] is not None and prev_updated_at is not None and entry["updated_at"] < prev_updated_at:
+                stale += 1
+                continue
+            # BulkWriter keeps the stored value for NULLs, so a cleared Kommo field is not propagated.
+            fields = {col: value for col, value in entry["fields"].items() if value is not None}
+            if not fields:
+                unchanged += 1
+                continue
+            changed = sum(prev_fields.get(col) != value for col, value in fields.items())
+            if not changed:
+                unchanged += 1
+            writer.add("lead_id", lead_id, fields)
+            new_state[lead_id] = (entry["updated_at"], {**prev_fields, **fields})
+            changed_fields += changed
+        with self.lock:
+            self.counters["stale_skipped"] += stale
+            self.counters["unchanged"] += unchanged
+        if not new_state:
+            return
+        try:
+            if self.conn is None or self.conn.closed:
+                self.conn = writer.conn = connect_postgres(self.db_cfg)
+            rows = writer.flush()
+        except Exception as e:
+            with self.lock:
+                self.counters["errors"] += 1
+            print(f"  ❌ Failed to update {len(new_state)} leads: {e}")
+            self.conn = None
+            self._requeue({lead_id: batch[lead_id] for lead_id in new_state})
+            return
+        self.state.put_many(new_state)
+        done = time.monotonic()
+        with self.lock:
+            self.counters["batches"] += 1
+            self.counters["leads_updated"] += len(new_state)
+            self.counters["fields_updated"] += changed_fields
+            self.counters["rows_updated"] += rows
+            self.flush_ms.append((done - started) * 1000)
+            self.lag_ms.extend((done - batch[lead_id]["first_seen"]) * 1000 for lead_id in new_state)
+
+    def _requeue(self, entries):
+        # Retry after the next debounce window unless a newer event for the lead has arrived meanwhile.
+        now = time.monotonic()
+        with self.lock:
+            for lead_id, entry in entries.items():
+                if lead_id not in self.pending:
+                    self.pending[lead_id] = {**entry, "first_seen": now, "last_seen": now}
+
+    def snapshot(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                **self.counters,
+                "pending_leads": len(self.pending),
+                "flush_ms_p50": percentile(self.flush_ms, 0.5),
+                "flush_ms_p95": percentile(self.flush_ms, 0.95),
+                "lag_ms_p50": percentile(self.lag_ms, 0.5),
+                "lag_ms_p95": percentile(self.lag_ms, 0.95),
+                "uptime_sec": round(uptime, 1),
+            }
+
+
+def make_handler(worker, token=None):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self, query):
+            # Kommo cannot send headers, so the token may also be part of the webhook URL.
+            return (
+                not token
+                or self.headers.get("Authorization") == f"Bearer {token}"
+                or (query.get("token") or [None])[0] == token
+            )
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/healthz":
+                return self._send(200, {"ok": True})
+            if path == "/metrics":
+                return self._send(200, worker.snapshot())
+            return self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            if parsed.path != "/kommo/leads":
+                return self._send(404, {"error": "not found"})
+            if not self._authorized(parse_qs(parsed.query)):
+                return self._send(401, {"error": "unauthorized"})
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                leads = parse_webhook(self.rfile.read(length), self.headers.get("Content-Type") or "")
+            except (ValueError, AttributeError) as e:
+                return self._send(400, {"error": f"unreadable webhook: {e}"})
+            # Kommo disables hooks that answer slowly, so only queue here; the worker thread does the writes.
+            worker.submit(leads)
+            return self._send(200, {"leads": len(leads)})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply Kommo lead-update webhooks to the ads columns of call rows.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--table", default=TABLE_NAME)
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SEC, help="Quiet seconds before a lead is written")
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY_SEC, help="Upper bound on coalescing")
+    parser.add_argument("--state-path", default=STATE_PATH)
+    args = parser.parse_args()
+
+    secrets = load_secrets()
+    if not secrets or "database" not in secrets:
+        print("❌ [database] section missing in secrets.toml")
+        return
+    token = os.getenv("INGEST_TOKEN") or (secrets.get("ingest") or {}).get("token")
+
+    worker = EnrichmentWorker(
+        secrets["database"], args.table, args.state_path, args.debounce, args.max_delay
+    ).start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(worker, token))
+    server.daemon_threads = True
+    print(f"✅ Kommo webhook worker on {args.host}:{args.port}/kommo/leads -> '{args.table}'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Flushing pending leads...")
+        worker.stop()
+        print(json.dumps(worker.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
-﻿import streamlit as st
+﻿import os
+import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 import database as db
+import local_engine
+import profiling
+import tracing
 
 from app_i18n import LANGUAGES, get_lang, market_label, pipeline_label, set_lang, t
 from styles import get_css
 from views.ceo_view import render_ceo_dashboard
 from views.cmo_view import render_cmo_analytics
 from views.cso_view import render_cso_dashboard
+from views.dev_panel import render_dev_panel
 from views.lab_view import render_data_lab
 
 if not hasattr(db, "rpc_df"):
@@ -29,6 +34,7 @@ if not hasattr(db, "rpc_df"):
 
 fetch_view_data = getattr(db, "fetch_view_data", None)
 ensure_chart_views = getattr(db, "ensure_chart_views", lambda: False)
+start_perf_rerun = getattr(db, "start_perf_rerun", lambda: None)
 rpc_df = db.rpc_df
 rpc_df_long = getattr(db, "rpc_df_long", db.rpc_df)
 
@@ -106,6 +112,38 @@ def set_page(page_name):
     st.session_state.page = page_name
 
 
+def _profiling_requested() -> bool:
+    """?profile=1, or ?profile=<token> when profile_token is set in secrets."""
+    try:
+        value = str(st.query_params.get("profile", "") or "").strip()
+    except Exception:
+        return False
+    if not value:
+        return False
+    try:
+        token = st.secrets.get("profile_token")
+    except Exception:
+        token = None
+    return value == str(token) if token else value == "1"
+
+
+def _render_profile_reports():
+    st.sidebar.markdown(f"### {t('sidebar.profiler')}")
+    st.sidebar.caption(t("sidebar.profiler_note"))
+    reports = profiling.list_reports()[:5]
+    if not reports:
+        st.sidebar.caption(t("sidebar.profiler_empty"))
+    for path in reports:
+        name = os.path.basename(path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        st.sidebar.download_button(name, data, file_name=name, mime="text/html", key=f"profile_dl_{name}", use_container_width=True)
+
+
+@tracing.traced()
 def render_sidebar():
     def _render_sections(section_items: list[tuple[str, str]]):
         links_html = "\n".join([f'<a class="sidebar-section-link" href="#{anchor}">{label}</a>' for label, anchor in section_items])
@@ -217,6 +255,7 @@ def render_sidebar():
     if st.sidebar.button(t("sidebar.reset_filters"), use_container_width=True):
         st.cache_data.clear()
         st.cache_resource.clear()
+        db.reset_rpc_state()
         keys = list(st.session_state.keys())
         for k in keys:
             if (
@@ -307,6 +346,7 @@ def render_sidebar():
             df_raw_filters = fetch_view_data("Algonova_Calls_Raw")
             if df_raw_filters.empty:
                 return [], {}, []
+            local_engine.ensure_snapshot("Algonova_Calls_Raw", df_raw_filters)
             if "market" not in df_raw_filters.columns and "pipeline_name" in df_raw_filters.columns:
                 df_raw_filters = df_raw_filters.copy()
                 df_raw_filters["market"] = df_raw_filters["pipeline_name"].apply(_determine_market)
@@ -384,6 +424,11 @@ def render_sidebar():
     )
     st.sidebar.caption(t("sidebar.managers_note"))
 
+    st.sidebar.markdown("---")
+    st.sidebar.checkbox(t("sidebar.dev_panel"), key="dev_panel_v1", help=t("sidebar.dev_panel_help"))
+    if st.session_state.get("profile_active_v1"):
+        _render_profile_reports()
+
     date_start = date_range[0] if len(date_range) == 2 else None
     date_end = date_range[1] if len(date_range) == 2 else None
     summary_params = {
@@ -410,21 +455,33 @@ def render_sidebar():
 
 # --- 3. MAIN ROUTER ---
 def main():
-    ensure_chart_views()
-    date_range, selected_markets, selected_pipelines, selected_managers = render_sidebar()
+    with tracing.trace("main") as root:
+        start_perf_rerun()
+        ensure_chart_views()
+        date_range, selected_markets, selected_pipelines, selected_managers = render_sidebar()
+
+        page = st.session_state.page
+        root.set_attribute("app.page", page)
+        root.set_attribute("app.lang", get_lang())
 
-    page = st.session_state.page
+        if page == "CEO":
+            render_ceo_dashboard(date_range, selected_markets, selected_pipelines)
+        elif page == "CMO":
+            render_cmo_analytics(date_range, selected_markets, selected_pipelines)
+        elif page == "CSO":
+            render_cso_dashboard(date_range, selected_markets, selected_pipelines, selected_managers)
+        elif page == "LAB":
+            render_data_lab()
 
-    if page == "CEO":
-        render_ceo_dashboard(date_range, selected_markets, selected_pipelines)
-    elif page == "CMO":
-        render_cmo_analytics(date_range, selected_markets, selected_pipelines)
-    elif page == "CSO":
-        render_cso_dashboard(date_range, selected_markets, selected_pipelines, selected_managers)
-    elif page == "LAB":
-        render_data_lab()
+        if st.session_state.get("dev_panel_v1"):
+            render_dev_panel()
 
 
 if __name__ == "__main__":
-    main()
+    st.session_state["profile_active_v1"] = _profiling_requested()
+    if st.session_state["profile_active_v1"]:
+        with profiling.capture(st.session_state.page):
+            main()
+    else:
+        main()
 
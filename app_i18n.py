@@ -53,6 +53,11 @@ TRANSLATIONS = {
         "sidebar.nav.cmo": "CMO",
         "sidebar.nav.cso": "CSO",
         "sidebar.nav.lab": "Data Lab",
+        "sidebar.dev_panel": "Developer panel",
+        "sidebar.dev_panel_help": "Show data call timings and cache hits below the page.",
+        "sidebar.profiler": "Profiler",
+        "sidebar.profiler_note": "Profiling is on for this session. Every rerun saves a report; the latest ones are listed here from the next rerun on.",
+        "sidebar.profiler_empty": "No reports saved yet.",
         "section.operations_feed": "Operations Metrics",
         "section.manager_timeline": "Manager Productivity",
         "section.call_control": "Conversation Control",
@@ -228,7 +233,37 @@ TRANSLATIONS = {
         "lab.pygwalker_missing": "Pygwalker is not installed. Please install it to use Data Lab.",
         "lab.description": "Explore raw data visually.",
         "lab.no_data": "No data to explore.",
+        "dev.title": "Developer Panel: Data Calls",
+        "dev.waterfall": "This Rerun",
+        "dev.waterfall_caption": "{calls} calls, {hits} from cache, {ms} ms in data calls.",
+        "dev.no_calls": "No data calls in this rerun.",
+        "dev.axis_ms": "ms since rerun start",
+        "dev.aggregates": "All Calls Since Process Start",
+        "dev.no_stats": "No data calls recorded yet.",
+        "dev.reset_stats": "Reset statistics",
+        "dev.col.function": "Function",
+        "dev.col.name": "View / RPC / Query",
+        "dev.col.cache": "Cache",
+        "dev.col.duration_ms": "Duration (ms)",
+        "dev.col.rows": "Rows",
+        "dev.col.bytes": "Bytes",
+        "dev.col.params": "Params",
+        "dev.col.calls": "Calls",
+        "dev.col.hit_rate": "Cache hits",
+        "dev.col.errors": "Errors",
+        "dev.col.p50_ms": "p50 (ms)",
+        "dev.col.p95_ms": "p95 (ms)",
+        "dev.col.total_ms": "Total (ms)",
+        "dev.col.avg_rows": "Avg rows",
+        "dev.col.avg_bytes": "Avg bytes",
+        "dev.breakers": "RPC Circuit Breakers",
+        "dev.col.state": "State",
+        "dev.col.failures": "Failures in a row",
+        "dev.col.retry_in_sec": "Probe in (s)",
+        "dev.col.short_circuited": "Short-circuited",
+        "dev.col.last_error": "Last error",
         "db.supabase_secrets_missing": "Supabase secrets not found. Add [supabase] with url/key in Streamlit Secrets, or add SUPABASE_URL and SUPABASE_KEY.",
+        "db.view_partial": "Only part of {view} was loaded: {loaded} of {total} rows ({reason}). Figures may be incomplete.",
     },
     "ru": {
         "app.page_title": "Аналитика разговоров",
@@ -258,6 +293,11 @@ TRANSLATIONS = {
         "sidebar.nav.cmo": "Маркетолог",
         "sidebar.nav.cso": "РОП",
         "sidebar.nav.lab": "Data Lab",
+        "sidebar.dev_panel": "Панель разработчика",
+        "sidebar.dev_panel_help": "Показать время запросов к данным и попадания в кэш под страницей.",
+        "sidebar.profiler": "Профилировщик",
+        "sidebar.profiler_note": "Профилирование включено для этой сессии. Каждый перезапуск сохраняет отчет; последние отчеты появляются здесь со следующего перезапуска.",
+        "sidebar.profiler_empty": "Отчетов пока нет.",
         "section.operations_feed": "Операционная статистика",
         "section.manager_timeline": "Продуктивность менеджеров",
         "section.call_control": "Контроль разговора",
@@ -433,7 +473,37 @@ TRANSLATIONS = {
         "lab.pygwalker_missing": "Pygwalker не установлен. Установите его для использования Data Lab.",
         "lab.description": "Визуальное исследование сырых данных.",
         "lab.no_data": "Нет данных для исследования.",
+        "dev.title": "Панель разработчика: запросы к данным",
+        "dev.waterfall": "Текущий перезапуск",
+        "dev.waterfall_caption": "{calls} вызовов, {hits} из кэша, {ms} мс в запросах к данным.",
+        "dev.no_calls": "В этом перезапуске не было запросов к данным.",
+        "dev.axis_ms": "мс от начала перезапуска",
+        "dev.aggregates": "Все вызовы с запуска процесса",
+        "dev.no_stats": "Запросы к данным еще не записаны.",
+        "dev.reset_stats": "Сбросить статистику",
+        "dev.col.function": "Функция",
+        "dev.col.name": "Представление / RPC / запрос",
+        "dev.col.cache": "Кэш",
+        "dev.col.duration_ms": "Длительность (мс)",
+        "dev.col.rows": "Строки",
+        "dev.col.bytes": "Байты",
+        "dev.col.params": "Параметры",
+        "dev.col.calls": "Вызовы",
+        "dev.col.hit_rate": "Из кэша",
+        "dev.col.errors": "Ошибки",
+        "dev.col.p50_ms": "p50 (мс)",
+        "dev.col.p95_ms": "p95 (мс)",
+        "dev.col.total_ms": "Всего (мс)",
+        "dev.col.avg_rows": "Сред. строк",
+        "dev.col.avg_bytes": "Сред. байт",
+        "dev.breakers": "Предохранители RPC",
+        "dev.col.state": "Состояние",
+        "dev.col.failures": "Ошибок подряд",
+        "dev.col.retry_in_sec": "Проверка через (с)",
+        "dev.col.short_circuited": "Отклонено без запроса",
+        "dev.col.last_error": "Последняя ошибка",
         "db.supabase_secrets_missing": "Секреты Supabase не найдены. Добавьте [supabase] с url/key в Streamlit Secrets либо ключи SUPABASE_URL и SUPABASE_KEY.",
+        "db.view_partial": "Загружена только часть {view}: {loaded} из {total} строк ({reason}). Данные могут быть неполными.",
     },
 }
 
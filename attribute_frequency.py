@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+
+FREQUENCY_COLUMNS = ["pipeline_name", "attr_value", "calls_with_attr", "mentions", "total_calls", "frequency"]
+
+
+def _factorize_clean(values, normalize=None) -> tuple[np.ndarray, np.ndarray]:
+    """Factorizes raw values, then strips/normalizes only the distinct ones.
+
+    Missing values fold into "" so every row gets a valid code.
+    """
+    raw_codes, raw_uniques = pd.factorize(pd.Series(values, copy=False))
+    cleaned = pd.Series(np.append(np.asarray(raw_uniques, dtype=object), ""), dtype=object).astype(str).str.strip()
+    if normalize is not None:
+        cleaned = normalize(cleaned)
+    codes, uniques = pd.factorize(cleaned.to_numpy(dtype=object))
+    raw_codes = np.where(raw_codes >= 0, raw_codes, len(raw_uniques))
+    return codes[raw_codes].astype(np.int64), np.asarray(uniques, dtype=object)
+
+
+def _normalize_call_id(s: pd.Series) -> pd.Series:
+    s = s.str.replace(r"[{}]", "", regex=True)
+    return s.str.replace(r"^[\"']+|[\"']+$", "", regex=True)
+
+
+def normalize_call_ids(*columns) -> list[np.ndarray]:
+    """Maps raw call id columns to shared int64 surrogate keys; -1 marks a missing or empty id.
+
+    The regex normalization runs once per distinct raw id instead of once per row.
+    """
+    lengths = [len(c) for c in columns]
+    raw = pd.concat([pd.Series(c, copy=False).reset_index(drop=True) for c in columns], ignore_index=True)
+    keys, uniques = _factorize_clean(raw, _normalize_call_id)
+    keys[(uniques == "")[keys]] = -1
+    return np.split(keys, np.cumsum(lengths)[:-1])
+
+
+def _call_days(df_calls: pd.DataFrame) -> np.ndarray:
+    if "call_datetime" in df_calls.columns:
+        ts = pd.to_datetime(df_calls["call_datetime"], errors="coerce", utc=True).dt.tz_localize(None)
+    elif "date" in df_calls.columns:
+        ts = pd.to_datetime(df_calls["date"], errors="coerce")
+    else:
+        return np.full(len(df_calls), np.datetime64("NaT"), dtype="datetime64[D]")
+    return ts.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+def _isin_codes(codes: np.ndarray, uniques, allowed) -> np.ndarray:
+    """Membership test evaluated once per category and broadcast through the codes."""
+    return np.asarray(pd.Index(uniques).isin(list(allowed)))[codes]
+
+
+def _expand_join(left_keys: np.ndarray, right_keys: np.ndarray, n_keys: int) -> tuple[np.ndarray, np.ndarray]:
+    """Inner many-to-many join on dense int keys; returns (left_idx, right_idx) row pairs."""
+    order = np.argsort(left_keys, kind="stable")
+    per_key = np.bincount(left_keys, minlength=n_keys)
+    starts = np.cumsum(per_key) - per_key
+    lo = starts[right_keys]
+    counts = per_key[right_keys]
+    total = int(counts.sum())
+    right_idx = np.repeat(np.arange(len(right_keys)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    left_idx = order[np.repeat(lo, counts) + offsets]
+    return left_idx, right_idx
+
+
+def compute_attribute_frequency(
+    df_calls: pd.DataFrame,
+    df_attrs: pd.DataFrame,
+    attr_type: str,
+    date_range=None,
+    selected_markets=None,
+    selected_pipelines=None,
+) -> pd.DataFrame:
+    if df_calls is None or df_calls.empty or not {"call_id", "pipeline_name"}.issubset(df_calls.columns):
+        return pd.DataFrame()
+    if df_attrs is None or df_attrs.empty or not {"call_id", "attr_type", "attr_value"}.issubset(df_attrs.columns):
+        return pd.DataFrame()
+
+    call_keys, attr_keys = normalize_call_ids(df_calls["call_id"], df_attrs["call_id"])
+    n_keys = int(max(call_keys.max(initial=-1), attr_keys.max(initial=-1))) + 1
+    if n_keys == 0:
+        return pd.DataFrame()
+
+    # Calls side: categorical codes for pipeline/market, one boolean mask for every filter.
+    pipe_codes, pipe_uniques = _factorize_clean(df_calls["pipeline_name"])
+    keep = call_keys >= 0
+    if date_range and len(date_range) == 2:
+        days = _call_days(df_calls)
+        keep &= (days >= np.datetime64(date_range[0], "D")) & (days <= np.datetime64(date_range[1], "D"))
+    if selected_pipelines:
+        keep &= _isin_codes(pipe_codes, pipe_uniques, selected_pipelines)
+    if selected_markets:
+        market = df_calls["market"] if "market" in df_calls.columns else np.full(len(df_calls), "", dtype=object)
+        m_codes, m_uniques = _factorize_clean(market)
+        pipe_prefix = pd.Index(pipe_uniques).str.split("|").str[0].str.split(" ").str[0].str.strip()
+        market_ok = np.where(
+            (m_uniques != "")[m_codes],
+            _isin_codes(m_codes, m_uniques, selected_markets),
+            _isin_codes(pipe_codes, pipe_prefix, selected_markets),
+        )
+        keep &= market_ok
+    if not keep.any():
+        return pd.DataFrame()
+    ck = call_keys[keep]
+    cp = pipe_codes[keep]
+
+    # Attribute side.
+    type_codes, type_uniques = _factorize_clean(df_attrs["attr_type"], lambda s: s.str.lower())
+    value_codes, value_uniques = _factorize_clean(df_attrs["attr_value"])
+    value_empty = value_uniques == ""
+    attr_keep = (
+        _isin_codes(type_codes, type_uniques, [str(attr_type).lower()])
+        & ~value_empty[value_codes]
+        & (attr_keys >= 0)
+    )
+    if not attr_keep.any():
+        return pd.DataFrame()
+    ak = attr_keys[attr_keep]
+    av = value_codes[attr_keep]
+
+    ci, ai = _expand_join(ck, ak, n_keys)
+    if selected_markets and "market" in df_attrs.columns and len(ai):
+        a_codes, a_uniques = _factorize_clean(df_attrs["market"][attr_keep])
+        a_nonempty = (a_uniques != "")[a_codes]
+        a_ok = _isin_codes(a_codes, a_uniques, selected_markets)
+        joined_ok = np.where(a_nonempty[ai], a_ok[ai], True)
+        ci, ai = ci[joined_ok], ai[joined_ok]
+    if len(ci) == 0:
+        return pd.DataFrame()
+
+    n_vals = len(value_uniques)
+    group = cp[ci] * n_vals + av[ai]
+    group_ids, group_inv = np.unique(group, return_inverse=True)
+    mentions = np.bincount(group_inv)
+    distinct_pairs = np.unique(group_inv.astype(np.int64) * n_keys + ck[ci])
+    calls_with_attr = np.bincount(distinct_pairs // n_keys, minlength=len(group_ids))
+
+    pipe_pairs = np.unique(cp * n_keys + ck)
+    totals_by_pipe = np.bincount(pipe_pairs // n_keys, minlength=len(pipe_uniques))
+
+    group_pipe = group_ids // n_vals
+    total_calls = totals_by_pipe[group_pipe]
+    return pd.DataFrame(
+        {
+            "pipeline_name": pipe_uniques[group_pipe],
+            "attr_value": value_uniques[group_ids % n_vals],
+            "calls_with_attr": calls_with_attr,
+            "mentions": mentions,
+            "total_calls": total_calls,
+            "frequency": np.divide(calls_with_attr, total_calls, out=np.zeros(len(group_ids)), where=total_calls > 0),
+        },
+        columns=FREQUENCY_COLUMNS,
+    )
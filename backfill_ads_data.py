@@ -1,8 +1,14 @@
 import os
+import argparse
+import asyncio
 import toml
-import requests
 import time
+import json
+import sqlite3
+import httpx
 from supabase import create_client
+from kommo_fields import get_extractor, normalize_lead_id
+from pg_bulk import BulkWriter, connect_postgres
 
 def load_secrets():
     secrets_path = os.path.join(".streamlit", "secrets.toml")
@@ -13,83 +19,413 @@ def load_secrets():
         print(f"❌ Could not find secrets file at {secrets_path}")
         return None
 
-def get_kommo_lead(lead_id, auth_headers, base_url):
+def _kommo_origin(base_url):
+    # A bare domain means the real account over https; a full URL (e.g. a local fake server) is used as is.
+    return base_url.rstrip("/") if "://" in base_url else f"https://{base_url}"
+
+KOMMO_LEADS_BATCH = 250
+# Kommo allows 7 requests/sec per integration; stay just under it.
+KOMMO_RPS = 6.5
+KOMMO_CONCURRENCY = 4
+KOMMO_MAX_RETRIES = 6
+WRITE_CONCURRENCY = 8
+QUEUE_SIZE = 16
+
+class TokenBucket:
+    """
+    Async token bucket. On 429 the rate is halved and the bucket paused
+    (Retry-After or exponential); it recovers additively on successes.
+    """
+    def __init__(self, rate, capacity=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def throttle(self, retry_after, attempt):
+        self.rate = max(0.5, self.rate / 2)
+        delay = retry_after if retry_after is not None else min(30.0, 2 ** attempt)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.tokens = 0.0
+
+    def recover(self):
+        self.rate = min(self.max_rate, self.rate + 0.25)
+
+def _retry_after(response):
     try:
-        # Note: 'with=custom_fields' is often default or needed depending on version
-        url = f"https://{base_url}/api/v4/leads/{lead_id}?with=custom_fields"
-        response = requests.get(url, headers=auth_headers)
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 204:
-            # 204 No Content = Lead not found or no access
-            return None
-        else:
-            print(f"  ❌ Error fetching lead {lead_id}: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"  ❌ Exception fetching lead {lead_id}: {e}")
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
         return None
 
+LEAD_CACHE_PATH = os.path.join(".cache", "kommo_leads.sqlite")
+CACHE_CLOCK_SKEW_SEC = 300
+
+class LeadCache:
+    """
+    SQLite cache of Kommo lead payloads keyed by lead id.
+    A lead whose Kommo updated_at matches the cached one does not need to be downloaded again.
+    """
+    def __init__(self, path=LEAD_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS kommo_leads ("
+            "lead_id TEXT PRIMARY KEY, updated_at INTEGER, payload TEXT NOT NULL, fetched_at INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+        # Lead ids fetched or verified against Kommo during this run.
+        self.checked = set()
+
+    def lookup(self, lead_ids):
+        """Returns {lead_id: (updated_at, fetched_at)} for the cached ids."""
+        found = {}
+        ids = list(lead_ids)
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            for lead_id, updated_at, fetched_at in self.conn.execute(
+                f"SELECT lead_id, updated_at, fetched_at FROM kommo_leads WHERE lead_id IN ({placeholders})", chunk
+            ):
+                found[lead_id] = (updated_at, fetched_at)
+        return found
+
+    def payloads(self, lead_ids):
+        ids = list(lead_ids)
+        leads = []
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            leads += [json.loads(p) for (p,) in self.conn.execute(
+                f"SELECT payload FROM kommo_leads WHERE lead_id IN ({placeholders})", chunk
+            )]
+        return leads
+
+    def put_many(self, leads):
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT INTO kommo_leads (lead_id, updated_at, payload, fetched_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(lead_id) DO UPDATE SET updated_at = excluded.updated_at, "
+            "payload = excluded.payload, fetched_at = excluded.fetched_at",
+            [(normalize_lead_id(lead.get("id")), lead.get("updated_at"), json.dumps(lead), now) for lead in leads],
+        )
+        self.conn.commit()
+
+    def forget(self, lead_ids):
+        self.checked.difference_update(lead_ids)
+        self.conn.executemany("DELETE FROM kommo_leads WHERE lead_id = ?", [(k,) for k in lead_ids])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+async def fetch_leads_batch(client, bucket, base_url, batch, stats, since=None):
+    """
+    Fetches one filter[id][] batch via the list endpoint, following pages.
+    `since` narrows it to leads updated at or after that timestamp.
+    Returns (lead payloads, ok); ok is False when Kommo could not be read to the end (retries exhausted,
+    network error or an unexpected status), in which case the failure is counted in stats["errors"].
+    """
+    url = f"{_kommo_origin(base_url)}/api/v4/leads"
+    leads = []
+    page = 1
+    attempt = 0
+    while True:
+        params = [("with", "custom_fields"), ("limit", len(batch)), ("page", page)]
+        params += [("filter[id][]", lead_id) for lead_id in batch]
+        if since is not None:
+            params.append(("filter[updated_at][from]", since))
+        await bucket.acquire()
+        try:
+            response = await client.get(url, params=params)
+            stats["requests"] += 1
+        except httpx.HTTPError as e:
+            attempt += 1
+            if attempt > KOMMO_MAX_RETRIES:
+                print(f"  ❌ Exception fetching leads batch {batch[0]}..: {e}")
+                stats["errors"] += 1
+                return leads, False
+            await asyncio.sleep(min(30.0, 2 ** attempt))
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            attempt += 1
+            stats["throttled"] += response.status_code == 429
+            if attempt > KOMMO_MAX_RETRIES:
+                print(f"  ❌ Giving up on leads batch {batch[0]}..: {response.status_code}")
+                stats["errors"] += 1
+                return leads, False
+            bucket.throttle(_retry_after(response), attempt)
+            continue
+        attempt = 0
+        bucket.recover()
+        if response.status_code == 204:
+            return leads, True
+        if response.status_code != 200:
+            print(f"  ❌ Error fetching leads batch {batch[0]}..: {response.status_code}")
+            stats["errors"] += 1
+            return leads, False
+        payload = response.json()
+        leads.extend((payload.get("_embedded") or {}).get("leads") or [])
+        if not (payload.get("_links") or {}).get("next"):
+            return leads, True
+        page += 1
+
 def map_kommo_fields(lead_data):
     """
     Extracts ads fields from Kommo lead data and maps to Supabase columns.
     """
-    if not lead_data or 'custom_fields_values' not in lead_data:
-        return {}
-
-    # Map Supabase Column -> Kommo Field Name (or Code)
-    mapping = {
-        "campaign_id": ["Campaign ID"],
-        "campaign_name": ["Campaign name"],
-        "ad_group_id": ["AD group ID"],
-        "ad_group_name": ["AD group name"],
-        "ad_id": ["AD ID"],
-        "ad_name": ["AD name"],
-        "form_id_custom": ["Form ID"],
-        "form_id": ["form_id"],
-        "form_name": ["Form name"],
-        "utm_medium": ["utm_medium", "UTM_MEDIUM"],
-        "utm_term": ["utm_term", "UTM_TERM"],
-        "utm_content": ["utm_content", "UTM_CONTENT"],
-        "utm_campaign": ["utm_campaign", "UTM_CAMPAIGN"],
-        "utm_source": ["utm_source", "UTM_SOURCE"],
-        "tran_id": ["tran_id"],
-        "referer": ["Referer"],
-        "input_val": ["INPUT"],
-        "formname": ["FORMNAME"],
-        "group_id": ["group_id"],
-        "utm_underscore": ["UTM_"],
-        "google_client_id": ["google_client_id"],
-        "client_id": ["CLIENT_ID"],
-        "date_val": ["DATE"]
-    }
+    return get_extractor().extract(lead_data)
 
-    updates = {}
-    custom_fields = lead_data['custom_fields_values']
-    
-    # Create a lookup dict for custom fields by Name and Code
-    cf_lookup = {}
-    if custom_fields:
-        for cf in custom_fields:
-            name = cf.get('field_name')
-            code = cf.get('field_code')
-            values = cf.get('values', [])
-            val = values[0].get('value') if values else None
-            
-            if name: cf_lookup[name] = val
-            if code: cf_lookup[code] = val
-        
-    # Apply mapping
-    for sb_col, kommo_keys in mapping.items():
-        for key in kommo_keys:
-            if key in cf_lookup:
-                updates[sb_col] = cf_lookup[key]
-                break 
-    
-    return updates
+def _row_key(row, link_col):
+    # Use call_id if id is not present, as user stated call_id is unique
+    if row.get('call_id'):
+        return 'call_id', row.get('call_id')
+    if row.get('id'):
+        return 'id', row.get('id')
+    # Fallback if no PK
+    return link_col, row.get(link_col)
+
+def _write_row(supabase, table_name, link_col, row, updates):
+    key_col, key = _row_key(row, link_col)
+    supabase.table(table_name).update(updates).eq(key_col, key).execute()
+
+async def run_backfill_pipeline(rows, link_col, kommo_headers, kommo_domain, supabase, table_name,
+                                rps=KOMMO_RPS, concurrency=KOMMO_CONCURRENCY, write_concurrency=WRITE_CONCURRENCY,
+                                bulk_writer=None, cache=None):
+    """
+    fetch -> map -> write, connected by bounded queues.
+    Fetch workers share one token bucket, so throughput is capped by the Kommo quota.
+    With a BulkWriter a single write task flushes batches; otherwise rows are updated one by one via PostgREST.
+    With a LeadCache, cached leads are only refetched if updated since; unchanged ones are mapped from the
+    cached payload, and a lead is requested at most once per run even across pages.
+    """
+    rows_by_lead = {}
+    for row in rows:
+        key = normalize_lead_id(row.get(link_col))
+        if key:
+            rows_by_lead.setdefault(key, []).append(row)
+    lead_ids = list(rows_by_lead)
+    cache_state = cache.lookup(lead_ids) if cache is not None else {}
+    cached = {k: updated_at for k, (updated_at, _) in cache_state.items()}
+    stats = {"leads": len(lead_ids), "cached": len(cached), "requests": 0, "throttled": 0, "fetched": 0,
+             "refreshed": 0, "reused": 0, "unverified": 0, "updated": 0, "errors": 0}
+    seen = set()
+
+    batch_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    lead_queue = asyncio.Queue(maxsize=QUEUE_SIZE * KOMMO_LEADS_BATCH)
+    write_queue = asyncio.Queue(maxsize=QUEUE_SIZE * KOMMO_LEADS_BATCH)
+    bucket = TokenBucket(rps)
+
+    async def produce():
+        # Leads already fetched or verified earlier in this run are served from the cache without a request.
+        checked = cache.checked if cache is not None else set()
+        reuse = [k for k in lead_ids if k in cached and k in checked]
+        for start in range(0, len(reuse), KOMMO_LEADS_BATCH):
+            await batch_queue.put((reuse[start:start + KOMMO_LEADS_BATCH], None, "reuse"))
+        fresh = [k for k in lead_ids if k not in cached]
+        for start in range(0, len(fresh), KOMMO_LEADS_BATCH):
+            await batch_queue.put((fresh[start:start + KOMMO_LEADS_BATCH], None, "fetch"))
+        # Any edit made after a lead was cached has updated_at >= its fetched_at, so the batch watermark is the
+        # oldest fetch time (minus clock skew). Sorting by fetch time keeps that watermark tight.
+        known = sorted((k for k in lead_ids if k in cached and k not in checked), key=lambda k: cache_state[k][1])
+        for start in range(0, len(known), KOMMO_LEADS_BATCH):
+            batch = known[start:start + KOMMO_LEADS_BATCH]
+            since = min(cache_state[k][1] for k in batch) - CACHE_CLOCK_SKEW_SEC
+            await batch_queue.put((batch, since, "check"))
+        for _ in range(concurrency):
+            await batch_queue.put(None)
+
+    async def fetch(client):
+        while True:
+            item = await batch_queue.get()
+            if item is None:
+                return
+            batch, since, mode = item
+            if mode == "reuse":
+                for lead in cache.payloads(batch):
+                    stats["reused"] += 1
+                    await lead_queue.put(lead)
+                continue
+            changed = []
+            returned = set()
+            leads, ok = await fetch_leads_batch(client, bucket, kommo_domain, batch, stats, since=since)
+            for lead in leads:
+                key = normalize_lead_id(lead.get("id"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                returned.add(key)
+                stats["fetched"] += 1
+                if key not in cached or cached[key] != lead.get("updated_at"):
+                    stats["refreshed"] += key in cached
+                    changed.append(lead)
+                await lead_queue.put(lead)
+            if cache is not None:
+                if changed:
+                    cache.put_many(changed)
+                cache.checked.update(batch if ok else returned)
+            if not ok:
+                # A lead missing from a failed response is unknown, not unchanged: leave it unmapped and unchecked
+                # (the error holds the checkpoint back, so the next run comes back to these rows).
+                stats["unverified"] += sum(1 for k in batch if k in cached and k not in returned)
+                continue
+            if mode == "check":
+                # Not returned under filter[updated_at][from]: unchanged since cached, so map the cached payload.
+                for lead in cache.payloads([k for k in batch if k not in returned]):
+                    stats["reused"] += 1
+                    await lead_queue.put(lead)
+
+    async def map_leads():
+        while True:
+            lead = await lead_queue.get()
+            if lead is None:
+                break
+            updates = map_kommo_fields(lead)
+            if not updates:
+                continue
+            for row in rows_by_lead.get(normalize_lead_id(lead.get("id")), []):
+                await write_queue.put((row, updates))
+        for _ in range(write_concurrency):
+            await write_queue.put(None)
+
+    async def write():
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                return
+            row, updates = item
+            try:
+                await asyncio.to_thread(_write_row, supabase, table_name, link_col, row, updates)
+                stats["updated"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                if cache is not None:
+                    cache.forget([normalize_lead_id(row.get(link_col))])
+                print(f"  ❌ Update Error Lead {row.get(link_col)}: {e}")
+
+    pending_leads = set()
+
+    async def flush_bulk():
+        try:
+            stats["updated"] += await asyncio.to_thread(bulk_writer.flush)
+        except Exception as e:
+            stats["errors"] += 1
+            # Drop the cache entries so the next run retries these leads.
+            if cache is not None:
+                cache.forget(pending_leads)
+            print(f"  ❌ Bulk Update Error: {e}")
+        pending_leads.clear()
+
+    async def write_bulk():
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                break
+            row, updates = item
+            key_col, key = _row_key(row, link_col)
+            pending_leads.add(normalize_lead_id(row.get(link_col)))
+            if bulk_writer.add(key_col, key, updates):
+                await flush_bulk()
+        await flush_bulk()
+
+    if bulk_writer is not None:
+        write_concurrency = 1
+
+    started = time.monotonic()
+    async with httpx.AsyncClient(headers=kommo_headers, timeout=30.0,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        mapper = asyncio.create_task(map_leads())
+        writers = [asyncio.create_task(write_bulk() if bulk_writer is not None else write()) for _ in range(write_concurrency)]
+        await asyncio.gather(produce(), *(fetch(client) for _ in range(concurrency)))
+        await lead_queue.put(None)
+        await mapper
+        await asyncio.gather(*writers)
+    stats["unchanged"] = stats["cached"] - stats["refreshed"] - stats["unverified"]
+    stats["seconds"] = round(time.monotonic() - started, 2)
+    return stats
+
+PAGE_SIZE = 5000
+CHECKPOINT_PATH = os.path.join(".cache", "backfill_checkpoint.json")
+# A row counts as not yet enriched while all of these are NULL.
+MISSING_ADS_COLUMNS = ("campaign_id", "utm_source")
+# Keyset pagination column, first one the table has. Algonova_Calls_Raw has no id, so call_id is the usual one.
+KEY_COLUMN_CANDIDATES = ("id", "call_id")
+
+def load_checkpoint(path, table_name, key_col):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if data.get("table") != table_name or data.get("key_column") != key_col:
+        return None
+    return data.get("last_key")
+
+def save_checkpoint(path, table_name, key_col, last_key):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"table": table_name, "key_column": key_col, "last_key": last_key, "saved_at": int(time.time())}, f)
+    os.replace(tmp_path, path)
+
+def clear_checkpoint(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def fetch_rows_page(supabase, table_name, columns, key_col, after=None, page_size=PAGE_SIZE, only_missing=True):
+    """
+    Keyset page: rows with key_col > after, ordered by key_col.
+    The filter and ORDER BY compare with the same collation, so text keys such as call_id page stably;
+    rows with a NULL key cannot be paged and are left out.
+    """
+    query = supabase.table(table_name).select(",".join(columns))
+    if only_missing:
+        for col in MISSING_ADS_COLUMNS:
+            query = query.is_(col, "null")
+    query = query.not_.is_(key_col, "null")
+    if after is not None:
+        query = query.gt(key_col, after)
+    return query.order(key_col).limit(page_size).execute().data or []
 
-def backfill_data():
-    secrets = load_secrets()
+def whole_key_groups(rows, key_col):
+    """
+    Drops the trailing rows that share the page's last key: the key need not be unique (call_id is not), and
+    rows of that key past the page limit would be skipped by the next `key > last` page. The next page then
+    starts with the whole group. A page made of a single key is returned as is.
+    """
+    last = rows[-1][key_col]
+    cut = len(rows)
+    while cut and rows[cut - 1][key_col] == last:
+        cut -= 1
+    return rows[:cut] or rows
+
+def backfill_data(use_cache=True, cache_path=LEAD_CACHE_PATH, incremental=True, restart=False,
+                  key_col=None, page_size=PAGE_SIZE, checkpoint_path=CHECKPOINT_PATH, table_name="Algonova_Calls_Raw",
+                  rps=KOMMO_RPS, concurrency=KOMMO_CONCURRENCY, secrets=None, supabase=None, db_conn=None):
+    """
+    Enriches rows with empty ads columns (every row with incremental=False) page by page.
+    `secrets`, `supabase` and `db_conn` default to secrets.toml, a Supabase client and a connection from its
+    [database] section; the benchmark passes its own. Returns the summed pipeline stats (None if nothing ran).
+    """
+    secrets = secrets or load_secrets()
     if not secrets: return
 
     # Supabase Setup
@@ -104,37 +440,31 @@ def backfill_data():
     else:
         print("✅ Using Service Role Key (RLS Bypass).")
 
-    supabase = create_client(sb_url, sb_key)
+    supabase = supabase or create_client(sb_url, sb_key)
     
     # Kommo Setup
     kommo_token = secrets["kommo"]["api_token"]
-    kommo_domain = "algocz.kommo.com" 
+    kommo_domain = secrets["kommo"].get("domain", "algocz.kommo.com") 
     kommo_headers = {
         "Authorization": f"Bearer {kommo_token}",
         "Content-Type": "application/json"
     }
 
-    table_name = "Algonova_Calls_Raw"
-
     print(f"--- Starting Backfill Process on table '{table_name}' ---")
     
     # 1. Fetch rows from Supabase
     try:
-        # Fetch rows that need updating (or all)
         # We need a column that links to Kommo.
         # User implies there is a link. We assume 'lead_id' or 'kommo_id' or similar exists.
         # If not, we can't proceed.
         
-        print(f"Fetching data...")
-        res = supabase.table(table_name).select("*").execute()
-        rows = res.data
+        print(f"Inspecting columns...")
+        sample = supabase.table(table_name).select("*").limit(1).execute().data
         
-        if not rows:
+        if not sample:
             print(f"❌ Table '{table_name}' returned 0 rows.")
             print("   Possible reasons: 1. Table is empty. 2. RLS is blocking access (use service_role_key).")
             return
-
-        print(f"Found {len(rows)} rows.")
         
         # Identify Link Column
         link_col = None
@@ -142,7 +472,7 @@ def backfill_data():
         candidates = ['lead_id', 'kommo_id', 'contact_id', 'Lead ID', 'kommo_lead_id']
         
         # Check first row
-        first_row = rows[0]
+        first_row = sample[0]
         # Allow lead_id to be found even if value is null in first row, if key exists
         for col in candidates:
             if col in first_row:
@@ -153,52 +483,101 @@ def backfill_data():
             # Fallback: Ask user to specify if we can't guess
             print(f"❌ Could not auto-detect Kommo Link Column. Available columns: {list(first_row.keys())}")
             return
+        if key_col is None:
+            key_col = next((c for c in KEY_COLUMN_CANDIDATES if c in first_row), None)
+        if key_col not in first_row:
+            print(f"❌ Key column '{key_col}' not found. Available columns: {list(first_row.keys())}")
+            return
             
-        print(f"✅ Using '{link_col}' as Kommo Lead ID.")
+        print(f"✅ Using '{link_col}' as Kommo Lead ID, paging by '{key_col}'.")
+        columns = list(dict.fromkeys(c for c in (key_col, "call_id", link_col) if c in first_row))
 
-        updated_count = 0
-        
-        for row in rows:
-            lead_id = row.get(link_col)
-            # Use call_id if id is not present, as user stated call_id is unique
-            row_id = row.get('id') 
-            call_id = row.get('call_id')
-            
-            if not lead_id:
-                # print(f"Skipping row with no lead_id")
-                continue
-                
-            # print(f"Processing Lead {lead_id}...")
-            
-            # Fetch from Kommo
-            kommo_lead = get_kommo_lead(lead_id, kommo_headers, kommo_domain)
-            
-            if kommo_lead:
-                updates = map_kommo_fields(kommo_lead)
-                
-                if updates:
-                    try:
-                        # Update Supabase
-                        if call_id:
-                             supabase.table(table_name).update(updates).eq('call_id', call_id).execute()
-                        elif row_id:
-                            supabase.table(table_name).update(updates).eq('id', row_id).execute()
-                        else:
-                            # Fallback if no PK
-                            supabase.table(table_name).update(updates).eq(link_col, lead_id).execute()
-                        
-                        updated_count += 1
-                        print(f"  ✅ Updated Lead {lead_id} (Call ID: {call_id})")
-                    except Exception as e:
-                        print(f"  ❌ Update Error Lead {lead_id}: {e}")
-            
-            # Rate limit to be safe
-            time.sleep(0.1)
-            
-        print(f"--- Backfill Complete. Updated {updated_count} rows. ---")
+        after = None
+        if incremental:
+            if restart:
+                clear_checkpoint(checkpoint_path)
+            after = load_checkpoint(checkpoint_path, table_name, key_col)
+            if after is not None:
+                print(f"↪️  Resuming after {key_col} = {after} (checkpoint {checkpoint_path}).")
+
+        bulk_writer = None
+        db_cfg = secrets.get("database")
+        if db_conn is not None or db_cfg:
+            bulk_writer = BulkWriter(db_conn or connect_postgres(db_cfg), table_name)
+            print("✅ Using bulk COPY + UPDATE writer.")
+        else:
+            print("⚠️ No [database] section in secrets.toml, falling back to per-row PostgREST updates.")
+
+        cache = LeadCache(cache_path) if use_cache else None
+        totals = {}
+        pages = 0
+        finished = False
+        try:
+            while True:
+                rows = fetch_rows_page(supabase, table_name, columns, key_col, after, page_size, only_missing=incremental)
+                if not rows:
+                    finished = True
+                    break
+                rows = whole_key_groups(rows, key_col)
+                pages += 1
+                stats = asyncio.run(run_backfill_pipeline(rows, link_col, kommo_headers, kommo_domain, supabase, table_name,
+                                                          rps=rps, concurrency=concurrency,
+                                                          bulk_writer=bulk_writer, cache=cache))
+                for k, v in stats.items():
+                    totals[k] = totals.get(k, 0) + v
+                if stats["errors"]:
+                    print(f"❌ Page {pages} had {stats['errors']} Kommo/write errors; stopping before the checkpoint advances.")
+                    break
+                after = rows[-1][key_col]
+                if incremental:
+                    save_checkpoint(checkpoint_path, table_name, key_col, after)
+                print(f"  Page {pages}: {len(rows)} rows, {stats['updated']} updated, up to {key_col} = {after}.")
+        finally:
+            if bulk_writer is not None and db_conn is None:
+                bulk_writer.conn.close()
+            if cache is not None:
+                cache.close()
+        if finished and incremental:
+            # Rows added later may sort below the last key; the next run starts from the beginning again
+            # (already enriched rows no longer match the empty-ads filter, so this stays cheap).
+            clear_checkpoint(checkpoint_path)
+
+        if not totals:
+            print("✅ Nothing to backfill.")
+            return None
+        if cache is not None:
+            print(f"Lead cache: {totals['cached']} cached, {totals['reused']} served from cache without a download, "
+                  f"{totals['refreshed']} updated in Kommo since last run.")
+        print(f"Fetched {totals['fetched']}/{totals['leads']} leads in {totals['requests']} requests "
+              f"({totals['throttled']} throttled) in {totals['seconds']:.2f}s.")
+        if bulk_writer is not None and bulk_writer.seconds:
+            print(f"Bulk writes: {bulk_writer.rows} rows in {bulk_writer.seconds:.2f}s "
+                  f"({bulk_writer.rows / bulk_writer.seconds:,.0f} rows/sec).")
+        print(f"--- Backfill Complete. Updated {totals['updated']} rows ({totals['errors']} errors). ---")
+        totals["pages"] = pages
+        return totals
 
     except Exception as e:
         print(f"❌ Critical Error: {e}")
 
 if __name__ == "__main__":
-    backfill_data()
+    parser = argparse.ArgumentParser(description="Backfill Kommo ads fields into Algonova_Calls_Raw.")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the local lead cache and refetch every lead")
+    parser.add_argument("--cache-path", default=LEAD_CACHE_PATH)
+    parser.add_argument("--full", action="store_true",
+                        help="Process every row, not only rows with empty ads columns; no checkpoint is used")
+    parser.add_argument("--restart", action="store_true", help="Discard the incremental checkpoint and start over")
+    parser.add_argument("--key-column", default=None,
+                        help="Ordered column used for keyset pagination (default: id if the table has one, else call_id)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--checkpoint-path", default=CHECKPOINT_PATH)
+    args = parser.parse_args()
+    backfill_data(
+        use_cache=not args.no_cache,
+        cache_path=args.cache_path,
+        incremental=not args.full,
+        restart=args.restart,
+        key_col=args.key_column,
+        page_size=args.page_size,
+        checkpoint_path=args.checkpoint_path,
+    )
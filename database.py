@@ -1,12 +1,28 @@
 ﻿import streamlit as st
+import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 import os
 import time
+import threading
+import functools
+import inspect
+import json
+import logging
+from collections import OrderedDict, deque
 import httpx
-import psycopg2
+import local_engine
+from pg_bulk import connect_postgres
+import resilience
+import slow_log
+import tracing
 from app_i18n import t
 
+try:
+    from supabase import ClientOptions
+except ImportError:
+    ClientOptions = None
+
 
 def _get_nested_secret(section: str, key: str):
     try:
@@ -40,86 +56,312 @@ def _resolve_supabase_config():
     )
     return url, key
 
-@st.cache_resource
-def _derive_pooler_config(cfg: dict) -> dict | None:
-    host = str(cfg.get("host", "")).strip()
-    if host.startswith("db.") and host.endswith(".supabase.co"):
-        parts = host.split(".")
-        if len(parts) >= 3:
-            project_ref = parts[1]
-            user = str(cfg.get("user", "")).strip()
-            if user and "." not in user:
-                user = f"{user}.{project_ref}"
-            return {
-                "host": "aws-1-eu-west-1.pooler.supabase.com",
-                "port": int(cfg.get("pooler_port", 6543)),
-                "name": str(cfg.get("name", "postgres")),
-                "user": user,
-                "pass": str(cfg.get("pass", "")),
-            }
-    return None
-
-
-def _connect_postgres(cfg: dict):
-    def _connect(host: str, port: int, user: str):
-        return psycopg2.connect(
-            host=host,
-            port=int(port),
-            database=cfg["name"],
-            user=user,
-            password=cfg["pass"],
-            sslmode="require",
-        )
+PERF_SESSION_KEY = "perf_rerun_v1"
+_PERF_LOCK = threading.Lock()
+_PERF_STATS: dict[tuple[str, str], dict] = {}
+_PERF_KEEP = 500  # durations kept per (function, name) for the percentiles
+_perf_local = threading.local()
+
 
-    host = str(cfg.get("host", "")).strip()
-    port = int(cfg.get("port", 5432))
-    user = str(cfg.get("user", "")).strip()
+def _normalize_param(value):
+    if isinstance(value, dict):
+        return {str(k): _normalize_param(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0])) if v is not None}
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize_param(v) for v in value]
+        return items if len(items) <= 5 else f"<{len(items)} items>"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str):
+        return " ".join(value.split())[:200]
+    return value
+
+
+def _session_perf() -> dict | None:
     try:
-        return _connect(host, port, user)
+        return st.session_state.setdefault(PERF_SESSION_KEY, {"t0": time.perf_counter(), "calls": []})
     except Exception:
-        pooler = _derive_pooler_config(cfg)
-        if not pooler or not pooler.get("user"):
-            raise
-        return psycopg2.connect(
-            host=pooler["host"],
-            port=pooler["port"],
-            database=pooler["name"],
-            user=pooler["user"],
-            password=pooler["pass"],
-            sslmode="require",
+        return None
+
+
+def start_perf_rerun() -> None:
+    """Start a new waterfall for the current script run."""
+    try:
+        st.session_state[PERF_SESSION_KEY] = {"t0": time.perf_counter(), "calls": []}
+    except Exception:
+        pass
+
+
+def _record_call(rec: dict) -> None:
+    key = (rec["function"], rec["name"])
+    with _PERF_LOCK:
+        stats = _PERF_STATS.setdefault(
+            key,
+            {"calls": 0, "hits": 0, "errors": 0, "total_ms": 0.0, "rows": 0, "bytes": 0, "durations": deque(maxlen=_PERF_KEEP)},
         )
+        stats["calls"] += 1
+        stats["hits"] += rec["cache"] == "hit"
+        stats["errors"] += rec["error"] is not None
+        stats["total_ms"] += rec["duration_ms"]
+        stats["rows"] += rec["rows"]
+        stats["bytes"] += rec["bytes"]
+        stats["durations"].append(rec["duration_ms"])
+    if slow_log.should_log(rec["duration_ms"], rec["error"], _slow_call_threshold()):
+        slow_log.record(
+            rec["function"], rec["name"], rec["params"], rec["duration_ms"], rec["rows"], rec["cache"], rec["error"]
+        )
+    perf = _session_perf()
+    if perf is not None:
+        rec["start_ms"] = round((rec.pop("t0") - perf["t0"]) * 1000, 2)
+        perf["calls"].append(rec)
+    else:
+        rec.pop("t0")
+
+
+def _note_error(e: Exception) -> None:
+    # The data functions swallow their exceptions; this keeps the error class for the timing records.
+    _perf_local.error = type(e).__name__
+
+
+def _slow_call_threshold() -> float | None:
+    value = _get_secret("slow_call_ms")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _timed_cache(ttl: int, label: str | None = None):
+    """st.cache_data(ttl) that also records duration, rows, frame size and hit/miss per call."""
+
+    def decorate(func):
+        fname = label or func.__name__
+        sig = inspect.signature(func)
+        first = next(iter(sig.parameters))
+
+        @functools.wraps(func)
+        def uncached(*args, **kwargs):
+            # Only runs on a cache miss.
+            _perf_local.missed = True
+            return func(*args, **kwargs)
+
+        cached = st.cache_data(ttl=ttl)(uncached)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            name = _normalize_param(bound.arguments.get(first, ""))
+            params = {k: v for k, v in bound.arguments.items() if k != first}
+            if set(params) == {"params"}:
+                params = params["params"] or {}
+            outer_missed = getattr(_perf_local, "missed", False)
+            outer_error = getattr(_perf_local, "error", None)
+            _perf_local.missed = False
+            _perf_local.error = None
+            with tracing.span(f"{fname} {str(name)[:60]}") as sp:
+                t0 = time.perf_counter()
+                result, error = None, None
+                try:
+                    result = cached(*args, **kwargs)
+                    return result
+                except Exception as e:
+                    error = type(e).__name__
+                    raise
+                finally:
+                    end = time.perf_counter()
+                    missed = _perf_local.missed
+                    error = _perf_local.error or error
+                    _perf_local.missed = outer_missed
+                    _perf_local.error = outer_error
+                    is_df = isinstance(result, pd.DataFrame)
+                    rec = {
+                        "function": fname,
+                        "name": str(name)[:120],
+                        "params": _normalize_param(params),
+                        "t0": t0,
+                        "duration_ms": round((end - t0) * 1000, 2),
+                        "rows": len(result) if is_df else 0,
+                        "bytes": int(result.memory_usage(index=False).sum()) if is_df else 0,
+                        "cache": "miss" if missed else "hit",
+                        "error": error,
+                    }
+                    sp.set_attribute("db.function", rec["function"])
+                    sp.set_attribute("db.name", rec["name"])
+                    sp.set_attribute("db.params", json.dumps(rec["params"], ensure_ascii=False, default=str))
+                    sp.set_attribute("db.rows", rec["rows"])
+                    sp.set_attribute("db.bytes", rec["bytes"])
+                    sp.set_attribute("cache.hit", not missed)
+                    sp.set_attribute("error.type", error)
+                    _record_call(rec)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+
+def get_perf_calls() -> list[dict]:
+    """Calls recorded during the current script run, in start order."""
+    perf = _session_perf()
+    return list(perf["calls"]) if perf else []
+
+
+def get_perf_summary() -> pd.DataFrame:
+    """Per (function, name) aggregates for every call since the process started."""
+    with _PERF_LOCK:
+        items = [(key, dict(stats, durations=list(stats["durations"]))) for key, stats in _PERF_STATS.items()]
+    rows = []
+    for (function, name), stats in items:
+        durations = sorted(stats["durations"])
+        rows.append({
+            "function": function,
+            "name": name,
+            "calls": stats["calls"],
+            "hit_rate": stats["hits"] / stats["calls"],
+            "errors": stats["errors"],
+            "p50_ms": durations[int(round(0.5 * (len(durations) - 1)))],
+            "p95_ms": durations[int(round(0.95 * (len(durations) - 1)))],
+            "total_ms": round(stats["total_ms"], 2),
+            "avg_rows": stats["rows"] / stats["calls"],
+            "avg_bytes": stats["bytes"] / stats["calls"],
+        })
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values("total_ms", ascending=False, ignore_index=True)
+
+
+def reset_perf_stats() -> None:
+    with _PERF_LOCK:
+        _PERF_STATS.clear()
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client(options: "ClientOptions | None" = None) -> Client:
     url, key = _resolve_supabase_config()
     url, key = _resolve_supabase_config()
     if not url or not key:
         st.error(t("db.supabase_secrets_missing"))
         st.stop()
-    return create_client(url, key)
+    return create_client(url, key, options)
 
 
-@st.cache_data(ttl=300)
-def rpc_df(function_name: str, params: dict | None = None) -> pd.DataFrame:
+def _local_rpc_fallback(function_name: str, params: dict | None) -> pd.DataFrame:
+    df = local_engine.run_rpc(function_name, params)
+    return pd.DataFrame() if df is None else df
+
+
+class RpcUnavailable(Exception):
+    """Raised inside the cached RPC bodies so a failure is never stored by st.cache_data."""
+
+
+RPC_BREAKER_FAILURES = int(os.getenv("RPC_BREAKER_FAILURES", "3"))
+RPC_BREAKER_RESET_SEC = float(os.getenv("RPC_BREAKER_RESET_SEC", "30"))
+RPC_NEGATIVE_TTL_SEC = float(os.getenv("RPC_NEGATIVE_TTL_SEC", "20"))
+_LAST_GOOD_KEEP = 200
+_RPC_LOCK = threading.Lock()
+_BREAKERS: dict[str, resilience.CircuitBreaker] = {}
+_NEGATIVE: dict[str, float] = {}
+_LAST_GOOD: OrderedDict[str, tuple[float, pd.DataFrame]] = OrderedDict()
+
+
+def _rpc_key(function_name: str, params: dict | None) -> str:
+    return function_name + ":" + json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def _breaker(function_name: str) -> resilience.CircuitBreaker:
+    with _RPC_LOCK:
+        breaker = _BREAKERS.get(function_name)
+        if breaker is None:
+            breaker = _BREAKERS[function_name] = resilience.CircuitBreaker(
+                function_name, failure_threshold=RPC_BREAKER_FAILURES, reset_timeout=RPC_BREAKER_RESET_SEC
+            )
+        return breaker
+
+
+def _rpc_fetch(function_name: str, params: dict | None) -> pd.DataFrame:
+    if local_engine.OFFLINE:
+        return _local_rpc_fallback(function_name, params)
+    key = _rpc_key(function_name, params)
+    with _RPC_LOCK:
+        failed_until = _NEGATIVE.get(key, 0.0)
+    if failed_until > time.monotonic():
+        raise RpcUnavailable(f"{function_name}: failed less than {RPC_NEGATIVE_TTL_SEC:.0f}s ago")
+    breaker = _breaker(function_name)
+    if not breaker.allow():
+        raise RpcUnavailable(f"{function_name}: circuit open")
     supabase = get_supabase_client()
     try:
         res = supabase.rpc(function_name, params or {}).execute()
-        return pd.DataFrame(res.data or [])
-    except Exception:
-        return pd.DataFrame()
+    except Exception as e:
+        _note_error(e)
+        breaker.record_failure(type(e).__name__)
+        with _RPC_LOCK:
+            _NEGATIVE[key] = time.monotonic() + RPC_NEGATIVE_TTL_SEC
+        raise RpcUnavailable(f"{function_name}: {type(e).__name__}") from e
+    breaker.record_success()
+    df = pd.DataFrame(res.data or [])
+    df.attrs["source"] = "rpc"
+    with _RPC_LOCK:
+        _NEGATIVE.pop(key, None)
+        _LAST_GOOD[key] = (time.time(), df)
+        _LAST_GOOD.move_to_end(key)
+        while len(_LAST_GOOD) > _LAST_GOOD_KEEP:
+            _LAST_GOOD.popitem(last=False)
+    return df
+
+
+def _rpc_degraded(function_name: str, params: dict | None) -> pd.DataFrame:
+    """Last successful result for the same call if there is one, else the local engine (or an empty frame)."""
+    with _RPC_LOCK:
+        good = _LAST_GOOD.get(_rpc_key(function_name, params))
+    if good is None:
+        return _local_rpc_fallback(function_name, params)
+    saved_at, df = good
+    out = df.copy()
+    out.attrs["source"] = "last_good"
+    out.attrs["stale"] = True
+    out.attrs["stale_age_sec"] = round(time.time() - saved_at)
+    return out
+
+
+def get_breaker_states() -> pd.DataFrame:
+    with _RPC_LOCK:
+        breakers = list(_BREAKERS.values())
+    return pd.DataFrame([b.snapshot() for b in breakers])
+
+
+def reset_rpc_state() -> None:
+    """Forget breakers, recent failures, last good results and partial view fetches; st.cache_data.clear() does not reach these."""
+    with _RPC_LOCK:
+        _BREAKERS.clear()
+        _NEGATIVE.clear()
+        _LAST_GOOD.clear()
+        _PARTIAL.clear()
+
+
+@_timed_cache(ttl=300, label="rpc_df")
+def _rpc_df_cached(function_name: str, params: dict | None = None) -> pd.DataFrame:
+    return _rpc_fetch(function_name, params)
+
+
+@_timed_cache(ttl=3600, label="rpc_df_long")
+def _rpc_df_long_cached(function_name: str, params: dict | None = None) -> pd.DataFrame:
+    return _rpc_fetch(function_name, params)
+
+
+def rpc_df(function_name: str, params: dict | None = None) -> pd.DataFrame:
+    try:
+        return _rpc_df_cached(function_name, params)
+    except RpcUnavailable:
+        return _rpc_degraded(function_name, params)
 
 
-@st.cache_data(ttl=3600)
 def rpc_df_long(function_name: str, params: dict | None = None) -> pd.DataFrame:
-    supabase = get_supabase_client()
     try:
-        res = supabase.rpc(function_name, params or {}).execute()
-        return pd.DataFrame(res.data or [])
-    except Exception:
-        return pd.DataFrame()
+        return _rpc_df_long_cached(function_name, params)
+    except RpcUnavailable:
+        return _rpc_degraded(function_name, params)
 
 
-@st.cache_data(ttl=300)
+@_timed_cache(ttl=300)
 def select_df(
     table_or_view: str,
     columns: str = "*",
@@ -148,43 +390,83 @@ def select_df(
             q = q.limit(int(limit))
         res = q.execute()
         return pd.DataFrame(res.data or [])
-    except Exception:
+    except Exception as e:
+        _note_error(e)
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def fetch_view_data(view_name: str, page_size: int = 1000):
-    supabase = get_supabase_client()
+class PartialFetch(Exception):
+    """Carries what fetch_view_data loaded before it failed, so st.cache_data does not keep the partial frame."""
+
+    def __init__(self, df: pd.DataFrame, error: Exception):
+        super().__init__(str(error))
+        self.df = df
+        self.error = error
+
+
+VIEW_FETCH_RETRY = resilience.RetryPolicy(
+    attempt_timeout=float(os.getenv("VIEW_FETCH_PAGE_TIMEOUT_SEC", "20")),
+    total_budget=float(os.getenv("VIEW_FETCH_BUDGET_SEC", "60")),
+)
+VIEW_PARTIAL_TTL_SEC = float(os.getenv("VIEW_PARTIAL_TTL_SEC", "60"))
+_PARTIAL: dict[str, tuple[float, PartialFetch]] = {}
+_page_timeout_warned = False
+
+
+def _view_fetch_client(http: httpx.Client) -> tuple[Client, bool]:
+    """
+    Supabase client whose PostgREST requests go through `http`, so each page's timeout can be set on it.
+    Releases without ClientOptions.httpx_client get the default client instead (second value False):
+    the retry budget still bounds the fetch, but a single hung page is not cut short.
+    """
+    global _page_timeout_warned
+    if ClientOptions is not None:
+        try:
+            supabase = get_supabase_client(ClientOptions(httpx_client=http))
+        except TypeError:
+            supabase = None
+        if supabase is not None and getattr(supabase.postgrest, "session", None) is http:
+            return supabase, True
+    if not _page_timeout_warned:
+        _page_timeout_warned = True
+        logging.getLogger(__name__).warning(
+            "supabase client does not accept ClientOptions.httpx_client; view pages run without a per-page timeout"
+        )
+    return get_supabase_client(), False
+
+
+@_timed_cache(ttl=600, label="fetch_view_data")
+def _fetch_view_data_cached(view_name: str, page_size: int = 1000) -> pd.DataFrame:
+    policy = VIEW_FETCH_RETRY
+    breaker = _breaker(view_name)
+    deadline = policy.deadline()
     rows: list[dict] = []
     offset = 0
     total_count = None
-    max_retries = 3
-    retry_delay = 2 # seconds
+    error = None
+
+    # The per-page timeout is set on an httpx client this function owns and hands to PostgREST (when supported).
+    with httpx.Client(follow_redirects=True) as http:
+        supabase, page_timeout = _view_fetch_client(http)
+
+        def fetch_page(timeout: float):
+            if page_timeout:
+                http.timeout = httpx.Timeout(timeout)
+            query = supabase.table(view_name).select("*", count="exact").range(offset, offset + page_size - 1)
+            if hasattr(query, "retry"):
+                # Newer postgrest retries 503s itself with time.sleep, outside the budget; the policy owns retries here.
+                query = query.retry(False)
+            return query.execute()
 
-    try:
         while True:
-            batch = None
-            for attempt in range(max_retries):
-                try:
-                    res = (
-                        supabase.table(view_name)
-                        .select("*", count="exact")
-                        .range(offset, offset + page_size - 1)
-                        .execute()
-                    )
-                    if total_count is None:
-                        total_count = getattr(res, "count", None)
-                    batch = res.data or []
-                    break # Success, exit retry loop
-                except (httpx.ConnectError, httpx.RemoteProtocolError, Exception) as e:
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_delay * (attempt + 1)) # Exponential-ish backoff
-                        continue
-                    else:
-                        raise e
-
-            if batch is None: # Should not happen if max_retries > 0
+            try:
+                res = policy.call(fetch_page, deadline, breaker)
+            except Exception as e:
+                _note_error(e)
+                error = e
                 break
-                
+            if total_count is None:
+                total_count = getattr(res, "count", None)
+            batch = res.data or []
             rows.extend(batch)
 
             if len(batch) < page_size:
@@ -194,20 +476,51 @@ def fetch_view_data(view_name: str, page_size: int = 1000):
             if offset > 500_000:
                 break
 
-        df = pd.DataFrame(rows)
-        df.attrs["supabase_exact_count"] = total_count
-        df.attrs["supabase_rows_loaded"] = len(rows)
-        return df
-    except Exception as e:
-        st.error(f"Error fetching {view_name}: {e}")
-        return pd.DataFrame()
+    df = pd.DataFrame(rows)
+    df.attrs["supabase_exact_count"] = total_count
+    df.attrs["supabase_rows_loaded"] = len(rows)
+    if error is not None:
+        df.attrs["partial"] = True
+        df.attrs["partial_reason"] = type(error).__name__
+        raise PartialFetch(df, error)
+    return df
+
+
+def fetch_view_data(view_name: str, page_size: int = 1000) -> pd.DataFrame:
+    key = _rpc_key(view_name, {"page_size": page_size})
+    with _RPC_LOCK:
+        until, failed = _PARTIAL.get(key, (0.0, None))
+    if until <= time.monotonic():
+        try:
+            return _fetch_view_data_cached(view_name, page_size)
+        except PartialFetch as e:
+            failed = e
+        # Reruns during an outage reuse this result instead of spending the retry budget again.
+        with _RPC_LOCK:
+            _PARTIAL[key] = (time.monotonic() + VIEW_PARTIAL_TTL_SEC, failed)
+    if failed.df.empty:
+        st.error(f"Error fetching {view_name}: {failed.error}")
+    else:
+        st.warning(t(
+            "db.view_partial",
+            view=view_name,
+            loaded=len(failed.df),
+            total=failed.df.attrs["supabase_exact_count"] or "?",
+            reason=failed.df.attrs["partial_reason"],
+        ))
+    return failed.df.copy(deep=False)
 
 
 def normalize_calls_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse call dates and numeric columns.
+
+    Works on a shallow copy: the caller's frame is untouched and only the replaced columns are new.
+    """
     if df is None or df.empty:
         return pd.DataFrame() if df is None else df
 
-    out = df.copy()
+    # Whole-column assignment rebinds the column in the copy, so nothing writes through to df.
+    out = df.copy(deep=False)
     if "call_datetime" in out.columns:
         out["call_datetime"] = pd.to_datetime(out["call_datetime"], errors="coerce", utc=True)
         out["call_date"] = out["call_datetime"].dt.date
@@ -227,7 +540,7 @@ def add_outcome_category(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame() if df is None else df
 
-    out = df.copy()
+    out = df.copy(deep=False)
     if "next_step_type" not in out.columns:
         out["outcome_category"] = "Other"
         return out
@@ -238,34 +551,55 @@ def add_outcome_category(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def compute_friction_index(
+def friction_counts(
     df: pd.DataFrame,
-    group_cols: list[str],
+    group_sets: list[list[str]],
     primary_types: list[str],
     followup_types: list[str],
-) -> pd.DataFrame:
+) -> list[pd.DataFrame]:
+    """Primary/follow-up call counts and friction index for each list of group columns.
+
+    The call_type flags are computed once and every grouping is a plain groupby().sum().
+    """
     if df is None or df.empty:
-        return pd.DataFrame(columns=[*group_cols, "primaries", "followups", "friction_index"])
+        return [pd.DataFrame(columns=[*cols, "primaries", "followups", "friction_index"]) for cols in group_sets]
 
     if "call_type" not in df.columns:
-        base = df[group_cols].drop_duplicates().copy()
-        base["primaries"] = 0
-        base["followups"] = 0
-        base["friction_index"] = 0.0
-        return base
-
-    g = (
-        df.groupby(group_cols, dropna=False)
-        .agg(
-            primaries=("call_type", lambda s: int(s.isin(primary_types).sum())),
-            followups=("call_type", lambda s: int(s.isin(followup_types).sum())),
-        )
-        .reset_index()
+        out = []
+        for cols in group_sets:
+            base = df[cols].drop_duplicates().copy()
+            base["primaries"] = 0
+            base["followups"] = 0
+            base["friction_index"] = 0.0
+            out.append(base)
+        return out
+
+    needed = list(dict.fromkeys(c for cols in group_sets for c in cols))
+    flags = df[needed].assign(
+        primaries=df["call_type"].isin(primary_types).astype("int64"),
+        followups=df["call_type"].isin(followup_types).astype("int64"),
     )
-    g["friction_index"] = 0.0
-    mask = g["primaries"] > 0
-    g.loc[mask, "friction_index"] = (g.loc[mask, "followups"] / g.loc[mask, "primaries"]).astype(float)
-    return g
+    out = []
+    for cols in group_sets:
+        g = flags.groupby(cols, dropna=False, sort=True)[["primaries", "followups"]].sum().reset_index()
+        primaries = g["primaries"].to_numpy()
+        g["friction_index"] = np.divide(
+            g["followups"].to_numpy(dtype=float),
+            primaries,
+            out=np.zeros(len(g)),
+            where=primaries > 0,
+        )
+        out.append(g)
+    return out
+
+
+def compute_friction_index(
+    df: pd.DataFrame,
+    group_cols: list[str],
+    primary_types: list[str],
+    followup_types: list[str],
+) -> pd.DataFrame:
+    return friction_counts(df, [group_cols], primary_types, followup_types)[0]
 
 
 @st.cache_resource
@@ -285,7 +619,7 @@ def ensure_chart_views():
     try:
         with open(sql_path, "r", encoding="utf-8") as f:
             sql = f.read()
-        conn = _connect_postgres(cfg)
+        conn = connect_postgres(cfg)
         try:
             conn.autocommit = True
             with conn.cursor() as cur:
@@ -297,14 +631,14 @@ def ensure_chart_views():
         return False
 
 
-@st.cache_data(ttl=300)
+@_timed_cache(ttl=300)
 def query_postgres(sql: str, params: tuple | None = None) -> pd.DataFrame:
     cfg = _get_secret("database")
     if not cfg:
         return pd.DataFrame()
 
     try:
-        conn = _connect_postgres(cfg)
+        conn = connect_postgres(cfg)
         try:
             with conn.cursor() as cur:
                 cur.execute(sql, params or ())
@@ -313,6 +647,7 @@ def query_postgres(sql: str, params: tuple | None = None) -> pd.DataFrame:
             return pd.DataFrame(rows, columns=cols)
         finally:
             conn.close()
-    except Exception:
+    except Exception as e:
+        _note_error(e)
         return pd.DataFrame()
 
@@ -1,6 +1,10 @@
 import os
+import sys
 import toml
-import psycopg2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pg_bulk import connect_postgres
 
 
 def _load_secrets():
@@ -104,66 +108,47 @@ def _split_sql_statements(sql: str) -> list[str]:
     return statements
 
 
+def connect_db(cfg: dict):
+    return connect_postgres(cfg)
+
+
+def execute_statements(cur, statements: list[str]):
+    for idx, stmt in enumerate(statements, start=1):
+        try:
+            cur.execute(stmt)
+        except Exception as e:
+            preview = stmt.replace("\n", " ")[:400]
+            raise RuntimeError(f"Failed SQL statement #{idx}/{len(statements)}: {preview}") from e
+
+
 def apply_views(sql_path: str):
     secrets = _load_secrets()
     cfg = secrets["database"]
     sql = _read_sql(sql_path)
     statements = _split_sql_statements(sql)
 
-    def _connect(host: str):
-        return psycopg2.connect(
-            host=host,
-            database=cfg["name"],
-            user=cfg["user"],
-            password=cfg["pass"],
-            port=cfg["port"],
-            sslmode="require",
-        )
-
-    def _connect_pooler():
-        host = str(cfg.get("host", "")).strip()
-        if not (host.startswith("db.") and host.endswith(".supabase.co")):
-            return None
-        project_ref = host.split(".")[1]
-        user = str(cfg.get("user", "")).strip()
-        if user and "." not in user:
-            user = f"{user}.{project_ref}"
-        return psycopg2.connect(
-            host="aws-1-eu-west-1.pooler.supabase.com",
-            port=6543,
-            database=str(cfg.get("name", "postgres")),
-            user=user,
-            password=cfg["pass"],
-            sslmode="require",
-        )
-
     conn = None
     try:
-        try:
-            conn = _connect(cfg["host"])
-        except Exception:
-            conn = _connect_pooler()
-            if conn is None:
-                raise
-
+        conn = connect_db(cfg)
         conn.autocommit = True
         with conn.cursor() as cur:
             cur.execute("SET statement_timeout TO 0;")
-            for idx, stmt in enumerate(statements, start=1):
-                try:
-                    cur.execute(stmt)
-                except Exception as e:
-                    preview = stmt.replace("\n", " ")[:400]
-                    raise RuntimeError(f"Failed SQL statement #{idx}/{len(statements)}: {preview}") from e
+            execute_statements(cur, statements)
     finally:
         if conn is not None:
             conn.close()
 
 
+CHART_VIEWS_SQL = os.path.join(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    "supabase",
+    "migrations",
+    "20260117_ceo_cmo_chart_views.sql",
+)
+
+
 def main():
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    sql_path = os.path.join(repo_root, "supabase", "migrations", "20260117_ceo_cmo_chart_views.sql")
-    apply_views(sql_path)
+    apply_views(CHART_VIEWS_SQL)
     print("OK: SQL views applied")
 
 
@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from attribute_frequency import compute_attribute_frequency
+
+
+PIPELINES = [f"{m} | Pipeline {i}" for m in ("CZ", "SK", "RUK", "PL") for i in range(6)]
+MARKETS = ["CZ", "SK", "RUK", "PL", ""]
+ATTR_TYPES = ["Goal", "Objection", "Fear"]
+
+
+def make_frames(n_attr_rows: int, attrs_per_call: int = 6, n_values: int = 400, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    n_calls = max(1, n_attr_rows // attrs_per_call)
+    ids = np.arange(n_calls)
+    wrap = rng.integers(0, 3, n_calls)
+    raw_ids = np.where(wrap == 0, ids.astype(str), np.where(wrap == 1, np.char.add(np.char.add("{", ids.astype(str)), "}"), np.char.add(" ", ids.astype(str))))
+    start = np.datetime64("2025-01-01T00:00:00")
+    seconds = rng.integers(0, 365 * 24 * 3600, n_calls)
+    df_calls = pd.DataFrame(
+        {
+            "call_id": raw_ids,
+            "call_datetime": (start + seconds.astype("timedelta64[s]")).astype(str),
+            "pipeline_name": np.array(PIPELINES, dtype=object)[rng.integers(0, len(PIPELINES), n_calls)],
+            "market": np.array(MARKETS, dtype=object)[rng.integers(0, len(MARKETS), n_calls)],
+        }
+    )
+    call_idx = rng.integers(0, n_calls, n_attr_rows)
+    df_attrs = pd.DataFrame(
+        {
+            "call_id": ids[call_idx].astype(str),
+            "attr_type": np.array(ATTR_TYPES, dtype=object)[rng.integers(0, len(ATTR_TYPES), n_attr_rows)],
+            "attr_value": np.char.add("value_", rng.zipf(1.3, n_attr_rows).clip(max=n_values).astype(str)),
+        }
+    )
+    return df_calls, df_attrs
+
+
+def reference_frequency(df_calls, df_attrs, attr_type, date_range, selected_markets, selected_pipelines) -> pd.DataFrame:
+    def norm(s):
+        s = s.astype(str).str.strip()
+        s = s.str.replace(r"[{}]", "", regex=True)
+        return s.str.replace(r"^[\"']+|[\"']+$", "", regex=True)
+
+    calls = df_calls.copy()
+    calls["call_id"] = norm(calls["call_id"])
+    calls["call_date"] = pd.to_datetime(calls["call_datetime"], errors="coerce", utc=True).dt.date
+    calls["pipeline_name"] = calls["pipeline_name"].astype(str).str.strip()
+    market = calls["market"].astype(str).str.strip()
+    prefix = calls["pipeline_name"].str.split("|").str[0].str.split(" ").str[0].str.strip()
+    calls["market_norm"] = market.where(market != "", prefix)
+    mask = calls["call_id"] != ""
+    if date_range:
+        mask &= (calls["call_date"] >= date_range[0]) & (calls["call_date"] <= date_range[1])
+    if selected_markets:
+        mask &= calls["market_norm"].isin(selected_markets)
+    if selected_pipelines:
+        mask &= calls["pipeline_name"].isin(selected_pipelines)
+    calls = calls[mask]
+    attrs = df_attrs.copy()
+    attrs["call_id"] = norm(attrs["call_id"])
+    attrs = attrs[attrs["attr_type"].str.lower() == attr_type.lower()]
+    join = attrs.merge(calls[["call_id", "pipeline_name"]], on="call_id", how="inner")
+    totals = calls.groupby("pipeline_name")["call_id"].nunique().rename("total_calls")
+    agg = (
+        join.groupby(["pipeline_name", "attr_value"])
+        .agg(calls_with_attr=("call_id", "nunique"), mentions=("call_id", "size"))
+        .reset_index()
+        .merge(totals, on="pipeline_name", how="left")
+    )
+    agg["frequency"] = agg["calls_with_attr"] / agg["total_calls"]
+    return agg
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.sort_values(["pipeline_name", "attr_value"]).reset_index(drop=True)
+    out["pipeline_name"] = out["pipeline_name"].astype(str)
+    out["attr_value"] = out["attr_value"].astype(str)
+    return out.astype({"calls_with_attr": "int64", "mentions": "int64", "total_calls": "int64", "frequency": "float64"})
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized CMO attribute-frequency fallback.")
+    parser.add_argument("--sizes", default="100000,1000000,3000000", help="Comma-separated attribute row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reference-max", type=int, default=1000000, help="Skip the pandas reference above this size")
+    args = parser.parse_args()
+
+    filters = {
+        "date_range": (date(2025, 3, 1), date(2025, 9, 30)),
+        "selected_markets": ["CZ", "SK"],
+        "selected_pipelines": None,
+    }
+    print(f"{'attr_rows':>10} {'calls':>9} {'vectorized_s':>13} {'reference_s':>12} {'speedup':>8} {'rows/s':>12}")
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        df_calls, df_attrs = make_frames(size)
+        run = lambda: compute_attribute_frequency(df_calls, df_attrs, "goal", **filters)
+        fast = _timed(run, args.repeat)
+        ref_s = float("nan")
+        if size <= args.reference_max:
+            ref_call = lambda: reference_frequency(df_calls, df_attrs, "goal", **filters)
+            ref_s = _timed(ref_call, 1)
+            pd.testing.assert_frame_equal(_sorted(run()), _sorted(ref_call()), check_exact=False)
+        speedup = ref_s / fast if ref_s == ref_s else float("nan")
+        print(f"{size:>10} {len(df_calls):>9} {fast:>13.3f} {ref_s:>12.3f} {speedup:>8.1f} {size / fast:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psycopg2
+from psycopg2 import sql as pgsql
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import backfill_ads_data as backfill
+from fake_kommo import FakeKommo
+from kommo_fields import ADS_FIELD_MAPPING
+from synthetic_calls import table_columns
+
+DUPLICATE_EVERY = 500
+NULL_KEY_EVERY = 2000
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """The subset of the PostgREST query builder the backfill uses, run as SQL on a local connection."""
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.columns = None
+        self.filters = []
+        self.order_col = None
+        self.limit_n = None
+        self.negate = False
+
+    def select(self, columns):
+        self.columns = None if columns == "*" else columns.split(",")
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def _add(self, sql, params=()):
+        if self.negate:
+            sql = pgsql.SQL("NOT ({})").format(sql)
+            self.negate = False
+        self.filters.append((sql, params))
+        return self
+
+    def is_(self, col, value):
+        assert value == "null"
+        return self._add(pgsql.SQL("{} IS NULL").format(pgsql.Identifier(col)))
+
+    def gt(self, col, value):
+        return self._add(pgsql.SQL("{} > %s").format(pgsql.Identifier(col)), (value,))
+
+    def order(self, col):
+        self.order_col = col
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        cols = pgsql.SQL("*") if self.columns is None else pgsql.SQL(", ").join(map(pgsql.Identifier, self.columns))
+        query = pgsql.SQL("SELECT {cols} FROM {t}").format(cols=cols, t=pgsql.Identifier(self.table_name))
+        params = []
+        if self.filters:
+            query += pgsql.SQL(" WHERE ") + pgsql.SQL(" AND ").join(f for f, _ in self.filters)
+            for _, p in self.filters:
+                params.extend(p)
+        if self.order_col:
+            query += pgsql.SQL(" ORDER BY {}").format(pgsql.Identifier(self.order_col))
+        # Like a Supabase project, never return more than max_rows however large the requested limit.
+        query += pgsql.SQL(" LIMIT %s")
+        params.append(min(self.limit_n or self.client.max_rows, self.client.max_rows))
+        with self.client.conn.cursor() as cur:
+            cur.execute(query, params)
+            names = [d[0] for d in cur.description]
+            rows = [dict(zip(names, r)) for r in cur.fetchall()]
+        self.client.conn.commit()
+        self.client.requests += 1
+        return _Result(rows)
+
+
+class FakeSupabase:
+    def __init__(self, conn, max_rows=1000):
+        self.conn = conn
+        self.max_rows = max_rows
+        self.requests = 0
+
+    def table(self, table_name):
+        return FakeQuery(self, table_name)
+
+
+def seed_table(conn, table_name, calls, leads):
+    """Same columns as production (all text, no id): call_id is the only key, with some duplicates and NULLs."""
+    table = pgsql.Identifier(table_name)
+    with conn.cursor() as cur:
+        cur.execute(pgsql.SQL("DROP TABLE IF EXISTS {t}").format(t=table))
+        cur.execute(
+            pgsql.SQL("CREATE TABLE {t} ({cols})").format(
+                t=table,
+                cols=pgsql.SQL(", ").join(pgsql.SQL("{} text").format(pgsql.Identifier(c)) for c in table_columns()),
+            )
+        )
+        cur.execute(
+            pgsql.SQL(
+                "INSERT INTO {t} (call_id, lead_id) "
+                "SELECT CASE WHEN g %% %s = 0 THEN NULL ELSE 'call-' || lpad(g::text, 9, '0') END, "
+                "(1 + (hashtext(g::text) & 2147483647) %% %s)::text FROM generate_series(1, %s) g"
+            ).format(t=table),
+            (NULL_KEY_EVERY, leads, calls),
+        )
+        cur.execute(
+            pgsql.SQL("INSERT INTO {t} (call_id, lead_id) SELECT call_id, lead_id FROM {t} WHERE call_id IS NOT NULL "
+                      "AND right(call_id, 9)::int %% %s = 0").format(t=table),
+            (DUPLICATE_EVERY,),
+        )
+        cur.execute(pgsql.SQL("CREATE INDEX ON {t} (call_id)").format(t=table))
+    conn.commit()
+
+
+def pending_rows(conn, table_name):
+    missing = pgsql.SQL(" AND ").join(
+        pgsql.SQL("{} IS NULL").format(pgsql.Identifier(c)) for c in backfill.MISSING_ADS_COLUMNS
+    )
+    with conn.cursor() as cur:
+        cur.execute(
+            pgsql.SQL(
+                "SELECT count(*), count(*) FILTER (WHERE call_id IS NULL), count(DISTINCT lead_id) FROM {t} WHERE {m}"
+            ).format(t=pgsql.Identifier(table_name), m=missing)
+        )
+        total, null_key, leads = cur.fetchone()
+    conn.commit()
+    return {"rows": total, "null_key": null_key, "leads": leads}
+
+
+def run_once(args, fake, conn, cache_path, checkpoint_path):
+    supabase = FakeSupabase(conn, max_rows=args.max_rows)
+    secrets = {
+        "supabase": {"url": "http://fake-supabase", "service_role_key": "bench"},
+        "kommo": {"api_token": "bench", "domain": fake.url},
+    }
+    before = pending_rows(conn, args.table)
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        totals = backfill.backfill_data(
+            table_name=args.table,
+            use_cache=cache_path is not None,
+            cache_path=cache_path or backfill.LEAD_CACHE_PATH,
+            page_size=args.page_size,
+            checkpoint_path=checkpoint_path,
+            rps=args.client_rps,
+            concurrency=args.concurrency,
+            secrets=secrets,
+            supabase=supabase,
+            db_conn=conn,
+        ) or {}
+    finally:
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+        if args.trace_memory:
+            tracemalloc.stop()
+    after = pending_rows(conn, args.table)
+    return {
+        "pages": totals.get("pages", 0),
+        "seconds": round(seconds, 3),
+        "leads": before["leads"],
+        "leads_fetched": totals.get("fetched", 0),
+        "leads_from_cache": totals.get("reused", 0),
+        "leads_per_sec": round(before["leads"] / seconds, 1) if seconds else None,
+        "rows_pending_before": before["rows"],
+        "rows_updated": totals.get("updated", 0),
+        "rows_pending_after": after["rows"],
+        "rows_without_key": after["null_key"],
+        "errors": totals.get("errors", 0),
+        "checkpoint_left": os.path.exists(checkpoint_path),
+        "supabase_requests": supabase.requests,
+        "client_requests": totals.get("requests", 0),
+        "client_throttled": totals.get("throttled", 0),
+        "write_rows_per_sec": round(totals["updated"] / totals["seconds"]) if totals.get("seconds") else None,
+        "peak_python_mb": round(peak / 1_048_576, 1) if peak is not None else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end backfill_data benchmark: fake Kommo server, fake PostgREST over a local Postgres table."
+    )
+    parser.add_argument("--dsn", default=os.getenv("BENCH_PG_DSN", "postgresql://postgres@localhost:5432/postgres"))
+    parser.add_argument("--table", default="bench_calls_raw", help="Scratch table, dropped and recreated")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=backfill.PAGE_SIZE)
+    parser.add_argument("--max-rows", type=int, default=1000, help="Row cap of the fake PostgREST (Supabase default)")
+    parser.add_argument("--server-rps", type=float, default=7.0)
+    parser.add_argument("--client-rps", type=float, default=backfill.KOMMO_RPS)
+    parser.add_argument("--concurrency", type=int, default=backfill.KOMMO_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    parser.add_argument("--no-cache", action="store_true", help="Skip the lead cache (and the warm second run)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report peak Python heap via tracemalloc (slows the run considerably)")
+    args = parser.parse_args()
+
+    fake = FakeKommo(rps=args.server_rps, latency_ms=args.latency_ms).start()
+    conn = psycopg2.connect(args.dsn)
+    report = {
+        "calls": args.calls,
+        "leads": args.leads,
+        "server_rps": args.server_rps,
+        "client_rps": args.client_rps,
+        "latency_ms": args.latency_ms,
+    }
+    try:
+        seed_table(conn, args.table, args.calls, args.leads)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = None if args.no_cache else os.path.join(tmp, "kommo_leads.sqlite")
+            checkpoint_path = os.path.join(tmp, "backfill_checkpoint.json")
+            report["cold"] = run_once(args, fake, conn, cache_path, checkpoint_path)
+            if cache_path:
+                # Second pass: reset the ads columns so every row is pending again; leads come from the cache.
+                with conn.cursor() as cur:
+                    cur.execute(
+                        pgsql.SQL("UPDATE {t} SET {cols}").format(
+                            t=pgsql.Identifier(args.table),
+                            cols=pgsql.SQL(", ").join(
+                                pgsql.SQL("{} = NULL").format(pgsql.Identifier(c)) for c in ADS_FIELD_MAPPING
+                            ),
+                        )
+                    )
+                conn.commit()
+                report["warm"] = run_once(args, fake, conn, cache_path, checkpoint_path)
+        report["server"] = dict(fake.stats)
+    finally:
+        conn.close()
+        fake.stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from kommo_fields import ADS_FIELD_MAPPING, CATALOG_PATH, FieldExtractor
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_catalog_split = {}
+
+
+def _split_catalog(catalog):
+    key = id(catalog)
+    if key not in _catalog_split:
+        ads_names = {k for keys in ADS_FIELD_MAPPING.values() for k in keys}
+        is_ads = [f.get("name") in ads_names or f.get("code") in ads_names for f in catalog]
+        _catalog_split[key] = (
+            [f for f, ads in zip(catalog, is_ads) if ads],
+            [f for f, ads in zip(catalog, is_ads) if not ads],
+        )
+    return _catalog_split[key]
+
+
+def synthetic_lead(lead_id, rng, catalog, ads_share=0.7, extra_fields=12):
+    """Lead payload shaped like /api/v4/leads output, with custom fields drawn from the catalog."""
+    ads_fields, other_fields = _split_catalog(catalog)
+    fields = []
+    if rng.random() < ads_share:
+        fields += rng.sample(ads_fields, k=rng.randint(len(ads_fields) // 3, len(ads_fields)))
+    fields += rng.sample(other_fields, k=min(extra_fields, len(other_fields)))
+    rng.shuffle(fields)
+    return {
+        "id": lead_id,
+        "name": f"Lead #{lead_id}",
+        "updated_at": 1760000000 + rng.randint(0, 10_000_000),
+        "custom_fields_values": [
+            {
+                "field_id": f["id"],
+                "field_name": f.get("name"),
+                "field_code": f.get("code"),
+                "field_type": f.get("type"),
+                "values": [{"value": f"{f.get('name')}-{rng.randint(1, 500)}"}],
+            }
+            for f in fields
+        ],
+    }
+
+
+def legacy_map(lead_data):
+    # Previous map_kommo_fields: name/code dict per lead, then probe the mapping.
+    if not lead_data or "custom_fields_values" not in lead_data:
+        return {}
+    cf_lookup = {}
+    for cf in lead_data["custom_fields_values"] or []:
+        values = cf.get("values", [])
+        val = values[0].get("value") if values else None
+        if cf.get("field_name"):
+            cf_lookup[cf["field_name"]] = val
+        if cf.get("field_code"):
+            cf_lookup[cf["field_code"]] = val
+    updates = {}
+    for col, keys in ADS_FIELD_MAPPING.items():
+        for key in keys:
+            if key in cf_lookup:
+                updates[col] = cf_lookup[key]
+                break
+    return updates
+
+
+def load_recorded(path):
+    if path.endswith(".sqlite"):
+        conn = sqlite3.connect(path)
+        try:
+            return [json.loads(p) for (p,) in conn.execute("SELECT payload FROM kommo_leads")]
+        finally:
+            conn.close()
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return (data.get("_embedded") or {}).get("leads") or [] if isinstance(data, dict) else data
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark the compiled Kommo ads field extractor.")
+    parser.add_argument("--payloads", help="Recorded leads: .sqlite lead cache, .jsonl, or a list-endpoint .json")
+    parser.add_argument("--count", type=int, default=50000, help="Synthetic leads when no recording is given")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    if args.payloads:
+        leads = load_recorded(args.payloads)
+        source = args.payloads
+    else:
+        rng = random.Random(args.seed)
+        leads = [synthetic_lead(i, rng, catalog) for i in range(1, args.count + 1)]
+        source = "synthetic"
+
+    t0 = time.perf_counter()
+    extractor = FieldExtractor(catalog)
+    compile_ms = (time.perf_counter() - t0) * 1000
+    response = {"_embedded": {"leads": leads}}
+
+    legacy_s = _best_of(lambda: [legacy_map(lead) for lead in leads], args.repeat)
+    compiled_s = _best_of(lambda: [extractor.extract(lead) for lead in leads], args.repeat)
+    batched_s = _best_of(lambda: extractor.extract_many(response), args.repeat)
+    mismatches = sum(legacy_map(lead) != extractor.extract(lead) for lead in leads)
+
+    print(json.dumps(
+        {
+            "source": source,
+            "leads": len(leads),
+            "compile_ms": round(compile_ms, 2),
+            "legacy_us_per_lead": round(legacy_s / len(leads) * 1e6, 3),
+            "compiled_us_per_lead": round(compiled_s / len(leads) * 1e6, 3),
+            "batched_us_per_lead": round(batched_s / len(leads) * 1e6, 3),
+            "speedup": round(legacy_s / compiled_s, 2),
+            # Non-zero only when a payload carries two catalog fields with the same name.
+            "mismatches_vs_legacy": mismatches,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
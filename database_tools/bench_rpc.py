@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2 import sql as pgsql
+
+PRESETS = ("prev_day", "prev_week", "prev_month", "all_time")
+# Values for the non-filter arguments some rpc_* functions require.
+EXTRA_ARGS = {
+    "attr_type": "goal",
+    "attr_types": ["goal", "objection", "fear"],
+}
+
+
+def preset_range(preset, today):
+    """Same date ranges as the sidebar presets in app.py (ops days are Mon-Fri)."""
+    if preset == "prev_day":
+        d = today - timedelta(days=1)
+        while d.weekday() > 4:
+            d -= timedelta(days=1)
+        return d, d
+    if preset == "prev_week":
+        prev_monday = today - timedelta(days=today.weekday() + 7)
+        return prev_monday, prev_monday + timedelta(days=4)
+    if preset == "prev_month":
+        last = date(today.year, today.month, 1) - timedelta(days=1)
+        return date(last.year, last.month, 1), last
+    return None, None
+
+
+def list_rpcs(cur, pattern="rpc_%"):
+    cur.execute(
+        """
+        SELECT p.proname, COALESCE(p.proargnames, ARRAY[]::text[]), p.pronargs
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE n.nspname = 'public' AND p.proname LIKE %s
+        ORDER BY p.proname
+        """,
+        (pattern,),
+    )
+    return [(name, list(argnames[:nargs])) for name, argnames, nargs in cur.fetchall()]
+
+
+def build_call(name, argnames, date_start, date_end, overrides=None):
+    params = {}
+    for arg in argnames:
+        if arg == "date_start":
+            params[arg] = date_start
+        elif arg == "date_end":
+            params[arg] = date_end
+        elif overrides and arg in overrides:
+            params[arg] = overrides[arg]
+        elif arg in EXTRA_ARGS:
+            params[arg] = EXTRA_ARGS[arg]
+    query = pgsql.SQL("SELECT * FROM {fn}({args})").format(
+        fn=pgsql.Identifier(name),
+        args=pgsql.SQL(", ").join(
+            pgsql.SQL("{} => {}").format(pgsql.Identifier(k), pgsql.Placeholder(k)) for k in params
+        ),
+    )
+    return query, params
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def time_call(cur, query, params, repeat, warmup):
+    timings = []
+    rows = 0
+    for i in range(warmup + repeat):
+        t0 = time.perf_counter()
+        cur.execute(query, params)
+        rows = len(cur.fetchall())
+        if i >= warmup:
+            timings.append((time.perf_counter() - t0) * 1000)
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "min_ms": round(min(timings), 2),
+        "rows": rows,
+    }
+
+
+def dataset_info(cur, table_name):
+    cur.execute("SHOW server_version")
+    version = cur.fetchone()[0]
+    cur.execute(
+        pgsql.SQL("SELECT count(*), min(app_call_date(call_datetime::text)), max(app_call_date(call_datetime::text)) "
+                  "FROM {t}").format(t=pgsql.Identifier(table_name))
+    )
+    calls, first, last = cur.fetchone()
+    cur.execute("SELECT count(*) FROM call_attributes")
+    attrs = cur.fetchone()[0]
+    return {
+        "server_version": version,
+        "calls": calls,
+        "call_attributes": attrs,
+        "first_call_date": first.isoformat() if first else None,
+        "last_call_date": last.isoformat() if last else None,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["rpc"], r["preset"]): r for r in json.load(f).get("results", [])}
+    for r in results:
+        base = baseline.get((r["rpc"], r["preset"]))
+        if base and base.get("p50_ms"):
+            r["baseline_p50_ms"] = base["p50_ms"]
+            r["p50_ratio"] = round(r["p50_ms"] / base["p50_ms"], 3)
+            r["rows_changed"] = base.get("rows") != r["rows"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every rpc_* function under the sidebar date presets.")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_PG_DSN", "postgresql://postgres@localhost:5432/postgres"))
+    parser.add_argument("--table", default="Algonova_Calls_Raw")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="Anchor for the presets (default: day after the last call in the table)")
+    parser.add_argument("--presets", default=",".join(PRESETS))
+    parser.add_argument("--only", default=None, help="Comma-separated rpc names")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this path as well")
+    parser.add_argument("--baseline", help="Previous report; adds p50_ratio per rpc/preset")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.dsn)
+    conn.set_session(readonly=True, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout TO 0")
+            info = dataset_info(cur, args.table)
+            today = args.today or (
+                date.fromisoformat(info["last_call_date"]) + timedelta(days=1) if info["last_call_date"] else date.today()
+            )
+            only = set(args.only.split(",")) if args.only else None
+            rpcs = [(n, a) for n, a in list_rpcs(cur) if only is None or n in only]
+            results = []
+            for preset in args.presets.split(","):
+                date_start, date_end = preset_range(preset, today)
+                for name, argnames in rpcs:
+                    if "date_start" not in argnames and preset != "all_time":
+                        # Filter-less lookups (markets/pipelines, managers) do not depend on the preset.
+                        continue
+                    query, params = build_call(name, argnames, date_start, date_end)
+                    try:
+                        timing = time_call(cur, query, params, args.repeat, args.warmup)
+                    except Exception as e:
+                        timing = {"error": f"{type(e).__name__}: {str(e).strip().splitlines()[0]}"}
+                    print(f"  {preset:<10} {name:<45} {timing.get('p50_ms', timing.get('error'))}", file=sys.stderr)
+                    results.append({
+                        "rpc": name,
+                        "preset": preset,
+                        "date_start": date_start.isoformat() if date_start else None,
+                        "date_end": date_end.isoformat() if date_end else None,
+                        **timing,
+                    })
+    finally:
+        conn.close()
+
+    if args.baseline:
+        compare(results, args.baseline)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "today": today.isoformat(),
+        "repeat": args.repeat,
+        "dataset": info,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
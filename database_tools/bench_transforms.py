@@ -0,0 +1,192 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import database
+from views import cmo_view, cso_view
+from synthetic_calls import CHUNK_ROWS, LeadTable, generate_chunk
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_transforms_baseline.json")
+SIZES = (10_000, 100_000, 1_000_000)
+END_DATE = date(2026, 1, 31)
+SCORE_COLUMNS = (
+    "score_control",
+    "sales_discovery_score",
+    "sales_objection_handling_score",
+    "followup_next_action_score",
+)
+PRIMARY_TYPES = ["intro_call", "sales_call"]
+FOLLOWUP_TYPES = ["intro_followup", "sales_followup"]
+
+
+def calls_frame(rows, seed=7):
+    """v_analytics_calls-shaped frame as PostgREST returns it: every value a string (or None)."""
+    lead_table = LeadTable(seed, max(1, rows // 3), END_DATE - timedelta(days=364), 365)
+    parts = [
+        generate_chunk(seed, idx, first, min(CHUNK_ROWS, rows - first), lead_table, END_DATE)
+        for idx, first in enumerate(range(0, rows, CHUNK_ROWS))
+    ]
+    df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    rng = np.random.default_rng([seed, 99])
+    for col in SCORE_COLUMNS:
+        scores = np.char.replace(np.round(rng.uniform(0, 10, rows), 1).astype(str), ".", ",")
+        df[col] = np.where(rng.random(rows) < 0.15, None, scores.astype(object))
+    return df
+
+
+def attribute_frequency_frame(rows, seed=7):
+    # One row per (attribute value, pipeline) pair, as returned by rpc_cmo_entity_frequency.
+    rng = np.random.default_rng([seed, 100])
+    pipelines = [f"{m} {k}" for m in ("CZ", "SK", "RUK", "PL") for k in ("Main", "Webinar", "Partners")]
+    values = max(1, rows // (100 * len(pipelines)))
+    attr = np.repeat([f"value {i:05d}" for i in range(values)], len(pipelines))
+    total = rng.integers(50, 5000, size=len(attr))
+    with_attr = (total * rng.uniform(0, 0.6, size=len(attr))).astype(int)
+    return pd.DataFrame({
+        "pipeline_name": np.tile(pipelines, values),
+        "attr_value": attr,
+        "calls_with_attr": with_attr,
+        "mentions": with_attr + rng.integers(0, 50, size=len(attr)),
+        "total_calls": total,
+        "frequency": with_attr / total,
+    })
+
+
+def intro_friction_frame(rows, seed=7):
+    # rpc_cmo_intro_friction_heatmap rows: one per (market, traffic manager).
+    rng = np.random.default_rng([seed, 101])
+    markets = ["CZ", "SK", "RUK", "PL", "SWI", "Unknown"]
+    managers = max(1, rows // (100 * len(markets)))
+    intro = rng.integers(0, 400, size=managers * len(markets))
+    flups = (intro * rng.uniform(0, 1.5, size=len(intro))).astype(int)
+    return pd.DataFrame({
+        "mkt_market": np.repeat(markets, managers),
+        "mkt_manager": np.tile([f"Traffic Manager {i:03d}" for i in range(managers)], len(markets)),
+        "intro_calls": intro.astype(str),
+        "intro_flups": flups.astype(str),
+        "calls_in_calc": (intro + flups).astype(str),
+        "intro_friction_index": np.round(flups / np.maximum(intro, 1), 2).astype(str),
+    })
+
+
+def _cso_quality(df, date_range, markets):
+    cso_view.fetch_view_data = lambda view_name, *args, **kwargs: df
+    return cso_view._load_cso_quality_df(date_range, markets, None)
+
+
+def cases(rows):
+    """name -> (setup() returning args, fn). Setup runs outside the timed region."""
+    calls = calls_frame(rows)
+    normalized = database.normalize_calls_df(calls)
+    freq = attribute_frequency_frame(rows)
+    by_mm = intro_friction_frame(rows)
+    last_month = [END_DATE - timedelta(days=30), END_DATE]
+    return {
+        "normalize_calls_df": (lambda: (calls,), database.normalize_calls_df),
+        "add_outcome_category": (lambda: (normalized,), database.add_outcome_category),
+        "compute_friction_index": (
+            lambda: (normalized, ["manager", "pipeline_name"], PRIMARY_TYPES, FOLLOWUP_TYPES),
+            database.compute_friction_index,
+        ),
+        "to_num": (lambda: (calls["Average_quality"],), cso_view._to_num),
+        "load_cso_quality_df": (lambda: (calls, last_month, ["CZ", "SK"]), _cso_quality),
+        "load_cso_quality_df_all_time": (lambda: (calls, [], None), _cso_quality),
+        # The prepare helpers add columns to their input, so each run gets a fresh copy.
+        "cmo_attribute_heatmap": (lambda: (freq.copy(),), cmo_view._prepare_attribute_heatmap),
+        "cmo_intro_friction_heatmap": (lambda: (by_mm.copy(),), cmo_view._prepare_intro_friction_heatmap),
+    }
+
+
+def measure(setup, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+        del args
+    # Separate traced run: tracemalloc slows pandas down too much to time under it.
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": round(best, 5), "peak_mb": round(peak / 1_048_576, 2)}
+
+
+def regressions(results, baseline, time_tol, mem_tol):
+    found = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        # Absolute slack keeps timer noise on the 10k cases from failing the run.
+        if cur["seconds"] > base["seconds"] * (1 + time_tol) and cur["seconds"] - base["seconds"] > 0.005:
+            found.append(f"{key}: time {base['seconds']}s -> {cur['seconds']}s")
+        if cur["peak_mb"] > base["peak_mb"] * (1 + mem_tol) and cur["peak_mb"] - base["peak_mb"] > 1.0:
+            found.append(f"{key}: peak {base['peak_mb']}MB -> {cur['peak_mb']}MB")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pandas transforms behind the dashboards; fails on regressions against a baseline."
+    )
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES))
+    parser.add_argument("--only", default=None, help="Comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    # cso_view's weekly bucketing warns about dropping the timezone on every call.
+    warnings.filterwarnings("ignore", category=UserWarning)
+    only = set(args.only.split(",")) if args.only else None
+    results = {}
+    for rows in (int(s) for s in args.sizes.split(",")):
+        for name, (setup, fn) in cases(rows).items():
+            if only and name not in only:
+                continue
+            key = f"{name}[{rows}]"
+            results[key] = measure(setup, fn, args.repeat)
+            print(f"  {key:<45} {results[key]['seconds'] * 1000:>10.1f} ms {results[key]['peak_mb']:>9.1f} MB",
+                  file=sys.stderr)
+
+    report = {"pandas": pd.__version__, "numpy": np.__version__, "results": results}
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; run with --save-baseline first.")
+            sys.exit(1)
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = regressions(
+            results, baseline.get("results", {}), args.time_tolerance, args.memory_tolerance
+        )
+    print(json.dumps(report, indent=2))
+    if report.get("regressions"):
+        print("❌ Regressions against " + args.baseline + ":\n  " + "\n  ".join(report["regressions"]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
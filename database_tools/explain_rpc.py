@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2 import sql as pgsql
+
+from apply_sql_views import _load_secrets, connect_db
+from bench_rpc import build_call, dataset_info, list_rpcs, preset_range
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+OUT_DIR = os.path.join(ROOT, ".cache", "explain")
+# (name, sidebar preset, extra rpc arguments); "{market}" is replaced by --market.
+PARAM_SETS = (
+    ("prev_day", "prev_day", {}),
+    ("prev_week", "prev_week", {}),
+    ("prev_month", "prev_month", {}),
+    ("prev_month_one_market", "prev_month", {"markets": ["{market}"]}),
+    ("all_time", "all_time", {}),
+)
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def plan_shape(node):
+    """Node types, relations/indexes and join strategies; aliases and costs are left out."""
+    return [
+        node.get("Node Type"),
+        node.get("Relation Name") or node.get("Index Name") or "",
+        node.get("Join Type", ""),
+        node.get("Strategy", ""),
+        [plan_shape(c) for c in node.get("Plans", [])],
+    ]
+
+
+def fingerprint(plan):
+    return hashlib.sha1(json.dumps(plan_shape(plan["Plan"])).encode("utf-8")).hexdigest()[:12]
+
+
+def plan_flags(plan, seq_scan_rows, misestimate_factor, misestimate_rows):
+    flags = []
+    for node in _walk(plan["Plan"]):
+        loops = node.get("Actual Loops", 0)
+        if not loops:
+            continue
+        actual = node.get("Actual Rows", 0)
+        estimated = node.get("Plan Rows", 0)
+        if node.get("Node Type") == "Seq Scan":
+            scanned = (actual + node.get("Rows Removed by Filter", 0)) * loops
+            if scanned >= seq_scan_rows:
+                flags.append({
+                    "kind": "seq_scan",
+                    "relation": node.get("Relation Name"),
+                    "rows_scanned": int(scanned),
+                    "rows_kept": int(actual * loops),
+                })
+        # Both counts are per loop.
+        hi, lo = max(actual, estimated), max(min(actual, estimated), 1)
+        if hi >= misestimate_rows and hi / lo >= misestimate_factor:
+            flags.append({
+                "kind": "misestimate",
+                "node": node.get("Node Type"),
+                "relation": node.get("Relation Name") or node.get("CTE Name") or node.get("Index Name"),
+                "estimated": int(estimated),
+                "actual": int(actual),
+                "ratio": round(hi / lo, 1),
+            })
+    return flags
+
+
+def explain(cur, query, params):
+    # Rolled back so EXPLAIN ANALYZE cannot leave anything behind, even for a volatile function.
+    cur.execute("BEGIN")
+    try:
+        cur.execute(pgsql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") + query, params)
+        return cur.fetchone()[0][0]
+    finally:
+        cur.execute("ROLLBACK")
+
+
+def _flag_key(flag):
+    return flag["kind"], flag.get("relation"), flag.get("node")
+
+
+def compare(results, previous, slowdown, min_delta_ms):
+    """Mark plan changes, slowdowns and new flags against the previous run; returns the regressions."""
+    prev = {(r["rpc"], r["param_set"]): r for r in previous.get("results", [])}
+    regressions = []
+    for r in results:
+        base = prev.get((r["rpc"], r["param_set"]))
+        if not base or "error" in r or "error" in base:
+            continue
+        changes = []
+        if base["fingerprint"] != r["fingerprint"]:
+            changes.append(f"plan changed {base['fingerprint']} -> {r['fingerprint']}")
+        if (r["execution_ms"] > base["execution_ms"] * slowdown
+                and r["execution_ms"] - base["execution_ms"] >= min_delta_ms):
+            changes.append(f"slower {base['execution_ms']:.1f} -> {r['execution_ms']:.1f} ms")
+        old_flags = {_flag_key(f) for f in base.get("flags", [])}
+        for flag in r["flags"]:
+            if _flag_key(flag) not in old_flags:
+                changes.append(f"new {flag['kind']} on {flag.get('relation') or flag.get('node')}")
+        r["baseline_execution_ms"] = base["execution_ms"]
+        r["changes"] = changes
+        if changes:
+            regressions.append(f"{r['rpc']} [{r['param_set']}]: " + "; ".join(changes))
+    return regressions
+
+
+def _previous_run(out_dir, exclude):
+    if not os.path.isdir(out_dir):
+        return None
+    runs = sorted(d for d in os.listdir(out_dir) if d.startswith("run-") and d != exclude)
+    for name in reversed(runs):
+        path = os.path.join(out_dir, name, "summary.json")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN (ANALYZE, BUFFERS) every rpc_* function; flags seq scans, misestimates and plan changes."
+    )
+    parser.add_argument("--dsn", default=os.getenv("EXPLAIN_PG_DSN"),
+                        help="Postgres DSN (default: [database] in .streamlit/secrets.toml)")
+    parser.add_argument("--table", default="Algonova_Calls_Raw")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="Anchor for the presets (default: day after the last call in the table)")
+    parser.add_argument("--market", default="CZ", help="Market used by the single-market parameter set")
+    parser.add_argument("--only", default=None, help="Comma-separated rpc names")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--baseline", default=None, help="summary.json to compare with (default: the previous run)")
+    parser.add_argument("--timeout", type=int, default=120, help="statement_timeout per EXPLAIN, seconds")
+    parser.add_argument("--seq-scan-rows", type=int, default=10_000)
+    parser.add_argument("--misestimate-factor", type=float, default=10.0)
+    parser.add_argument("--misestimate-rows", type=int, default=1_000)
+    parser.add_argument("--slowdown", type=float, default=1.5)
+    parser.add_argument("--min-delta-ms", type=float, default=50.0)
+    parser.add_argument("--strict", action="store_true", help="Also fail on seq scans/misestimates seen before")
+    args = parser.parse_args()
+
+    if args.dsn:
+        conn = psycopg2.connect(args.dsn)
+    else:
+        secrets = _load_secrets()
+        conn = connect_db(secrets["database"])
+    conn.autocommit = True
+
+    run_name = "run-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    run_dir = os.path.join(args.out_dir, run_name)
+    os.makedirs(run_dir, exist_ok=True)
+    results = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout TO %s", (args.timeout * 1000,))
+            info = dataset_info(cur, args.table)
+            today = args.today or (
+                date.fromisoformat(info["last_call_date"]) + timedelta(days=1) if info["last_call_date"] else date.today()
+            )
+            only = set(args.only.split(",")) if args.only else None
+            rpcs = [(n, a) for n, a in list_rpcs(cur) if only is None or n in only]
+            for set_name, preset, extra in PARAM_SETS:
+                date_start, date_end = preset_range(preset, today)
+                overrides = {k: [args.market if v == "{market}" else v for v in vals] for k, vals in extra.items()}
+                for name, argnames in rpcs:
+                    if preset != "all_time" and "date_start" not in argnames:
+                        continue
+                    if overrides and not set(overrides) & set(argnames):
+                        continue
+                    query, params = build_call(name, argnames, date_start, date_end, overrides)
+                    record = {"rpc": name, "param_set": set_name, "params": {k: str(v) for k, v in params.items()}}
+                    try:
+                        plan = explain(cur, query, params)
+                    except Exception as e:
+                        record["error"] = f"{type(e).__name__}: {str(e).strip().splitlines()[0]}"
+                        results.append(record)
+                        print(f"  {set_name:<22} {name:<45} ❌ {record['error']}", file=sys.stderr)
+                        continue
+                    plan_file = f"{name}__{set_name}.json"
+                    with open(os.path.join(run_dir, plan_file), "w", encoding="utf-8") as f:
+                        json.dump(plan, f, indent=1)
+                    top = plan["Plan"]
+                    record.update({
+                        "execution_ms": round(plan.get("Execution Time", 0.0), 2),
+                        "planning_ms": round(plan.get("Planning Time", 0.0), 2),
+                        "rows": top.get("Actual Rows"),
+                        "shared_hit_blocks": top.get("Shared Hit Blocks"),
+                        "shared_read_blocks": top.get("Shared Read Blocks"),
+                        "temp_written_blocks": top.get("Temp Written Blocks"),
+                        "fingerprint": fingerprint(plan),
+                        "flags": plan_flags(plan, args.seq_scan_rows, args.misestimate_factor, args.misestimate_rows),
+                        "plan_file": plan_file,
+                    })
+                    results.append(record)
+                    kinds = sorted({f["kind"] for f in record["flags"]})
+                    print(f"  {set_name:<22} {name:<45} {record['execution_ms']:>10.1f} ms  {','.join(kinds)}",
+                          file=sys.stderr)
+    finally:
+        conn.close()
+
+    baseline_path = args.baseline or _previous_run(args.out_dir, run_name)
+    regressions = []
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.slowdown, args.min_delta_ms)
+    flagged = [
+        f"{r['rpc']} [{r['param_set']}]: " + ", ".join(sorted({f['kind'] for f in r['flags']}))
+        for r in results if r.get("flags")
+    ]
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "today": today.isoformat(),
+        "dataset": info,
+        "baseline": baseline_path,
+        "results": results,
+        "regressions": regressions,
+    }
+    with open(os.path.join(run_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    errors = [r for r in results if "error" in r]
+    print(f"📁 Plans saved to {run_dir}")
+    print(f"📊 {len(results)} plans, {len(flagged)} with seq scans/misestimates, {len(errors)} errors")
+    if baseline_path:
+        print(f"🔍 Compared with {baseline_path}")
+    if regressions:
+        print("❌ Changes against the previous run:\n  " + "\n  ".join(regressions))
+    if regressions or errors or (args.strict and flagged):
+        sys.exit(1)
+    print("✅ No plan regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench_kommo_extractor import load_catalog, synthetic_lead
+
+
+class FakeKommo:
+    """
+    Local stand-in for the Kommo v4 leads API:
+      GET /api/v4/leads/{id}   -> 200 lead, or 204 when the lead does not exist
+      GET /api/v4/leads?filter[id][]=..&filter[updated_at][from]=..&limit=..&page=..
+                               -> 200 {_embedded: {leads}, _links: {next?}}, or 204 when empty
+      GET /__stats             -> request counters
+    A global token bucket answers 429 (with Retry-After) above `rps`; every request sleeps `latency_ms`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rps=7.0, latency_ms=120.0, missing_every=50, seed=7):
+        self.rps = float(rps)
+        self.latency = latency_ms / 1000.0
+        self.missing_every = missing_every
+        self.seed = seed
+        self.catalog = load_catalog()
+        self.leads = {}
+        self.stats = {"requests": 0, "ok": 0, "no_content": 0, "throttled": 0, "leads_served": 0}
+        self._lock = threading.Lock()
+        self._tokens = self.rps
+        self._updated = time.monotonic()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def lead(self, lead_id):
+        if lead_id <= 0 or (self.missing_every and lead_id % self.missing_every == 0):
+            return None
+        lead = self.leads.get(lead_id)
+        if lead is None:
+            lead = synthetic_lead(lead_id, random.Random(self.seed * 1_000_003 + lead_id), self.catalog)
+            self.leads[lead_id] = lead
+        return lead
+
+    def _take_token(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rps, self._tokens + (now - self._updated) * self.rps)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=None, headers=None):
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if body is not None:
+                    self.send_header("Content-Type", "application/hal+json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if payload:
+                    self.wfile.write(payload)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path == "/__stats":
+                    with fake._lock:
+                        return self._send(200, dict(fake.stats))
+                fake._count("requests")
+                if not fake._take_token():
+                    fake._count("throttled")
+                    return self._send(429, {"title": "Too Many Requests", "status": 429}, {"Retry-After": "1"})
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                parts = parsed.path.rstrip("/").split("/")
+                if parsed.path.startswith("/api/v4/leads/") and parts[-1].isdigit():
+                    lead = fake.lead(int(parts[-1]))
+                    if lead is None:
+                        fake._count("no_content")
+                        return self._send(204)
+                    fake._count("ok")
+                    fake._count("leads_served")
+                    return self._send(200, lead)
+                if parsed.path.rstrip("/") != "/api/v4/leads":
+                    return self._send(404, {"title": "Not Found", "status": 404})
+
+                query = parse_qs(parsed.query)
+                limit = min(250, int((query.get("limit") or ["50"])[0]))
+                page = max(1, int((query.get("page") or ["1"])[0]))
+                since = query.get("filter[updated_at][from]")
+                ids = [int(v) for v in query.get("filter[id][]", []) if v.isdigit()]
+                leads = [lead for lead in (fake.lead(i) for i in dict.fromkeys(ids)) if lead is not None]
+                if since:
+                    leads = [lead for lead in leads if lead["updated_at"] >= int(since[0])]
+                chunk = leads[(page - 1) * limit:page * limit]
+                if not chunk:
+                    fake._count("no_content")
+                    return self._send(204)
+                links = {"self": {"href": f"{fake.url}{parsed.path}?page={page}"}}
+                if page * limit < len(leads):
+                    links["next"] = {"href": f"{fake.url}{parsed.path}?page={page + 1}"}
+                fake._count("ok")
+                fake._count("leads_served", len(chunk))
+                return self._send(200, {"_page": page, "_links": links, "_embedded": {"leads": chunk}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Kommo leads API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rps", type=float, default=7.0)
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    parser.add_argument("--missing-every", type=int, default=50, help="Every Nth lead id answers 204 / is omitted")
+    args = parser.parse_args()
+    fake = FakeKommo(port=args.port, rps=args.rps, latency_ms=args.latency_ms, missing_every=args.missing_every)
+    print(f"Fake Kommo listening on {fake.url} (rps={args.rps}, latency={args.latency_ms}ms)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
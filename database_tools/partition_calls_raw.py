@@ -0,0 +1,519 @@
+import argparse
+import time
+from datetime import date
+
+from psycopg2 import sql as pgsql
+
+from apply_sql_views import (
+    CHART_VIEWS_SQL,
+    _load_secrets,
+    _read_sql,
+    _split_sql_statements,
+    connect_db,
+    execute_statements,
+)
+
+SOURCE_TABLE = "Algonova_Calls_Raw"
+STAGING_TABLE = "Algonova_Calls_Raw_partitioned"
+ARCHIVE_TABLE = "Algonova_Calls_Raw_unpartitioned"
+DEFAULT_PARTITION = "Algonova_Calls_Raw_default"
+PARTITION_KEY = "app_call_date(call_datetime::text)"
+MIRROR_LOCK_KEY = 20260119
+MONTHS_AHEAD = 3
+
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _add_months(d: date, months: int) -> date:
+    idx = d.year * 12 + (d.month - 1) + months
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def _partition_name(parent: str, month: date) -> str:
+    base = SOURCE_TABLE if parent == STAGING_TABLE else parent
+    return f"{base}_{month:%Y_%m}"
+
+
+def _month_range(first: date, last: date) -> list[date]:
+    months = []
+    m = _month_start(first)
+    while m <= last:
+        months.append(m)
+        m = _add_months(m, 1)
+    return months
+
+
+def _ensure_call_date_function(cur):
+    prefixes = ("CREATE OR REPLACE FUNCTION app_call_date(", "CREATE OR REPLACE FUNCTION app_normalize_call_id(")
+    statements = [s for s in _split_sql_statements(_read_sql(CHART_VIEWS_SQL)) if s.startswith(prefixes)]
+    execute_statements(cur, statements)
+
+
+def _source_month_bounds(cur) -> tuple[date | None, date | None]:
+    cur.execute(
+        pgsql.SQL("SELECT MIN({key}), MAX({key}) FROM {tbl}").format(
+            key=pgsql.SQL(PARTITION_KEY),
+            tbl=pgsql.Identifier(SOURCE_TABLE),
+        )
+    )
+    lo, hi = cur.fetchone()
+    return lo, hi
+
+
+def _unparsed_call_datetimes(cur) -> tuple[int, list[str]]:
+    """Rows whose call_datetime app_call_date cannot read; they would land in the default partition."""
+    cur.execute(
+        pgsql.SQL(
+            "SELECT COUNT(*), (ARRAY_AGG(DISTINCT call_datetime::text))[1:5] FROM {tbl} "
+            "WHERE call_datetime IS NOT NULL AND {key} IS NULL"
+        ).format(key=pgsql.SQL(PARTITION_KEY), tbl=pgsql.Identifier(SOURCE_TABLE))
+    )
+    count, samples = cur.fetchone()
+    return count, samples or []
+
+
+def _create_partition(cur, parent: str, month: date):
+    name = _partition_name(parent, month)
+    cur.execute(
+        pgsql.SQL("CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)").format(
+            name=pgsql.Identifier(name),
+            parent=pgsql.Identifier(parent),
+        ),
+        (month, _add_months(month, 1)),
+    )
+    _revoke_access(cur, name)
+
+
+def _attached_partitions(cur, parent: str) -> set[str]:
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+        """,
+        (parent,),
+    )
+    return {r[0] for r in cur.fetchall()}
+
+
+_POLICY_COMMANDS = {"r": "SELECT", "a": "INSERT", "w": "UPDATE", "d": "DELETE", "*": "ALL"}
+
+
+def _role(is_public: bool, name: str) -> pgsql.Composable:
+    return pgsql.SQL("PUBLIC") if is_public else pgsql.Identifier(name)
+
+
+def _revoke_access(cur, table: str):
+    """
+    Strips every privilege but the owner's from a freshly created table. Supabase's default privileges
+    hand new public tables to anon/authenticated, which would expose the staging copy and every partition
+    through PostgREST; queries through the parent never check partition privileges.
+    """
+    cur.execute(
+        """
+        SELECT DISTINCT a.grantee = 0, pg_get_userbyid(a.grantee)
+        FROM pg_class c, aclexplode(COALESCE(c.relacl, acldefault('r', c.relowner))) a
+        WHERE c.oid = to_regclass(quote_ident(%s)) AND a.grantee <> c.relowner
+        """,
+        (table,),
+    )
+    for is_public, name in cur.fetchall():
+        cur.execute(
+            pgsql.SQL("REVOKE ALL ON {tbl} FROM {role}").format(tbl=pgsql.Identifier(table), role=_role(is_public, name))
+        )
+
+
+def _copy_access_control(cur, src: str, dst: str) -> dict:
+    """
+    Gives `dst` the owner, RLS flags, policies and table/column grants of `src`.
+    Runs inside the swap transaction, so a failure (e.g. no right to a policy's role) aborts the swap.
+    """
+    cur.execute(
+        """
+        SELECT s.relowner <> d.relowner, pg_get_userbyid(s.relowner), s.relrowsecurity, s.relforcerowsecurity
+        FROM pg_class s, pg_class d
+        WHERE s.oid = to_regclass(quote_ident(%s)) AND d.oid = to_regclass(quote_ident(%s))
+        """,
+        (src, dst),
+    )
+    owner_differs, owner, rls, force_rls = cur.fetchone()
+    table = pgsql.Identifier(dst)
+    if owner_differs:
+        # The owner bypasses RLS and holds the implicit privileges, so it has to match too.
+        cur.execute(pgsql.SQL("ALTER TABLE {tbl} OWNER TO {owner}").format(tbl=table, owner=pgsql.Identifier(owner)))
+    _revoke_access(cur, dst)
+    if rls:
+        cur.execute(pgsql.SQL("ALTER TABLE {tbl} ENABLE ROW LEVEL SECURITY").format(tbl=table))
+    if force_rls:
+        cur.execute(pgsql.SQL("ALTER TABLE {tbl} FORCE ROW LEVEL SECURITY").format(tbl=table))
+
+    cur.execute(
+        """
+        SELECT p.polname, p.polpermissive, p.polcmd,
+               ARRAY(SELECT r = 0 FROM unnest(p.polroles) r),
+               ARRAY(SELECT pg_get_userbyid(r) FROM unnest(p.polroles) r),
+               pg_get_expr(p.polqual, p.polrelid), pg_get_expr(p.polwithcheck, p.polrelid)
+        FROM pg_policy p
+        WHERE p.polrelid = to_regclass(quote_ident(%s))
+        ORDER BY p.polname
+        """,
+        (src,),
+    )
+    policies = cur.fetchall()
+    for name, permissive, cmd, public_flags, role_names, qual, with_check in policies:
+        statement = pgsql.SQL("CREATE POLICY {name} ON {tbl} AS {kind} FOR {cmd} TO {roles}").format(
+            name=pgsql.Identifier(name),
+            tbl=table,
+            kind=pgsql.SQL("PERMISSIVE" if permissive else "RESTRICTIVE"),
+            cmd=pgsql.SQL(_POLICY_COMMANDS[cmd]),
+            roles=pgsql.SQL(", ").join(_role(p, r) for p, r in zip(public_flags, role_names)),
+        )
+        # The expressions come deparsed from the catalog and name the same columns on the copy.
+        if qual is not None:
+            statement += pgsql.SQL(" USING ({})").format(pgsql.SQL(qual))
+        if with_check is not None:
+            statement += pgsql.SQL(" WITH CHECK ({})").format(pgsql.SQL(with_check))
+        cur.execute(statement)
+
+    cur.execute(
+        """
+        SELECT NULL, a.grantee = 0, pg_get_userbyid(a.grantee), a.privilege_type, a.is_grantable
+        FROM pg_class c, aclexplode(COALESCE(c.relacl, acldefault('r', c.relowner))) a
+        WHERE c.oid = to_regclass(quote_ident(%s)) AND a.grantee <> c.relowner
+        UNION ALL
+        SELECT att.attname, a.grantee = 0, pg_get_userbyid(a.grantee), a.privilege_type, a.is_grantable
+        FROM pg_attribute att, aclexplode(att.attacl) a
+        WHERE att.attrelid = to_regclass(quote_ident(%s)) AND att.attacl IS NOT NULL
+        """,
+        (src, src),
+    )
+    grants = cur.fetchall()
+    for column, is_public, grantee, privilege, grantable in grants:
+        cur.execute(
+            pgsql.SQL("GRANT {priv}{cols} ON {tbl} TO {role}{option}").format(
+                priv=pgsql.SQL(privilege),
+                cols=pgsql.SQL(" ({})").format(pgsql.Identifier(column)) if column else pgsql.SQL(""),
+                tbl=table,
+                role=_role(is_public, grantee),
+                option=pgsql.SQL(" WITH GRANT OPTION" if grantable else ""),
+            )
+        )
+    return {"rls": rls, "force_rls": force_rls, "policies": len(policies), "grants": len(grants)}
+
+
+def _ensure_month_partition(conn, parent: str, month: date):
+    """Creates the partition for `month`, moving any rows the default partition already holds for it."""
+    name = _partition_name(parent, month)
+    default_name = DEFAULT_PARTITION
+    with conn.cursor() as cur:
+        if name in _attached_partitions(cur, parent):
+            return
+        cur.execute(
+            pgsql.SQL("SELECT EXISTS (SELECT 1 FROM {d} WHERE {key} >= %s AND {key} < %s)").format(
+                d=pgsql.Identifier(default_name),
+                key=pgsql.SQL(PARTITION_KEY),
+            ),
+            (month, _add_months(month, 1)),
+        )
+        has_rows = bool(cur.fetchone()[0])
+        if not has_rows:
+            _create_partition(cur, parent, month)
+            conn.commit()
+            return
+
+        cur.execute(
+            pgsql.SQL("CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)").format(
+                name=pgsql.Identifier(name),
+                parent=pgsql.Identifier(parent),
+            )
+        )
+        _revoke_access(cur, name)
+        cur.execute(
+            pgsql.SQL(
+                "WITH moved AS (DELETE FROM {d} WHERE {key} >= %s AND {key} < %s RETURNING *) "
+                "INSERT INTO {name} SELECT * FROM moved"
+            ).format(
+                d=pgsql.Identifier(default_name),
+                key=pgsql.SQL(PARTITION_KEY),
+                name=pgsql.Identifier(name),
+            ),
+            (month, _add_months(month, 1)),
+        )
+        cur.execute(
+            pgsql.SQL("ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)").format(
+                parent=pgsql.Identifier(parent),
+                name=pgsql.Identifier(name),
+            ),
+            (month, _add_months(month, 1)),
+        )
+    conn.commit()
+
+
+def _create_staging_table(conn, first_month: date, last_month: date):
+    with conn.cursor() as cur:
+        cur.execute(
+            pgsql.SQL("CREATE TABLE IF NOT EXISTS {new} (LIKE {src} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})").format(
+                new=pgsql.Identifier(STAGING_TABLE),
+                src=pgsql.Identifier(SOURCE_TABLE),
+                key=pgsql.SQL(PARTITION_KEY),
+            )
+        )
+        # Locked down until the swap copies the live table's access control onto it.
+        _revoke_access(cur, STAGING_TABLE)
+        cur.execute(
+            pgsql.SQL("CREATE TABLE IF NOT EXISTS {d} PARTITION OF {new} DEFAULT").format(
+                d=pgsql.Identifier(DEFAULT_PARTITION),
+                new=pgsql.Identifier(STAGING_TABLE),
+            )
+        )
+        _revoke_access(cur, DEFAULT_PARTITION)
+        for month in _month_range(first_month, last_month):
+            _create_partition(cur, STAGING_TABLE, month)
+        cur.execute(
+            pgsql.SQL("CREATE INDEX IF NOT EXISTS idx_calls_raw_part_call_id ON {new} (call_id)").format(
+                new=pgsql.Identifier(STAGING_TABLE)
+            )
+        )
+        cur.execute(
+            pgsql.SQL("CREATE INDEX IF NOT EXISTS idx_calls_raw_part_lead_id ON {new} (lead_id)").format(
+                new=pgsql.Identifier(STAGING_TABLE)
+            )
+        )
+        cur.execute(
+            pgsql.SQL("CREATE INDEX IF NOT EXISTS idx_calls_raw_part_call_id_norm ON {new} (app_normalize_call_id(call_id::text))").format(
+                new=pgsql.Identifier(STAGING_TABLE)
+            )
+        )
+    conn.commit()
+
+
+def _install_mirror_trigger(conn):
+    """Forwards writes on the live table to the staging table while the copy runs."""
+    with conn.cursor() as cur:
+        cur.execute(
+            pgsql.SQL(
+                """
+                CREATE OR REPLACE FUNCTION app_mirror_calls_raw()
+                RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$
+                BEGIN
+                  PERFORM pg_advisory_xact_lock_shared({lock_key});
+                  -- call_id is neither unique nor NOT NULL, so remove exactly one copy of the whole old row.
+                  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    IF OLD.call_id IS NULL THEN
+                      DELETE FROM {new} n WHERE (n.tableoid, n.ctid) = (
+                        SELECT m.tableoid, m.ctid FROM {new} m
+                        WHERE m.call_id IS NULL AND (m.*) IS NOT DISTINCT FROM (OLD.*)
+                        LIMIT 1
+                      );
+                    ELSE
+                      DELETE FROM {new} n WHERE (n.tableoid, n.ctid) = (
+                        SELECT m.tableoid, m.ctid FROM {new} m
+                        WHERE m.call_id = OLD.call_id AND (m.*) IS NOT DISTINCT FROM (OLD.*)
+                        LIMIT 1
+                      );
+                    END IF;
+                  END IF;
+                  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {new} SELECT NEW.*;
+                  END IF;
+                  RETURN NULL;
+                END;
+                $$
+                """
+            ).format(lock_key=pgsql.Literal(MIRROR_LOCK_KEY), new=pgsql.Identifier(STAGING_TABLE))
+        )
+        cur.execute(
+            pgsql.SQL("DROP TRIGGER IF EXISTS trg_mirror_calls_raw ON {src}").format(src=pgsql.Identifier(SOURCE_TABLE))
+        )
+        cur.execute(
+            pgsql.SQL(
+                "CREATE TRIGGER trg_mirror_calls_raw AFTER INSERT OR UPDATE OR DELETE ON {src} "
+                "FOR EACH ROW EXECUTE FUNCTION app_mirror_calls_raw()"
+            ).format(src=pgsql.Identifier(SOURCE_TABLE))
+        )
+    conn.commit()
+
+
+def _copy_slice(conn, where_sql: pgsql.Composable, params: tuple) -> int:
+    """Copies one slice of the live table; the exclusive advisory lock keeps mirrored writes from racing it.
+
+    EXCEPT ALL subtracts the rows the mirror trigger already wrote as a multiset, so duplicate and NULL
+    call_ids are copied as many times as they occur in the live table.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIRROR_LOCK_KEY,))
+        cur.execute(
+            pgsql.SQL(
+                "INSERT INTO {new} SELECT * FROM {src} WHERE {where} "
+                "EXCEPT ALL SELECT * FROM {new} WHERE {where}"
+            ).format(new=pgsql.Identifier(STAGING_TABLE), src=pgsql.Identifier(SOURCE_TABLE), where=where_sql),
+            params + params,
+        )
+        copied = cur.rowcount
+    conn.commit()
+    return copied
+
+
+def _copy_existing_rows(conn, months: list[date]):
+    total = 0
+    for month in months:
+        started = time.perf_counter()
+        copied = _copy_slice(
+            conn,
+            pgsql.SQL("{key} >= %s AND {key} < %s").format(key=pgsql.SQL(PARTITION_KEY)),
+            (month, _add_months(month, 1)),
+        )
+        total += copied
+        print(f"  {month:%Y-%m}: {copied} rows in {time.perf_counter() - started:.1f}s")
+    copied = _copy_slice(conn, pgsql.SQL("{key} IS NULL").format(key=pgsql.SQL(PARTITION_KEY)), ())
+    total += copied
+    print(f"  (no call_datetime): {copied} rows")
+    return total
+
+
+def _warn_about_dependents(cur):
+    cur.execute(
+        """
+        SELECT DISTINCT v.relname
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class v ON v.oid = r.ev_class
+        JOIN pg_class t ON t.oid = d.refobjid
+        WHERE t.relname = %s
+          AND v.relname <> t.relname
+        ORDER BY 1
+        """,
+        (ARCHIVE_TABLE,),
+    )
+    stale = [r[0] for r in cur.fetchall()]
+    if stale:
+        print(f"⚠️ Views still bound to {ARCHIVE_TABLE} (recreate them from their migration): {', '.join(stale)}")
+
+
+def _swap_tables(conn):
+    """Atomically replaces the live table with the partitioned copy and rebinds the chart views/RPCs."""
+    statements = _split_sql_statements(_read_sql(CHART_VIEWS_SQL))
+    with conn.cursor() as cur:
+        cur.execute("SET LOCAL lock_timeout TO '10s'")
+        cur.execute(pgsql.SQL("LOCK TABLE {src} IN ACCESS EXCLUSIVE MODE").format(src=pgsql.Identifier(SOURCE_TABLE)))
+        cur.execute(pgsql.SQL("SELECT COUNT(*) FROM {src}").format(src=pgsql.Identifier(SOURCE_TABLE)))
+        src_count = cur.fetchone()[0]
+        cur.execute(pgsql.SQL("SELECT COUNT(*) FROM {new}").format(new=pgsql.Identifier(STAGING_TABLE)))
+        new_count = cur.fetchone()[0]
+        if src_count != new_count:
+            raise RuntimeError(f"Row count mismatch: {SOURCE_TABLE}={src_count}, {STAGING_TABLE}={new_count}. Re-run `copy` before swapping.")
+        access = _copy_access_control(cur, SOURCE_TABLE, STAGING_TABLE)
+        cur.execute(pgsql.SQL("DROP TRIGGER IF EXISTS trg_mirror_calls_raw ON {src}").format(src=pgsql.Identifier(SOURCE_TABLE)))
+        cur.execute("DROP FUNCTION IF EXISTS app_mirror_calls_raw()")
+        for trg in ("trg_call_attributes_insert", "trg_call_attributes_update", "trg_call_attributes_delete"):
+            cur.execute(pgsql.SQL("DROP TRIGGER IF EXISTS {trg} ON {src}").format(trg=pgsql.Identifier(trg), src=pgsql.Identifier(SOURCE_TABLE)))
+        cur.execute(pgsql.SQL("ALTER TABLE {src} RENAME TO {arch}").format(src=pgsql.Identifier(SOURCE_TABLE), arch=pgsql.Identifier(ARCHIVE_TABLE)))
+        cur.execute(pgsql.SQL("ALTER TABLE {new} RENAME TO {src}").format(new=pgsql.Identifier(STAGING_TABLE), src=pgsql.Identifier(SOURCE_TABLE)))
+        execute_statements(cur, statements)
+        _warn_about_dependents(cur)
+    conn.commit()
+    print(f"✅ Swapped: {src_count} rows now served from the partitioned {SOURCE_TABLE}.")
+    print(
+        f"   Access control copied: RLS {'on' if access['rls'] else 'off'}{' (forced)' if access['force_rls'] else ''}, "
+        f"{access['policies']} policies, {access['grants']} grants."
+    )
+
+
+def _is_partitioned(cur, table: str) -> bool:
+    cur.execute("SELECT c.relkind FROM pg_class c WHERE c.relname = %s", (table,))
+    row = cur.fetchone()
+    return bool(row and row[0] == "p")
+
+
+def cmd_prepare(conn, force: bool = False) -> bool:
+    with conn.cursor() as cur:
+        _ensure_call_date_function(cur)
+        unparsed, samples = _unparsed_call_datetimes(cur)
+        lo, hi = _source_month_bounds(cur)
+    conn.commit()
+    if unparsed:
+        print(
+            f"⚠️ {unparsed} rows have a call_datetime app_call_date cannot parse; they would sit in the default "
+            f"partition and drop out of every date filter. Examples: {', '.join(repr(v) for v in samples)}"
+        )
+        if not force:
+            print("❌ Fix those values (or extend app_call_date) and re-run, or pass --force to continue anyway.")
+            return False
+    today = date.today()
+    first = _month_start(lo) if lo else _month_start(today)
+    last = _add_months(_month_start(max(hi, today) if hi else today), MONTHS_AHEAD)
+    _create_staging_table(conn, first, last)
+    _install_mirror_trigger(conn)
+    print(f"✅ {STAGING_TABLE} created with monthly partitions {first:%Y-%m} .. {last:%Y-%m}; live writes are mirrored.")
+    return True
+
+
+def cmd_copy(conn):
+    with conn.cursor() as cur:
+        lo, hi = _source_month_bounds(cur)
+    conn.commit()
+    months = _month_range(lo, hi) if lo and hi else []
+    print(f"Copying {len(months)} month(s) into {STAGING_TABLE}...")
+    total = _copy_existing_rows(conn, months)
+    print(f"✅ Copied {total} rows.")
+
+
+def cmd_swap(conn):
+    _swap_tables(conn)
+
+
+def cmd_ensure_partitions(conn, months_ahead: int):
+    with conn.cursor() as cur:
+        parent = SOURCE_TABLE if _is_partitioned(cur, SOURCE_TABLE) else STAGING_TABLE
+        if not _is_partitioned(cur, parent):
+            print("No partitioned table found; run `prepare` first.")
+            return
+    conn.commit()
+    this_month = _month_start(date.today())
+    for month in _month_range(this_month, _add_months(this_month, months_ahead)):
+        _ensure_month_partition(conn, parent, month)
+    print(f"✅ Partitions ensured through {_add_months(this_month, months_ahead):%Y-%m}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Online migration of {SOURCE_TABLE} to monthly range partitions on call_datetime.")
+    parser.add_argument(
+        "step",
+        choices=["prepare", "copy", "swap", "migrate", "ensure-partitions"],
+        help="prepare: staging table + mirror trigger; copy: backfill month by month; swap: atomic rename; "
+        "migrate: all three; ensure-partitions: create upcoming months (run monthly).",
+    )
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    parser.add_argument("--force", action="store_true", help="prepare even if some call_datetime values cannot be parsed")
+    args = parser.parse_args()
+
+    cfg = _load_secrets()["database"]
+    conn = connect_db(cfg)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout TO 0;")
+            already_partitioned = _is_partitioned(cur, SOURCE_TABLE)
+        conn.commit()
+        if already_partitioned and args.step in ("prepare", "copy", "swap", "migrate"):
+            print(f"{SOURCE_TABLE} is already partitioned; only `ensure-partitions` applies.")
+            return
+        if args.step in ("prepare", "migrate") and not cmd_prepare(conn, args.force):
+            return
+        if args.step in ("copy", "migrate"):
+            cmd_copy(conn)
+        if args.step in ("swap", "migrate"):
+            cmd_swap(conn)
+        if args.step == "ensure-partitions":
+            cmd_ensure_partitions(conn, args.months_ahead)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
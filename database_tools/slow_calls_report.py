@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import slow_log
+
+DEFAULT_PATH = os.getenv("SLOW_CALL_LOG") or os.path.join(ROOT, ".cache", "slow_calls.sqlite")
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def group_entries(entries, by_name=True):
+    """(function, name, param shape) -> count, errors by class, p50/p95/max duration, avg rows."""
+    groups = {}
+    for e in entries:
+        key = (e["function"], e["name"] if by_name else "*", e["param_shape"])
+        groups.setdefault(key, []).append(e)
+    rows = []
+    for (function, name, shape), items in groups.items():
+        durations = [i["duration_ms"] for i in items]
+        errors = {}
+        for i in items:
+            if i["error"]:
+                errors[i["error"]] = errors.get(i["error"], 0) + 1
+        rows.append({
+            "function": function,
+            "name": name,
+            "param_shape": shape,
+            "count": len(items),
+            "errors": errors,
+            "p50_ms": round(statistics.median(durations), 1),
+            "p95_ms": round(_percentile(durations, 0.95), 1),
+            "max_ms": round(max(durations), 1),
+            "avg_rows": round(sum(i["rows"] or 0 for i in items) / len(items), 1),
+            "last_seen": time.strftime("%Y-%m-%d %H:%M", time.localtime(max(i["ts"] for i in items))),
+            "example_params": items[-1]["params"],
+        })
+    rows.sort(key=lambda r: (r["count"] * r["p50_ms"]), reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group the dashboard's slow/failed data calls by function and parameter shape.")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--since-hours", type=float, default=None)
+    parser.add_argument("--function", default=None, help="Only this function (rpc_df, fetch_view_data, ...)")
+    parser.add_argument("--errors-only", action="store_true")
+    parser.add_argument("--by-function", action="store_true", help="Group by function and shape only, not by view/rpc name")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    entries = slow_log.read_entries(args.path, since)
+    if args.function:
+        entries = [e for e in entries if e["function"] == args.function]
+    if args.errors_only:
+        entries = [e for e in entries if e["error"]]
+    if not entries:
+        print(f"✅ No slow or failed calls in {args.path}")
+        return
+
+    rows = group_entries(entries, by_name=not args.by_function)[: args.top]
+    if args.json:
+        print(json.dumps({"entries": len(entries), "groups": rows}, indent=2, ensure_ascii=False))
+        return
+    print(f"🐢 {len(entries)} slow/failed calls, {len(rows)} groups shown")
+    for r in rows:
+        errors = ", ".join(f"{k} x{v}" for k, v in sorted(r["errors"].items())) or "-"
+        print(f"\n{r['function']} {r['name']}  ({r['param_shape']})")
+        print(f"  count {r['count']}  p50 {r['p50_ms']} ms  p95 {r['p95_ms']} ms  max {r['max_ms']} ms  "
+              f"avg rows {r['avg_rows']}  errors {errors}  last {r['last_seen']}")
+        print(f"  e.g. {r['example_params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import io
+import json
+import os
+import re
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2 import sql as pgsql
+
+from apply_sql_views import CHART_VIEWS_SQL, _read_sql, _split_sql_statements, execute_statements
+
+TABLE_NAME = "Algonova_Calls_Raw"
+SCHEMA_TRUTH_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_truth.sql")
+CHUNK_ROWS = 200_000
+CALLS_PER_LEAD = 3.0
+
+PIPELINES = [
+    ("CZ Main", 0.30), ("CZ Webinar", 0.08), ("CZ Partners", 0.04),
+    ("SK Main", 0.16), ("SK Webinar", 0.04),
+    ("RUK Main", 0.22), ("RUK Partners", 0.06),
+    ("PL Main", 0.05), ("Upsell", 0.05),
+]
+CALL_TYPES = [
+    ("intro_call", 0.34), ("intro_followup", 0.20), ("sales_call", 0.24),
+    ("sales_followup", 0.12), ("trial_lesson", 0.06), ("other", 0.04),
+]
+NEXT_STEPS = [
+    ("lesson_scheduled", 0.24), ("callback_scheduled", 0.22), ("payment_pending", 0.06), ("sold", 0.07),
+    ("callback_vague", 0.18), ("vague", 0.11), ("no_next_step", 0.08), ("", 0.04),
+]
+OBJECTIONS = [
+    ("none", 0.35), ("price", 0.20), ("time", 0.14), ("child_interest", 0.10),
+    ("trust", 0.07), ("competitor", 0.06), ("technical", 0.04), ("", 0.04),
+]
+GOALS = ["logic", "programming", "career", "school_grades", "creativity", "socialization", "english", "math"]
+FEARS = ["screen_time", "price", "child_loses_interest", "too_difficult", "online_format", "no_results"]
+OBJECTION_LIST = ["price", "time", "child_interest", "trust", "competitor", "schedule", "technical", "spouse"]
+UTM_SOURCES = ["facebook", "instagram", "google", "tiktok", "referral", "organic"]
+MANAGERS = 40
+TRAFFIC_MANAGERS = 12
+
+
+def table_columns(path=SCHEMA_TRUTH_SQL, table=TABLE_NAME):
+    """Column names of the raw calls table as captured in schema_truth.sql (all text in production)."""
+    text = _read_sql(path)
+    block = re.search(rf"CREATE TABLE {re.escape(table)} \((.*?)\n\);", text, re.S).group(1)
+    return [line.strip().rsplit(" ", 1)[0] for line in block.strip().splitlines() if line.strip()]
+
+
+def _choice(rng, weighted, size):
+    values = np.array([v for v, _ in weighted], dtype=object)
+    p = np.array([w for _, w in weighted], dtype=float)
+    return values[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def _tag_lists(rng, vocab, size, max_items=3, empty_share=0.2):
+    counts = rng.integers(1, max_items + 1, size=size)
+    counts[rng.random(size) < empty_share] = 0
+    picks = rng.integers(0, len(vocab), size=(size, max_items))
+    # Encode (count, picks) as one integer and build the ';'-joined string once per distinct code.
+    codes = counts.astype(np.int64)
+    for k in range(max_items):
+        codes = codes * len(vocab) + np.where(k < counts, picks[:, k], 0)
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    labels = []
+    for code in uniques:
+        items = []
+        for _ in range(max_items):
+            code, j = divmod(int(code), len(vocab))
+            items.append(vocab[j])
+        n = code
+        labels.append(";".join(dict.fromkeys(reversed(items[max_items - n:]))) if n else None)
+    return np.array(labels, dtype=object)[inverse]
+
+
+class LeadTable:
+    """Lead-level attributes so that every call of a lead shares pipeline, market and traffic source."""
+
+    def __init__(self, seed, leads, start, days):
+        rng = np.random.default_rng([seed, 0])
+        pipelines = _choice(rng, PIPELINES, leads)
+        self.pipeline = pipelines
+        # About half of the rows leave `market` empty so the views have to derive it from the pipeline.
+        explicit = rng.random(leads) < 0.5
+        prefix = np.array([p.split(" ", 1)[0] for p in pipelines], dtype=object)
+        self.market = np.where(explicit & np.isin(prefix, ["CZ", "SK", "RUK", "PL"]), prefix, None)
+        tm = rng.zipf(1.6, size=leads) % TRAFFIC_MANAGERS
+        self.mkt_manager = np.where(
+            rng.random(leads) < 0.7, np.array([f"Traffic Manager {i + 1:02d}" for i in tm], dtype=object), None
+        )
+        self.mkt_market = np.where(self.mkt_manager != None, prefix, None)  # noqa: E711
+        self.utm_source = _choice(rng, [(s, 1.0) for s in UTM_SOURCES], leads)
+        # Lead arrivals grow over the period; most weekend leads are moved to the preceding Friday.
+        offsets = np.floor(days * np.sqrt(rng.random(leads))).astype(int)
+        first_day = np.datetime64(start, "D") + offsets
+        weekday = (first_day.astype("int64") + 3) % 7
+        shift = np.where((weekday > 4) & (rng.random(leads) < 0.8), weekday - 4, 0)
+        self.first_day = first_day - shift
+
+
+def generate_chunk(seed, chunk_idx, first_row, rows, lead_table, end):
+    rng = np.random.default_rng([seed, chunk_idx + 1])
+    row_ids = np.arange(first_row, first_row + rows)
+    lead_idx = rng.integers(0, len(lead_table.pipeline), size=rows)
+
+    call_day = np.minimum(
+        lead_table.first_day[lead_idx] + (rng.geometric(0.25, size=rows) - 1), np.datetime64(end, "D")
+    )
+    call_dt = call_day.astype("datetime64[s]") + rng.integers(8 * 3600, 20 * 3600, size=rows)
+
+    manager_idx = (rng.zipf(1.3, size=rows) - 1) % MANAGERS
+    duration = np.clip(rng.lognormal(np.log(300), 0.8, size=rows), 15, 5400).astype(int)
+    quality = np.clip(rng.normal(6.6, 1.6, size=rows), 1.0, 10.0).round(1)
+
+    call_ids = np.array([f"syn-{seed}-{i:09d}" for i in row_ids], dtype=object)
+    braced = rng.random(rows) < 0.05
+    call_ids[braced] = np.array(["{" + c + "}" for c in call_ids[braced]], dtype=object)
+
+    frame = {
+        "call_id": call_ids,
+        "date": np.datetime_as_string(call_day).astype(object),
+        "call_datetime": np.char.add(np.datetime_as_string(call_dt), "+00:00").astype(object),
+        "call_type": _choice(rng, CALL_TYPES, rows),
+        "call_duration_sec": duration.astype(str).astype(object),
+        "lead_id": (lead_idx + 10_000_000).astype(str).astype(object),
+        "manager_id": (manager_idx + 1000).astype(str).astype(object),
+        "manager": np.array([f"Manager {i + 1:02d}" for i in manager_idx], dtype=object),
+        "pipeline_name": lead_table.pipeline[lead_idx],
+        "market": lead_table.market[lead_idx],
+        "mkt_manager": lead_table.mkt_manager[lead_idx],
+        "mkt_market": lead_table.mkt_market[lead_idx],
+        "utm_source": lead_table.utm_source[lead_idx],
+        "next_step_type": _choice(rng, NEXT_STEPS, rows),
+        "main_objection_type": _choice(rng, OBJECTIONS, rows),
+        "Average_quality": np.where(rng.random(rows) < 0.9, quality.astype(str), None),
+        "parent_goals": _tag_lists(rng, GOALS, rows),
+        "parent_fears": _tag_lists(rng, FEARS, rows, max_items=2, empty_share=0.4),
+        "objection_list": _tag_lists(rng, OBJECTION_LIST, rows, empty_share=0.3),
+        "processing_status": np.full(rows, "completed", dtype=object),
+        # A short free-text column keeps the heap row width closer to production.
+        "call_summary": np.array([f"Synthetic call summary {i % 997:03d}. " * 6 for i in row_ids], dtype=object),
+    }
+    return pd.DataFrame(frame)
+
+
+def _copy_frame(cur, table_name, df):
+    data = io.StringIO()
+    df.to_csv(data, header=False, index=False)
+    data.seek(0)
+    cols = pgsql.SQL(", ").join(pgsql.Identifier(c) for c in df.columns)
+    cur.copy_expert(
+        pgsql.SQL("COPY {t} ({cols}) FROM STDIN WITH (FORMAT csv)").format(
+            t=pgsql.Identifier(table_name), cols=cols
+        ).as_string(cur),
+        data,
+    )
+
+
+def _ensure_scratch(cur, table_name):
+    # Refuse to drop a table that holds anything but generator output (e.g. a DSN pointing at production).
+    cur.execute("SELECT to_regclass(%s)", (f'public."{table_name}"',))
+    if cur.fetchone()[0] is None:
+        return
+    cur.execute(
+        pgsql.SQL("SELECT 1 FROM {t} WHERE trim(both '{{}}' from call_id) NOT LIKE 'syn-%%' LIMIT 1").format(
+            t=pgsql.Identifier(table_name)
+        )
+    )
+    if cur.fetchone() is not None:
+        raise RuntimeError(f"'{table_name}' contains non-synthetic rows; refusing to drop it (use --force)")
+
+
+def generate(conn, calls, seed=7, end=None, days=365, table_name=TABLE_NAME, apply_views=True, force=False,
+             log=print):
+    """
+    Drops and refills `table_name` with `calls` deterministic rows (same seed -> same data),
+    then applies the chart views migration so call_attributes, indexes and rpc_* functions exist.
+    """
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+    leads = max(1, int(calls / CALLS_PER_LEAD))
+    started = time.perf_counter()
+
+    with conn.cursor() as cur:
+        if not force:
+            _ensure_scratch(cur, table_name)
+        cur.execute(pgsql.SQL("DROP TABLE IF EXISTS {t} CASCADE").format(t=pgsql.Identifier(table_name)))
+        cur.execute("DROP TABLE IF EXISTS call_attributes")
+        cur.execute(
+            pgsql.SQL("CREATE TABLE {t} ({cols})").format(
+                t=pgsql.Identifier(table_name),
+                cols=pgsql.SQL(", ").join(pgsql.SQL("{} text").format(pgsql.Identifier(c)) for c in table_columns()),
+            )
+        )
+    conn.commit()
+
+    lead_table = LeadTable(seed, leads, start, days)
+    written = 0
+    for chunk_idx, first_row in enumerate(range(0, calls, CHUNK_ROWS)):
+        rows = min(CHUNK_ROWS, calls - first_row)
+        df = generate_chunk(seed, chunk_idx, first_row, rows, lead_table, end)
+        with conn.cursor() as cur:
+            _copy_frame(cur, table_name, df)
+        conn.commit()
+        written += rows
+        log(f"  {written:,}/{calls:,} calls ({time.perf_counter() - started:.1f}s)")
+
+    if apply_views:
+        # Rows are loaded before the triggers exist; the migration's DO block fills call_attributes in one pass.
+        with conn.cursor() as cur:
+            execute_statements(cur, _split_sql_statements(_read_sql(CHART_VIEWS_SQL)))
+        conn.commit()
+    with conn.cursor() as cur:
+        cur.execute(pgsql.SQL("ANALYZE {t}").format(t=pgsql.Identifier(table_name)))
+        if apply_views:
+            cur.execute("ANALYZE call_attributes")
+    conn.commit()
+    return {
+        "calls": calls,
+        "leads": leads,
+        "seed": seed,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a local Postgres with deterministic synthetic calls.")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_PG_DSN", "postgresql://postgres@localhost:5432/postgres"))
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last call date (default: today)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--skip-views", action="store_true", help="Only load the table")
+    parser.add_argument("--force", action="store_true", help="Drop the table even if it holds non-synthetic rows")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        summary = generate(
+            conn, args.calls, args.seed, args.end_date, args.days,
+            apply_views=not args.skip_views, force=args.force,
+        )
+    finally:
+        conn.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
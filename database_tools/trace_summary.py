@@ -0,0 +1,120 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_DIR = os.getenv("TRACE_SPANS_DIR") or os.path.join(ROOT, ".cache", "traces")
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _attributes(span):
+    out = {}
+    for item in span.get("attributes", []):
+        value = item.get("value", {})
+        out[item.get("key")] = next(iter(value.values()), None)
+    return out
+
+
+def trace_files(trace_dir):
+    # spans.jsonl plus its rotated backups (spans.jsonl.1 is the newest backup).
+    files = glob.glob(os.path.join(trace_dir, "spans.jsonl*"))
+    return sorted(files, key=os.path.getmtime)
+
+
+def read_traces(paths, since_ns=None):
+    """Yield the spans of each exported render as one list."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    payload = json.loads(line)
+                except ValueError:
+                    continue
+                spans = [
+                    s
+                    for rs in payload.get("resourceSpans", [])
+                    for ss in rs.get("scopeSpans", [])
+                    for s in ss.get("spans", [])
+                ]
+                if since_ns and spans and min(int(s["startTimeUnixNano"]) for s in spans) < since_ns:
+                    continue
+                if spans:
+                    yield spans
+
+
+def summarize(traces, page=None, prefix=None):
+    durations = {}
+    errors = {}
+    renders = 0
+    for spans in traces:
+        root = next((s for s in spans if not s.get("parentSpanId")), None)
+        if page and (root is None or _attributes(root).get("app.page") != page):
+            continue
+        renders += 1
+        for s in spans:
+            name = s.get("name", "")
+            if prefix and not name.startswith(prefix):
+                continue
+            ms = (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+            durations.setdefault(name, []).append(ms)
+            if s.get("status", {}).get("code") == 2:
+                errors[name] = errors.get(name, 0) + 1
+    rows = [
+        {
+            "name": name,
+            "count": len(values),
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(_percentile(values, 0.95), 2),
+            "max_ms": round(max(values), 2),
+            "total_s": round(sum(values) / 1000, 3),
+            "errors": errors.get(name, 0),
+        }
+        for name, values in durations.items()
+    ]
+    rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+    return renders, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 per span name from the dashboard's JSONL trace files.")
+    parser.add_argument("paths", nargs="*", help="Trace files (default: every spans.jsonl* in --dir)")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--since-hours", type=float, default=None, help="Only renders started in the last N hours")
+    parser.add_argument("--page", default=None, help="Only renders of this page (CEO, CMO, CSO, LAB)")
+    parser.add_argument("--prefix", default=None, help="Only span names starting with this, e.g. 'rpc_df' or 'plotly'")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or trace_files(args.dir)
+    if not paths:
+        print(f"❌ No trace files found in {args.dir}")
+        sys.exit(1)
+    since_ns = time.time_ns() - int(args.since_hours * 3600 * 1e9) if args.since_hours else None
+    renders, rows = summarize(read_traces(paths, since_ns), page=args.page, prefix=args.prefix)
+    rows = rows[: args.top]
+
+    if args.json:
+        print(json.dumps({"renders": renders, "spans": rows}, indent=2))
+        return
+    print(f"📊 {renders} renders from {len(paths)} file(s)")
+    width = max([len(r["name"]) for r in rows] + [4])
+    print(f"{'span':<{width}} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'total s':>9} {'errors':>7}")
+    for r in rows:
+        print(f"{r['name']:<{width}} {r['count']:>7} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} "
+              f"{r['max_ms']:>10.1f} {r['total_s']:>9.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
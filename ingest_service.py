@@ -0,0 +1,382 @@
+import argparse
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import toml
+from psycopg2 import sql as pgsql
+
+from kommo_fields import ADS_FIELD_MAPPING
+from pg_bulk import BulkWriter, connect_postgres, insert_new_rows
+
+
+TABLE_NAME = "Algonova_Calls_Raw"
+BATCH_SIZE = 500
+FLUSH_INTERVAL_SEC = 1.0
+MAX_QUEUE = 20000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+FLUSH_RETRIES = 3
+LATENCY_WINDOW = 5000
+DEAD_LETTER_PATH = os.path.join(".cache", "ingest_dead_letter.jsonl")
+
+_BRACES_RE = re.compile(r"[{}]")
+_QUOTES_RE = re.compile(r"^[\"']+|[\"']+$")
+
+
+def load_secrets():
+    secrets_path = os.path.join(".streamlit", "secrets.toml")
+    try:
+        with open(secrets_path, "r") as f:
+            return toml.load(f)
+    except FileNotFoundError:
+        print(f"❌ Could not find secrets file at {secrets_path}")
+        return None
+
+
+def normalize_call_id(value) -> str:
+    # Same rules as app_normalize_call_id() in 20260117_ceo_cmo_chart_views.sql.
+    s = str(value).strip() if value is not None else ""
+    return _QUOTES_RE.sub("", _BRACES_RE.sub("", s))
+
+
+def derive_market(market, pipeline_name) -> str:
+    # Same rules as the COALESCE(NULLIF(market, ''), CASE pipeline_name ...) used by the chart views.
+    m = str(market).strip() if market is not None else ""
+    if m:
+        return m
+    p = str(pipeline_name or "").strip().upper()
+    for prefix in ("CZ", "SK", "RUK"):
+        if p.startswith(prefix):
+            return prefix
+    return "Others"
+
+
+def _scalar(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise ValueError("nested values are not supported")
+
+
+def validate_call(payload, columns):
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    unknown = set(payload) - columns
+    if unknown:
+        raise ValueError(f"unknown columns: {sorted(unknown)}")
+    row = {key: _scalar(value) for key, value in payload.items()}
+    row["call_id"] = normalize_call_id(row.get("call_id"))
+    if not row["call_id"]:
+        raise ValueError("call_id is required")
+    if "market" in columns and ("market" in row or "pipeline_name" in row):
+        row["market"] = derive_market(row.get("market"), row.get("pipeline_name"))
+    return row
+
+
+def validate_ads(payload, ads_columns):
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    call_id = normalize_call_id(payload.get("call_id"))
+    lead_id = str(payload.get("lead_id") or "").strip()
+    if not call_id and not lead_id:
+        raise ValueError("call_id or lead_id is required")
+    updates = {k: _scalar(v) for k, v in payload.items() if k not in ("call_id", "lead_id")}
+    unknown = set(updates) - ads_columns
+    if unknown:
+        raise ValueError(f"unknown ads columns: {sorted(unknown)}")
+    if not updates:
+        raise ValueError("no ads fields")
+    return ("call_id", call_id, updates) if call_id else ("lead_id", lead_id, updates)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+
+class IngestMetrics:
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counters = {
+            "accepted_calls": 0,
+            "accepted_ads": 0,
+            "rejected_invalid": 0,
+            "rejected_queue_full": 0,
+            "batches": 0,
+            "inserted_calls": 0,
+            "duplicate_calls": 0,
+            "updated_ads_rows": 0,
+            "flush_errors": 0,
+            "dead_lettered": 0,
+        }
+        self.max_queue_depth = 0
+        self.flush_ms = deque(maxlen=LATENCY_WINDOW)
+        self.latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self.last_flush_at = None
+
+    def add(self, key, n=1):
+        with self.lock:
+            self.counters[key] += n
+
+    def observe_depth(self, depth):
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def observe_flush(self, flush_ms, enqueued_at):
+        now = time.monotonic()
+        with self.lock:
+            self.flush_ms.append(flush_ms)
+            self.latency_ms.extend((now - t) * 1000 for t in enqueued_at)
+            self.last_flush_at = time.time()
+
+    def snapshot(self, queue_depth):
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                **self.counters,
+                "queue_depth": queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "flush_ms_p50": percentile(self.flush_ms, 0.5),
+                "flush_ms_p95": percentile(self.flush_ms, 0.95),
+                "latency_ms_p50": percentile(self.latency_ms, 0.5),
+                "latency_ms_p95": percentile(self.latency_ms, 0.95),
+                "avg_calls_per_min": round(self.counters["inserted_calls"] / uptime * 60, 1) if uptime else 0.0,
+                "last_flush_at": self.last_flush_at,
+                "uptime_sec": round(uptime, 1),
+            }
+
+
+class MicroBatcher:
+    """
+    Bounded queue drained by one flusher thread. A batch is flushed when it reaches `batch_size`
+    or `flush_interval` seconds after its first item: calls go in with one COPY + INSERT ... SELECT,
+    ads fields with one COPY + UPDATE ... FROM, so row triggers fire per statement instead of per event.
+    """
+
+    def __init__(self, db_cfg, table_name=TABLE_NAME, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SEC,
+                 max_queue=MAX_QUEUE, dead_letter_path=DEAD_LETTER_PATH):
+        self.db_cfg = db_cfg
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dead_letter_path = dead_letter_path
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.metrics = IngestMetrics()
+        self.conn = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self.columns = set()
+        self.ads_columns = set()
+
+    def start(self):
+        self._connect()
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = %s",
+                (self.table_name,),
+            )
+            self.columns = {r[0] for r in cur.fetchall()}
+        self.conn.rollback()
+        if not self.columns:
+            raise RuntimeError(f"Table '{self.table_name}' not found")
+        self.ads_columns = set(ADS_FIELD_MAPPING) & self.columns
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        if self.conn is not None:
+            self.conn.close()
+
+    def submit(self, kind, items):
+        """All-or-nothing enqueue; False means the queue is full and the caller should retry later."""
+        if self.queue.maxsize - self.queue.qsize() < len(items):
+            self.metrics.add("rejected_queue_full", len(items))
+            return False
+        now = time.monotonic()
+        for item in items:
+            self.queue.put((kind, item, now))
+        self.metrics.add(f"accepted_{kind}", len(items))
+        self.metrics.observe_depth(self.queue.qsize())
+        return True
+
+    def _connect(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = connect_postgres(self.db_cfg)
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            try:
+                first = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = first[2] + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        calls = [item for kind, item, _ in batch if kind == "calls"]
+        ads = [item for kind, item, _ in batch if kind == "ads"]
+        # Both statements are idempotent (NOT EXISTS insert, COALESCE update), so a whole batch can be retried.
+        for attempt in range(1, FLUSH_RETRIES + 1):
+            started = time.monotonic()
+            try:
+                if self.conn is None or self.conn.closed:
+                    self._connect()
+                inserted = 0
+                if calls:
+                    with self.conn.cursor() as cur:
+                        inserted = insert_new_rows(
+                            cur, self.table_name, calls,
+                            key_expr=pgsql.SQL("app_normalize_call_id(t.call_id::text)"),
+                        )
+                    self.conn.commit()
+                updated = 0
+                if ads:
+                    writer = BulkWriter(self.conn, self.table_name, batch_size=len(ads))
+                    for key_col, key, updates in ads:
+                        writer.add(key_col, key, updates)
+                    updated = writer.flush()
+                self.metrics.add("batches")
+                self.metrics.add("inserted_calls", inserted)
+                self.metrics.add("duplicate_calls", len(calls) - inserted)
+                self.metrics.add("updated_ads_rows", updated)
+                self.metrics.observe_flush((time.monotonic() - started) * 1000, [t for _, _, t in batch])
+                return
+            except Exception as e:
+                self.metrics.add("flush_errors")
+                print(f"  ❌ Flush attempt {attempt}/{FLUSH_RETRIES} failed ({len(batch)} items): {e}")
+                try:
+                    self.conn.rollback()
+                except Exception:
+                    self.conn = None
+                time.sleep(min(5.0, 0.5 * 2 ** attempt))
+        self._dead_letter(batch)
+
+    def _dead_letter(self, batch):
+        os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for kind, item, _ in batch:
+                f.write(json.dumps({"kind": kind, "item": item}, ensure_ascii=False) + "\n")
+        self.metrics.add("dead_lettered", len(batch))
+        print(f"  ❌ {len(batch)} items written to {self.dead_letter_path}")
+
+
+def make_handler(batcher, token=None):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self):
+            return not token or self.headers.get("Authorization") == f"Bearer {token}"
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                return self._send(200, {"ok": True})
+            if self.path == "/metrics":
+                return self._send(200, batcher.metrics.snapshot(batcher.queue.qsize()))
+            return self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return self._send(401, {"error": "unauthorized"})
+            kind = {"/calls": "calls", "/ads": "ads"}.get(self.path)
+            if kind is None:
+                return self._send(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                return self._send(413 if length else 400, {"error": "empty or oversized body"})
+            try:
+                payload = json.loads(self.rfile.read(length))
+            except ValueError:
+                return self._send(400, {"error": "invalid JSON"})
+            records = payload if isinstance(payload, list) else [payload]
+
+            valid, errors = [], []
+            for idx, record in enumerate(records):
+                try:
+                    if kind == "calls":
+                        valid.append(validate_call(record, batcher.columns))
+                    else:
+                        valid.append(validate_ads(record, batcher.ads_columns))
+                except ValueError as e:
+                    errors.append({"index": idx, "error": str(e)})
+            if errors:
+                batcher.metrics.add("rejected_invalid", len(errors))
+            if not valid:
+                return self._send(400, {"accepted": 0, "errors": errors})
+            if not batcher.submit(kind, valid):
+                return self._send(503, {"error": "queue full"}, {"Retry-After": "1"})
+            return self._send(202, {"accepted": len(valid), "errors": errors})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching ingestion service for call and ads payloads.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--table", default=TABLE_NAME)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_SEC, help="Seconds")
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE)
+    args = parser.parse_args()
+
+    secrets = load_secrets()
+    if not secrets or "database" not in secrets:
+        print("❌ [database] section missing in secrets.toml")
+        return
+    token = os.getenv("INGEST_TOKEN") or (secrets.get("ingest") or {}).get("token")
+    if not token:
+        print("⚠️ No ingest token configured ([ingest] token or INGEST_TOKEN); accepting unauthenticated requests.")
+
+    batcher = MicroBatcher(secrets["database"], args.table, args.batch_size, args.flush_interval, args.max_queue).start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batcher, token))
+    server.daemon_threads = True
+    print(f"✅ Ingest service on {args.host}:{args.port} -> '{args.table}' "
+          f"(batch {args.batch_size}, every {args.flush_interval}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Draining queue...")
+        batcher.stop()
+        print(json.dumps(batcher.metrics.snapshot(batcher.queue.qsize()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import os
+
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kommo_custom_fields.json")
+
+# Map Supabase Column -> Kommo Field Name (or Code), in order of preference
+ADS_FIELD_MAPPING = {
+    "campaign_id": ["Campaign ID"],
+    "campaign_name": ["Campaign name"],
+    "ad_group_id": ["AD group ID"],
+    "ad_group_name": ["AD group name"],
+    "ad_id": ["AD ID"],
+    "ad_name": ["AD name"],
+    "form_id_custom": ["Form ID"],
+    "form_id": ["form_id"],
+    "form_name": ["Form name"],
+    "utm_medium": ["utm_medium", "UTM_MEDIUM"],
+    "utm_term": ["utm_term", "UTM_TERM"],
+    "utm_content": ["utm_content", "UTM_CONTENT"],
+    "utm_campaign": ["utm_campaign", "UTM_CAMPAIGN"],
+    "utm_source": ["utm_source", "UTM_SOURCE"],
+    "tran_id": ["tran_id"],
+    "referer": ["Referer"],
+    "input_val": ["INPUT"],
+    "formname": ["FORMNAME"],
+    "group_id": ["group_id"],
+    "utm_underscore": ["UTM_"],
+    "google_client_id": ["google_client_id"],
+    "client_id": ["CLIENT_ID"],
+    "date_val": ["DATE"],
+}
+
+
+_UNKNOWN = object()
+
+
+def normalize_lead_id(value):
+    key = str(value).strip() if value is not None else ""
+    if key.endswith(".0"):
+        key = key[:-2]
+    return key
+
+
+class FieldExtractor:
+    """
+    Field-id -> (column, priority) table compiled once from the custom field catalog.
+    Names/codes missing from the catalog are still matched by name as a fallback.
+    When several fields feed one column, the lowest priority wins (mapping order, then catalog order).
+    """
+
+    def __init__(self, catalog, mapping=ADS_FIELD_MAPPING):
+        self.by_id = {}
+        self.fallback = {}
+        for col, keys in mapping.items():
+            for key_idx, key in enumerate(keys):
+                matched = False
+                for pos, field in enumerate(catalog):
+                    if key in (field.get("name"), field.get("code")):
+                        slot = (col, key_idx * 10000 + pos)
+                        current = self.by_id.get(field["id"])
+                        if current is None or slot[1] < current[1]:
+                            self.by_id[field["id"]] = slot
+                        matched = True
+                if not matched:
+                    self.fallback.setdefault(key, (col, key_idx * 10000 + len(catalog)))
+        # Catalog fields that feed no column map to None so they are skipped without the name fallback.
+        for field in catalog:
+            self.by_id.setdefault(field["id"], None)
+        self.columns = list(mapping)
+
+    @classmethod
+    def from_catalog(cls, path=CATALOG_PATH, mapping=ADS_FIELD_MAPPING):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), mapping)
+
+    def extract(self, lead):
+        custom_fields = lead.get("custom_fields_values") if lead else None
+        if not custom_fields:
+            return {}
+        by_id = self.by_id
+        fallback = self.fallback
+        values_by_col = {}
+        priority_by_col = {}
+        for cf in custom_fields:
+            slot = by_id.get(cf.get("field_id"), _UNKNOWN)
+            if slot is None:
+                continue
+            if slot is _UNKNOWN:
+                slot = fallback.get(cf.get("field_name")) or fallback.get(cf.get("field_code"))
+                if slot is None:
+                    continue
+            col, priority = slot
+            if priority_by_col.get(col, priority + 1) > priority:
+                priority_by_col[col] = priority
+                values = cf.get("values")
+                values_by_col[col] = values[0].get("value") if values else None
+        return values_by_col
+
+    def extract_many(self, payload):
+        """Accepts a list-endpoint response (or a list of leads); returns {lead_id: updates}."""
+        if isinstance(payload, dict):
+            payload = (payload.get("_embedded") or {}).get("leads") or []
+        return {normalize_lead_id(lead.get("id")): self.extract(lead) for lead in payload}
+
+
+_default_extractor = None
+
+
+def get_extractor():
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = FieldExtractor.from_catalog()
+    return _default_extractor
@@ -0,0 +1,447 @@
+import os
+import sys
+import threading
+import time
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+SNAPSHOT_DIR = os.getenv("LOCAL_SNAPSHOT_DIR") or os.path.join(os.getcwd(), ".cache", "snapshots")
+SNAPSHOT_SOURCES = ("Algonova_Calls_Raw", "v_analytics_attributes_frequency")
+SNAPSHOT_MAX_AGE_SEC = 600
+OFFLINE = str(os.getenv("DASHBOARD_OFFLINE", "")).strip().lower() in {"1", "true", "yes", "on"}
+
+_engine = None
+_engine_lock = threading.Lock()
+_engine_signature: float | None = None
+
+
+def is_available() -> bool:
+    return duckdb is not None
+
+
+def snapshot_path(name: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{name}.parquet")
+
+
+def has_snapshot(name: str) -> bool:
+    return os.path.exists(snapshot_path(name))
+
+
+def snapshot_age(name: str) -> float | None:
+    if not has_snapshot(name):
+        return None
+    return time.time() - os.path.getmtime(snapshot_path(name))
+
+
+def write_snapshot(name: str, df: pd.DataFrame) -> bool:
+    # A truncated fetch (fetch_view_data's attrs["partial"]) must never become the offline fallback.
+    if df is None or df.empty or df.attrs.get("partial"):
+        return False
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        out = df.copy()
+        for col in out.columns:
+            if out[col].dtype == object:
+                out[col] = out[col].astype("string")
+        tmp = snapshot_path(name) + ".tmp"
+        out.to_parquet(tmp, index=False)
+        os.replace(tmp, snapshot_path(name))
+        return True
+    except Exception:
+        return False
+
+
+def ensure_snapshot(name: str, df: pd.DataFrame) -> bool:
+    age = snapshot_age(name)
+    if age is not None and age < SNAPSHOT_MAX_AGE_SEC:
+        return False
+    return write_snapshot(name, df)
+
+
+_MACROS = [
+    """
+    CREATE OR REPLACE MACRO app_normalize_call_id(x) AS
+      regexp_replace(regexp_replace(trim(coalesce(CAST(x AS VARCHAR), '')), '[{}]', '', 'g'), '^["'']+|["'']+$', '', 'g')
+    """,
+    # DuckDB casts neither minute precision nor a space before the offset, so the text is brought to
+    # "YYYY-MM-DD HH:MM:SS[+hh[:mm]]" first; app_call_date accepts what the Postgres function accepts.
+    r"""
+    CREATE OR REPLACE MACRO app_call_ts_text(x) AS
+      regexp_replace(
+        regexp_replace(
+          regexp_replace(trim(CAST(x AS VARCHAR)), '^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2})(\s|Z|U|[+-]|$)', '\1 \2:00\3'),
+          '\s*(Z|UTC)$', '+00'
+        ),
+        '\s+([+-]\d{2}(:?\d{2})?)$', '\1'
+      )
+    """,
+    r"""
+    CREATE OR REPLACE MACRO app_call_date(x) AS
+      CASE
+        WHEN regexp_matches(CAST(x AS VARCHAR), '^\s*\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?\s*(Z|UTC|[+-]\d{2}(:?\d{2})?)\s*$')
+          THEN CAST(timezone('UTC', TRY_CAST(app_call_ts_text(x) AS TIMESTAMPTZ)) AS DATE)
+        WHEN regexp_matches(CAST(x AS VARCHAR), '^\s*\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$')
+          THEN CAST(TRY_CAST(app_call_ts_text(x) AS TIMESTAMP) AS DATE)
+      END
+    """,
+    """
+    CREATE OR REPLACE MACRO app_market(market, pipeline_name) AS
+      COALESCE(
+        NULLIF(CAST(market AS VARCHAR), ''),
+        CASE
+          WHEN pipeline_name ILIKE 'CZ%' THEN 'CZ'
+          WHEN pipeline_name ILIKE 'SK%' THEN 'SK'
+          WHEN pipeline_name ILIKE 'RUK%' THEN 'RUK'
+          ELSE 'Others'
+        END
+      )
+    """,
+]
+
+
+def _create_views(con):
+    raw = snapshot_path("Algonova_Calls_Raw").replace("'", "''")
+    con.execute(f"CREATE OR REPLACE VIEW calls_raw AS SELECT * FROM read_parquet('{raw}')")
+    cols = {r[0] for r in con.execute("DESCRIBE calls_raw").fetchall()}
+
+    def _col(name: str) -> str:
+        return f'"{name}"' if name in cols else "CAST(NULL AS VARCHAR)"
+
+    con.execute(
+        f"""
+        CREATE OR REPLACE VIEW v_app_calls_norm AS
+        SELECT
+          CAST({_col("call_id")} AS VARCHAR) AS call_id,
+          CAST({_col("lead_id")} AS VARCHAR) AS lead_id,
+          CAST({_col("manager")} AS VARCHAR) AS manager,
+          CAST({_col("pipeline_name")} AS VARCHAR) AS pipeline_name,
+          CAST({_col("market")} AS VARCHAR) AS market,
+          CAST({_col("mkt_market")} AS VARCHAR) AS mkt_market,
+          CAST({_col("mkt_manager")} AS VARCHAR) AS mkt_manager,
+          app_call_date({_col("call_datetime")}) AS call_date,
+          app_market({_col("market")}, {_col("pipeline_name")}) AS computed_market,
+          CAST({_col("call_type")} AS VARCHAR) AS call_type,
+          TRY_CAST(NULLIF(CAST({_col("call_duration_sec")} AS VARCHAR), '') AS DOUBLE) AS call_duration_sec,
+          TRY_CAST(NULLIF(CAST({_col("Average_quality")} AS VARCHAR), '') AS DOUBLE) AS average_quality,
+          CAST({_col("next_step_type")} AS VARCHAR) AS next_step_type
+        FROM calls_raw
+        """
+    )
+
+    if has_snapshot("v_analytics_attributes_frequency"):
+        attrs = snapshot_path("v_analytics_attributes_frequency").replace("'", "''")
+        con.execute(
+            f"""
+            CREATE OR REPLACE VIEW call_attributes AS
+            SELECT
+              app_normalize_call_id(call_id) AS call_id_norm,
+              lower(trim(CAST(attr_type AS VARCHAR))) AS attr_type,
+              trim(CAST(attr_value AS VARCHAR)) AS attr_value
+            FROM read_parquet('{attrs}')
+            WHERE attr_value IS NOT NULL
+              AND trim(CAST(attr_value AS VARCHAR)) <> ''
+              AND app_normalize_call_id(call_id) <> ''
+            """
+        )
+    else:
+        con.execute(
+            f"""
+            CREATE OR REPLACE VIEW call_attributes AS
+            WITH exploded AS (
+              SELECT app_normalize_call_id({_col("call_id")}) AS call_id_norm, 'goal' AS attr_type,
+                     unnest(string_split(CAST({_col("parent_goals")} AS VARCHAR), ';')) AS attr_value
+              FROM calls_raw
+              UNION ALL
+              SELECT app_normalize_call_id({_col("call_id")}), 'objection',
+                     unnest(string_split(CAST({_col("objection_list")} AS VARCHAR), ';'))
+              FROM calls_raw
+              UNION ALL
+              SELECT app_normalize_call_id({_col("call_id")}), 'fear',
+                     unnest(string_split(CAST({_col("parent_fears")} AS VARCHAR), ';'))
+              FROM calls_raw
+            )
+            SELECT call_id_norm, attr_type, trim(attr_value) AS attr_value
+            FROM exploded
+            WHERE call_id_norm <> ''
+              AND trim(attr_value) <> ''
+            """
+        )
+
+
+def _snapshot_signature() -> float:
+    return sum(os.path.getmtime(snapshot_path(n)) for n in SNAPSHOT_SOURCES if has_snapshot(n))
+
+
+def get_engine():
+    global _engine, _engine_signature
+    if duckdb is None or not has_snapshot("Algonova_Calls_Raw"):
+        return None
+    with _engine_lock:
+        if _engine is None:
+            _engine = duckdb.connect(database=":memory:")
+            _engine.execute(f"SET threads TO {os.cpu_count() or 1}")
+            _engine.execute("SET TimeZone = 'UTC'")
+            for macro in _MACROS:
+                _engine.execute(macro)
+        signature = _snapshot_signature()
+        if _engine_signature != signature:
+            _create_views(_engine)
+            _engine_signature = signature
+        return _engine
+
+
+_DATE_FILTER = """(
+    ($date_start::DATE IS NULL OR call_date >= $date_start::DATE)
+    AND ($date_end::DATE IS NULL OR call_date <= $date_end::DATE)
+  )"""
+_PIPELINE_FILTER = "(len($pipelines::VARCHAR[]) = 0 OR list_contains($pipelines::VARCHAR[], pipeline_name))"
+_MARKET_FILTER = "(len($markets::VARCHAR[]) = 0 OR list_contains($markets::VARCHAR[], computed_market))"
+_MANAGER_FILTER = "(len($managers::VARCHAR[]) = 0 OR list_contains($managers::VARCHAR[], manager))"
+_CALLS_FILTER = f"{_DATE_FILTER} AND {_MARKET_FILTER} AND {_PIPELINE_FILTER}"
+
+_ENTITY_FREQUENCY_SQL = """
+  WITH calls AS (
+    SELECT app_normalize_call_id(call_id) AS call_id_norm, pipeline_name
+    FROM v_app_calls_norm
+    WHERE call_id IS NOT NULL
+      AND trim(call_id) <> ''
+      AND {calls_filter}
+  ),
+  requested AS (
+    SELECT DISTINCT req AS attr_type, lower(req) AS attr_key
+    FROM (SELECT unnest($attr_types::VARCHAR[]) AS req)
+  ),
+  joined AS (
+    SELECT r.attr_type, c.pipeline_name, a.attr_value, c.call_id_norm
+    FROM calls c
+    JOIN call_attributes a ON a.call_id_norm = c.call_id_norm
+    JOIN requested r ON r.attr_key = a.attr_type
+  ),
+  totals AS (
+    SELECT pipeline_name, CAST(COUNT(DISTINCT call_id_norm) AS INTEGER) AS total_calls
+    FROM calls
+    GROUP BY pipeline_name
+  ),
+  agg AS (
+    SELECT
+      attr_type,
+      pipeline_name,
+      attr_value,
+      CAST(COUNT(DISTINCT call_id_norm) AS INTEGER) AS calls_with_attr,
+      CAST(COUNT(*) AS INTEGER) AS mentions
+    FROM joined
+    GROUP BY attr_type, pipeline_name, attr_value
+  )
+  SELECT
+    {attr_type_col}
+    a.pipeline_name,
+    a.attr_value,
+    a.calls_with_attr,
+    a.mentions,
+    t.total_calls,
+    COALESCE(a.calls_with_attr / NULLIF(t.total_calls, 0), 0) AS frequency
+  FROM agg a
+  JOIN totals t ON t.pipeline_name = a.pipeline_name
+"""
+
+LOCAL_RPC_SQL: dict[str, str] = {
+    "rpc_app_markets_pipelines": """
+      SELECT DISTINCT computed_market AS market, pipeline_name
+      FROM v_app_calls_norm
+      WHERE pipeline_name IS NOT NULL AND trim(pipeline_name) <> ''
+      ORDER BY market, pipeline_name
+    """,
+    "rpc_app_managers": """
+      SELECT DISTINCT manager
+      FROM v_app_calls_norm
+      WHERE manager IS NOT NULL AND trim(manager) <> ''
+      ORDER BY manager
+    """,
+    "rpc_app_calls_summary": f"""
+      SELECT
+        (SELECT COUNT(*) FROM v_app_calls_norm) AS total_rows,
+        COUNT(*) AS filtered_rows,
+        MIN(call_date) AS min_call_date,
+        MAX(call_date) AS max_call_date
+      FROM v_app_calls_norm
+      WHERE {_CALLS_FILTER} AND {_MANAGER_FILTER}
+    """,
+    "rpc_ceo_kpis": f"""
+      SELECT
+        ROUND(AVG(average_quality), 2) AS avg_quality,
+        ROUND(SUM(CASE WHEN lower(coalesce(next_step_type, '')) LIKE '%vague%' THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0) * 100, 1) AS vague_rate_pct,
+        ROUND(
+          SUM(CASE WHEN call_type IN ('intro_followup', 'sales_followup') THEN 1 ELSE 0 END)
+          / NULLIF(SUM(CASE WHEN call_type IN ('intro_call', 'sales_call') THEN 1 ELSE 0 END), 0),
+          2
+        ) AS avg_market_friction
+      FROM v_app_calls_norm
+      WHERE {_CALLS_FILTER}
+    """,
+    "rpc_ceo_vague_index_by_market": f"""
+      SELECT
+        computed_market AS market,
+        CASE WHEN lower(coalesce(next_step_type, '')) LIKE '%vague%' THEN 'Vague' ELSE 'Defined Next Step' END AS outcome_category,
+        COUNT(*) AS count
+      FROM v_app_calls_norm
+      WHERE {_CALLS_FILTER}
+      GROUP BY 1, 2
+      ORDER BY 1, 2
+    """,
+    "rpc_ceo_total_friction": f"""
+      WITH base AS (
+        SELECT computed_market AS market, call_type
+        FROM v_app_calls_norm
+        WHERE call_type IN ('intro_call', 'intro_followup', 'sales_call', 'sales_followup')
+          AND {_CALLS_FILTER}
+      ),
+      kinds AS (
+        SELECT * FROM (VALUES ('Intro Friction', 'intro_call', 'intro_followup'), ('Sales Friction', 'sales_call', 'sales_followup')) AS k(type, primary_type, followup_type)
+      )
+      SELECT
+        b.market,
+        k.type,
+        CAST(SUM(CASE WHEN b.call_type = k.primary_type THEN 1 ELSE 0 END) AS INTEGER) AS primaries,
+        CAST(SUM(CASE WHEN b.call_type = k.followup_type THEN 1 ELSE 0 END) AS INTEGER) AS followups,
+        CAST(SUM(CASE WHEN b.call_type IN (k.primary_type, k.followup_type) THEN 1 ELSE 0 END) AS INTEGER) AS calls_in_calc,
+        ROUND(
+          SUM(CASE WHEN b.call_type = k.followup_type THEN 1 ELSE 0 END)
+          / NULLIF(SUM(CASE WHEN b.call_type = k.primary_type THEN 1 ELSE 0 END), 0),
+          2
+        ) AS friction_index
+      FROM base b
+      CROSS JOIN kinds k
+      GROUP BY b.market, k.type
+    """,
+    "rpc_cmo_viscosity_intro_friction_by_manager": f"""
+      WITH base AS (
+        SELECT
+          NULLIF(mkt_manager, '') AS mkt_manager,
+          COALESCE(NULLIF(mkt_market, ''), NULLIF(market, ''), computed_market) AS mkt_market,
+          lead_id,
+          call_type
+        FROM v_app_calls_norm
+        WHERE {_DATE_FILTER} AND {_PIPELINE_FILTER}
+      )
+      SELECT
+        mkt_manager,
+        mkt_market,
+        COUNT(*) AS total_calls,
+        COUNT(DISTINCT lead_id) AS total_leads,
+        SUM(CASE WHEN call_type = 'intro_call' THEN 1 ELSE 0 END) AS intro_primaries,
+        SUM(CASE WHEN call_type = 'intro_followup' THEN 1 ELSE 0 END) AS intro_followups,
+        ROUND(COUNT(*) / NULLIF(COUNT(DISTINCT lead_id), 0), 2) AS viscosity_index,
+        ROUND(
+          SUM(CASE WHEN call_type = 'intro_followup' THEN 1 ELSE 0 END)
+          / NULLIF(SUM(CASE WHEN call_type = 'intro_call' THEN 1 ELSE 0 END), 0),
+          2
+        ) AS intro_friction_index
+      FROM base
+      WHERE mkt_manager IS NOT NULL
+        AND trim(mkt_manager) <> ''
+        AND (len($markets::VARCHAR[]) = 0 OR list_contains($markets::VARCHAR[], mkt_market))
+      GROUP BY mkt_manager, mkt_market
+      ORDER BY mkt_manager
+    """,
+    "rpc_cmo_intro_friction_heatmap": f"""
+      WITH base AS (
+        SELECT
+          COALESCE(NULLIF(mkt_market, ''), NULLIF(market, ''), computed_market, 'Unknown') AS mkt_market,
+          NULLIF(mkt_manager, '') AS mkt_manager,
+          call_type
+        FROM v_app_calls_norm
+        WHERE call_type IN ('intro_call', 'intro_followup')
+          AND {_DATE_FILTER}
+          AND {_PIPELINE_FILTER}
+      )
+      SELECT
+        mkt_market,
+        mkt_manager,
+        CAST(SUM(CASE WHEN call_type = 'intro_call' THEN 1 ELSE 0 END) AS INTEGER) AS intro_calls,
+        CAST(SUM(CASE WHEN call_type = 'intro_followup' THEN 1 ELSE 0 END) AS INTEGER) AS intro_flups,
+        CAST(COUNT(*) AS INTEGER) AS calls_in_calc,
+        ROUND(
+          SUM(CASE WHEN call_type = 'intro_followup' THEN 1 ELSE 0 END)
+          / NULLIF(SUM(CASE WHEN call_type = 'intro_call' THEN 1 ELSE 0 END), 0),
+          2
+        ) AS intro_friction_index
+      FROM base
+      WHERE mkt_manager IS NOT NULL
+        AND trim(mkt_manager) <> ''
+        AND (len($markets::VARCHAR[]) = 0 OR list_contains($markets::VARCHAR[], mkt_market))
+      GROUP BY mkt_market, mkt_manager
+      ORDER BY mkt_market, mkt_manager
+    """,
+    "rpc_cmo_entity_frequency": _ENTITY_FREQUENCY_SQL.format(calls_filter=_CALLS_FILTER, attr_type_col=""),
+    "rpc_cmo_entity_frequency_multi": _ENTITY_FREQUENCY_SQL.format(calls_filter=_CALLS_FILTER, attr_type_col="a.attr_type,"),
+    "rpc_cso_ops_kpis": f"""
+      SELECT
+        COUNT(*) AS total_calls,
+        SUM(CASE WHEN call_type = 'intro_call' THEN 1 ELSE 0 END) AS intro_calls,
+        SUM(CASE WHEN call_type = 'intro_followup' THEN 1 ELSE 0 END) AS intro_flup,
+        SUM(CASE WHEN call_type = 'sales_call' THEN 1 ELSE 0 END) AS sales_calls,
+        SUM(CASE WHEN call_type = 'sales_followup' THEN 1 ELSE 0 END) AS sales_flup,
+        ROUND(AVG(average_quality), 2) AS avg_quality
+      FROM v_app_calls_norm
+      WHERE {_CALLS_FILTER} AND {_MANAGER_FILTER}
+    """,
+}
+
+
+def _bind_params(sql: str, params: dict | None) -> dict:
+    p = dict(params or {})
+    if "attr_type" in p and "attr_types" not in p:
+        p["attr_types"] = [p.pop("attr_type")]
+    bound = {}
+    for name in ("date_start", "date_end"):
+        bound[name] = p.get(name) or None
+    for name in ("markets", "pipelines", "managers", "attr_types"):
+        bound[name] = [str(v) for v in (p.get(name) or [])]
+    return {k: v for k, v in bound.items() if f"${k}" in sql}
+
+
+def supports(function_name: str) -> bool:
+    return function_name in LOCAL_RPC_SQL
+
+
+def run_rpc(function_name: str, params: dict | None = None) -> pd.DataFrame | None:
+    sql = LOCAL_RPC_SQL.get(function_name)
+    if sql is None:
+        return None
+    engine = get_engine()
+    if engine is None:
+        return None
+    try:
+        cur = engine.cursor()
+        try:
+            df = cur.execute(sql, _bind_params(sql, params)).df()
+        finally:
+            cur.close()
+    except Exception:
+        return None
+    df.attrs["source"] = "local_snapshot"
+    return df
+
+
+def refresh_snapshots() -> dict[str, int]:
+    import database as db
+
+    written = {}
+    for name in SNAPSHOT_SOURCES:
+        df = db.fetch_view_data(name)
+        if write_snapshot(name, df):
+            written[name] = len(df)
+    return written
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        for name, rows in refresh_snapshots().items():
+            print(f"{name}: {rows} rows -> {snapshot_path(name)}")
+    else:
+        print("Usage: python local_engine.py refresh")
@@ -0,0 +1,188 @@
+import csv
+import io
+import time
+
+import psycopg2
+from psycopg2 import sql as pgsql
+
+
+WRITE_BATCH = 5000
+
+
+def derive_pooler_config(cfg: dict) -> dict | None:
+    host = str(cfg.get("host", "")).strip()
+    if host.startswith("db.") and host.endswith(".supabase.co"):
+        parts = host.split(".")
+        if len(parts) >= 3:
+            project_ref = parts[1]
+            user = str(cfg.get("user", "")).strip()
+            if user and "." not in user:
+                user = f"{user}.{project_ref}"
+            return {
+                "host": "aws-1-eu-west-1.pooler.supabase.com",
+                "port": int(cfg.get("pooler_port", 6543)),
+                "name": str(cfg.get("name", "postgres")),
+                "user": user,
+                "pass": str(cfg.get("pass", "")),
+            }
+    return None
+
+
+def connect_postgres(cfg: dict):
+    """Direct host first, Supabase pooler as fallback. Shared by the dashboard (database.py) and the workers."""
+    def _connect(host: str, port: int, user: str):
+        return psycopg2.connect(
+            host=host,
+            port=int(port),
+            database=cfg["name"],
+            user=user,
+            password=cfg["pass"],
+            sslmode="require",
+        )
+
+    host = str(cfg.get("host", "")).strip()
+    port = int(cfg.get("port", 5432))
+    user = str(cfg.get("user", "")).strip()
+    try:
+        return _connect(host, port, user)
+    except Exception:
+        pooler = derive_pooler_config(cfg)
+        if not pooler or not pooler.get("user"):
+            raise
+        return psycopg2.connect(
+            host=pooler["host"],
+            port=pooler["port"],
+            database=pooler["name"],
+            user=pooler["user"],
+            password=pooler["pass"],
+            sslmode="require",
+        )
+
+
+def copy_to_stage(cur, table_name, stage_name, columns, records):
+    """
+    (Re)creates a temp table with the target's column types and COPYs `records`
+    (sequences aligned with `columns`) into it. COPY does the casting.
+    """
+    stage = pgsql.Identifier(stage_name)
+    cur.execute(pgsql.SQL("DROP TABLE IF EXISTS pg_temp.{stage}").format(stage=stage))
+    cur.execute(
+        pgsql.SQL("CREATE TEMP TABLE {stage} AS SELECT {cols} FROM {target} WITH NO DATA").format(
+            stage=stage,
+            cols=pgsql.SQL(", ").join(pgsql.Identifier(c) for c in columns),
+            target=pgsql.Identifier(table_name),
+        )
+    )
+    data = io.StringIO()
+    out = csv.writer(data)
+    out.writerows(records)
+    data.seek(0)
+    cur.copy_expert(pgsql.SQL("COPY {stage} FROM STDIN WITH (FORMAT csv)").format(stage=stage).as_string(cur), data)
+    return stage
+
+
+def insert_new_rows(cur, table_name, rows, key_col="call_id", key_expr=None):
+    """
+    COPY + one INSERT ... SELECT for a batch of dict rows; rows whose key already exists are skipped,
+    so a redelivered event is a no-op. `key_expr` (SQL over t.<key_col>) lets the lookup use an expression index.
+    Returns the number of inserted rows.
+    """
+    if not rows:
+        return 0
+    columns = [key_col] + sorted({col for row in rows for col in row} - {key_col})
+    latest = {}
+    for row in rows:
+        latest[row[key_col]] = row
+    stage = copy_to_stage(
+        cur, table_name, "ingest_calls_stage", columns, ([row.get(col) for col in columns] for row in latest.values())
+    )
+    existing_key = key_expr or pgsql.SQL("t.{key}").format(key=pgsql.Identifier(key_col))
+    cols = pgsql.SQL(", ").join(pgsql.Identifier(c) for c in columns)
+    cur.execute(
+        pgsql.SQL(
+            "INSERT INTO {target} ({cols}) SELECT {cols} FROM {stage} AS s "
+            "WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {existing_key} = s.{key})"
+        ).format(
+            target=pgsql.Identifier(table_name),
+            cols=cols,
+            stage=stage,
+            existing_key=existing_key,
+            key=pgsql.Identifier(key_col),
+        )
+    )
+    return cur.rowcount
+
+
+class BulkWriter:
+    """
+    Buffers mapped rows and flushes them as COPY into a temp table
+    followed by a single UPDATE ... FROM per key column, one transaction per flush.
+    With `only_changed` the UPDATE skips rows that already hold every non-NULL staged value,
+    so re-sending known values costs an index lookup rather than a row rewrite.
+    """
+    def __init__(self, conn, table_name, batch_size=WRITE_BATCH, only_changed=False):
+        self.conn = conn
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.only_changed = only_changed
+        self.buffer = {}
+        self.rows = 0
+        self.seconds = 0.0
+
+    def pending(self):
+        return sum(len(items) for items in self.buffer.values())
+
+    def add(self, key_col, key, updates):
+        self.buffer.setdefault(key_col, {}).setdefault(str(key), {}).update(updates)
+        return self.pending() >= self.batch_size
+
+    def flush(self):
+        if not self.buffer:
+            return 0
+        started = time.monotonic()
+        buffer, self.buffer = self.buffer, {}
+        written = 0
+        try:
+            with self.conn.cursor() as cur:
+                for key_col, items in buffer.items():
+                    written += self._flush_key(cur, key_col, items)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.rows += written
+        self.seconds += time.monotonic() - started
+        return written
+
+    def _flush_key(self, cur, key_col, items):
+        columns = sorted({col for updates in items.values() for col in updates})
+        stage = copy_to_stage(
+            cur,
+            self.table_name,
+            "ads_backfill_stage",
+            [key_col] + columns,
+            ([key] + [updates.get(col) for col in columns] for key, updates in items.items()),
+        )
+        condition = pgsql.SQL("t.{key} = s.{key}").format(key=pgsql.Identifier(key_col))
+        if self.only_changed:
+            # NULL in the stage keeps the stored value, so only non-NULL differences count (incl. t.col IS NULL).
+            condition = pgsql.SQL("{condition} AND ({changed})").format(
+                condition=condition,
+                changed=pgsql.SQL(" OR ").join(
+                    pgsql.SQL("(s.{col} IS NOT NULL AND t.{col} IS DISTINCT FROM s.{col})").format(
+                        col=pgsql.Identifier(c)
+                    )
+                    for c in columns
+                ),
+            )
+        cur.execute(
+            pgsql.SQL("UPDATE {target} AS t SET {assignments} FROM {stage} AS s WHERE {condition}").format(
+                target=pgsql.Identifier(self.table_name),
+                stage=stage,
+                condition=condition,
+                assignments=pgsql.SQL(", ").join(
+                    pgsql.SQL("{col} = COALESCE(s.{col}, t.{col})").format(col=pgsql.Identifier(c)) for c in columns
+                ),
+            )
+        )
+        return cur.rowcount
@@ -0,0 +1,119 @@
+import cProfile
+import html
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(os.getcwd(), ".cache", "profiles")
+PROFILE_KEEP = 30
+CPROFILE_TOP = 80
+
+# cProfile can only be active once per process on Python 3.12+, so concurrent profiled reruns take turns.
+_profile_lock = threading.Lock()
+
+
+def _safe_label(label: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(label))[:60] or "run"
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" in filename:
+        return filename.split("site-packages", 1)[1].lstrip("/\\")
+    if os.path.isabs(filename) and filename.startswith(os.getcwd()):
+        return os.path.relpath(filename)
+    return filename
+
+
+def _cprofile_html(prof: cProfile.Profile, title: str, seconds: float) -> str:
+    stats = pstats.Stats(prof)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append((ct, tt, nc, cc, f"{func} ({_short_path(filename)}:{line})"))
+    rows.sort(reverse=True)
+    body = "\n".join(
+        f"<tr><td>{ct:.4f}</td><td>{tt:.4f}</td><td>{nc if nc == cc else f'{nc}/{cc}'}</td>"
+        f"<td style='width:40%'><div style='background:#F58518;height:10px;width:{min(100.0, 100 * ct / max(seconds, 1e-9)):.1f}%'></div></td>"
+        f"<td><code>{html.escape(name)}</code></td></tr>"
+        for ct, tt, nc, cc, name in rows[:CPROFILE_TOP]
+    )
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif;margin:20px}td,th{padding:2px 8px;text-align:left;font-size:13px}"
+        "tr:nth-child(even){background:#f3f3f3}</style></head><body>"
+        f"<h2>{html.escape(title)}</h2><p>Wall time {seconds:.3f} s. Top {CPROFILE_TOP} functions by cumulative time "
+        "(cProfile; the .prof file next to this report opens in snakeviz).</p>"
+        "<table><tr><th>cumulative s</th><th>own s</th><th>calls</th><th>share of run</th><th>function</th></tr>"
+        f"{body}</table></body></html>"
+    )
+
+
+def _prune(keep: int) -> None:
+    reports = list_reports()
+    for path in reports[keep:]:
+        for p in (path, path[: -len(".html")] + ".prof"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+@contextmanager
+def capture(label: str):
+    """Profile the enclosed block and save an HTML report to PROFILE_DIR.
+
+    Uses pyinstrument (sampling, flame-style HTML) when it is installed and cProfile otherwise.
+    Does nothing if another rerun is being profiled at the same moment.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+    started = time.time()
+    t0 = time.perf_counter()
+    profiler = SamplingProfiler(interval=0.001) if SamplingProfiler is not None else cProfile.Profile()
+    try:
+        if SamplingProfiler is not None:
+            profiler.start()
+        else:
+            profiler.enable()
+        try:
+            yield profiler
+        finally:
+            if SamplingProfiler is not None:
+                profiler.stop()
+            else:
+                profiler.disable()
+            seconds = time.perf_counter() - t0
+            name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}{int(started * 1000) % 1000:03d}-{_safe_label(label)}-{int(seconds * 1000)}ms"
+            try:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                base = os.path.join(PROFILE_DIR, name)
+                if SamplingProfiler is not None:
+                    report = profiler.output_html()
+                else:
+                    profiler.dump_stats(base + ".prof")
+                    report = _cprofile_html(profiler, name, seconds)
+                with open(base + ".html", "w", encoding="utf-8") as f:
+                    f.write(report)
+                _prune(PROFILE_KEEP)
+            except Exception:
+                pass
+    finally:
+        _profile_lock.release()
+
+
+def list_reports() -> list[str]:
+    """Saved HTML reports, newest first."""
+    try:
+        names = [n for n in os.listdir(PROFILE_DIR) if n.endswith(".html")]
+    except OSError:
+        return []
+    return [os.path.join(PROFILE_DIR, n) for n in sorted(names, reverse=True)]
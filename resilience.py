@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+
+import httpx
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one backend function.
+    Opens after `failure_threshold` failures in a row; once `reset_timeout` has passed it lets a single
+    probe call through (half-open). A successful probe closes it, a failed one reopens it for twice as long
+    (up to `max_reset_timeout`).
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0, max_reset_timeout: float = 300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._reset_timeout = reset_timeout
+        self._probe_in_flight = False
+        # Set while the breaker is not closed, so callers backing off between retries can stop waiting.
+        self._not_closed = threading.Event()
+        self.short_circuited = 0
+        self.last_error = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _state_locked(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may go to the backend now; in half-open state only one probe at a time."""
+        with self._lock:
+            state = self._state_locked(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def wait_open(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; returns True early (or at once) if the breaker is open or half-open."""
+        return self._not_closed.wait(timeout)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+            self._not_closed.clear()
+
+    def record_failure(self, error: str | None = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.last_error = error
+            if self._probe_in_flight:
+                # Failed probe: stay open, and back off longer before the next one.
+                self._probe_in_flight = False
+                self._reset_timeout = min(self._reset_timeout * 2, self.max_reset_timeout)
+                self._opened_at = now
+                return
+            self._failures += 1
+            if self._opened_at is None and self._failures >= self.failure_threshold:
+                self._opened_at = now
+                self._not_closed.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state_locked(now)
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_in_sec": round(max(0.0, self._opened_at + self._reset_timeout - now), 1) if state == "open" else 0.0,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error,
+            }
+
+
+class RetryBudgetExceeded(Exception):
+    """The next attempt, or the wait before it, would run past the caller's deadline."""
+
+
+class CircuitOpen(Exception):
+    """The breaker passed to RetryPolicy.call is open, so no attempt was made."""
+
+
+# PostgREST reports gateway failures as APIError with the HTTP status in `code`.
+RETRYABLE_STATUS = {"408", "429", "500", "502", "503", "504"}
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff bounded by a per-attempt timeout and a total time budget.
+    Only network errors (httpx.TransportError) and retryable HTTP statuses are retried; anything else is
+    raised on the first attempt.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 4.0,
+                 attempt_timeout: float = 20.0, total_budget: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.total_budget = total_budget
+
+    def deadline(self) -> float:
+        return time.monotonic() + self.total_budget
+
+    def is_retryable(self, e: Exception) -> bool:
+        if isinstance(e, httpx.TransportError):
+            return True
+        if isinstance(e, httpx.HTTPStatusError):
+            return str(e.response.status_code) in RETRYABLE_STATUS
+        return str(getattr(e, "code", "")) in RETRYABLE_STATUS
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": sessions that failed together do not retry in lockstep.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn, deadline: float, breaker: CircuitBreaker | None = None):
+        """
+        fn(timeout) with retries; timeout is the per-attempt limit, shortened to what is left of the budget.
+        With a breaker, every attempt is reported to it and none is made while it is open. The backoff wait ends
+        as soon as the breaker opens, so callers sharing a failing backend stop sleeping once enough have failed.
+        """
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RetryBudgetExceeded(f"time budget of {self.total_budget:.0f}s used up")
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpen(f"{breaker.name}: circuit open")
+            try:
+                result = fn(min(self.attempt_timeout, remaining))
+            except Exception as e:
+                retryable = self.is_retryable(e)
+                if breaker is not None:
+                    # Only backend trouble counts against the breaker; a bad request does not.
+                    if retryable:
+                        breaker.record_failure(type(e).__name__)
+                    else:
+                        breaker.record_success()
+                if not retryable or attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise RetryBudgetExceeded(f"time budget of {self.total_budget:.0f}s used up") from e
+                if breaker is None:
+                    time.sleep(delay)
+                else:
+                    breaker.wait_open(delay)
+                continue
+            if breaker is not None:
+                breaker.record_success()
+            return result
@@ -0,0 +1,85 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+SLOW_LOG_PATH = os.getenv("SLOW_CALL_LOG") or os.path.join(os.getcwd(), ".cache", "slow_calls.sqlite")
+THRESHOLD_MS = float(os.getenv("SLOW_CALL_MS", "1000"))
+
+_lock = threading.Lock()
+_ready_path: str | None = None
+
+
+def param_shape(params) -> str:
+    """Parameter names with the kind of value passed, e.g. 'date_end=set,date_start=set,markets[2],pipelines[0]'."""
+    if not isinstance(params, dict):
+        return "-" if params in (None, "", [], ()) else type(params).__name__
+    parts = []
+    for key in sorted(params):
+        value = params[key]
+        if isinstance(value, (list, tuple, set)):
+            parts.append(f"{key}[{len(value)}]")
+        elif isinstance(value, str) and value.startswith("<") and value.endswith(" items>"):
+            # Long lists arrive already summarized by database._normalize_param.
+            parts.append(f"{key}[{value[1:-len(' items>')]}]")
+        else:
+            parts.append(f"{key}={'-' if value in (None, '') else 'set'}")
+    return ",".join(parts) or "-"
+
+
+def _connect(path: str):
+    global _ready_path
+    conn = sqlite3.connect(path, timeout=5)
+    if _ready_path != path:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS slow_calls ("
+            " ts REAL NOT NULL, function TEXT NOT NULL, name TEXT NOT NULL, param_shape TEXT NOT NULL,"
+            " params TEXT, duration_ms REAL NOT NULL, rows INTEGER, cache TEXT, error TEXT)"
+        )
+        conn.commit()
+        _ready_path = path
+    return conn
+
+
+def should_log(duration_ms: float, error: str | None, threshold_ms: float | None = None) -> bool:
+    # Errors are always kept: a failed call looks exactly like an empty result on the dashboard.
+    return error is not None or duration_ms >= (THRESHOLD_MS if threshold_ms is None else threshold_ms)
+
+
+def record(function: str, name: str, params, duration_ms: float, rows: int, cache: str, error: str | None,
+           path: str | None = None) -> None:
+    """Append one entry; failures to write are ignored so logging never breaks a page."""
+    path = path or SLOW_LOG_PATH
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = _connect(path)
+            try:
+                conn.execute(
+                    "INSERT INTO slow_calls (ts, function, name, param_shape, params, duration_ms, rows, cache, error)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), function, name, param_shape(params),
+                     json.dumps(params, ensure_ascii=False, default=str), duration_ms, rows, cache, error),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except Exception:
+        pass
+
+
+def read_entries(path: str | None = None, since_ts: float | None = None) -> list[dict]:
+    path = path or SLOW_LOG_PATH
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        conn.row_factory = sqlite3.Row
+        cur = conn.execute(
+            "SELECT * FROM slow_calls WHERE ts >= ? ORDER BY ts", (since_ts or 0,)
+        )
+        return [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
@@ -1,6 +1,25 @@
+CREATE OR REPLACE FUNCTION app_call_date(input text)
+RETURNS date
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  -- Partition key of "Algonova_Calls_Raw", so the result must not depend on session settings.
+  -- Only ISO 8601 values (a date, or a date and time with optional seconds) are cast: ISO input ignores
+  -- DateStyle, an explicit offset (Z, UTC or +hh[:mm], a space before it allowed) fixes the instant regardless
+  -- of TimeZone, and values without an offset are read as UTC wall-clock time. Anything else, 'now'/'today'
+  -- included, is NULL; partition_calls_raw.py `prepare` reports such rows before they reach the default partition.
+  SELECT CASE
+    WHEN input ~ '^\s*\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?\s*(Z|UTC|[+-]\d{2}(:?\d{2})?)\s*$'
+      THEN (input::timestamptz AT TIME ZONE 'UTC')::date
+    WHEN input ~ '^\s*\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$'
+      THEN input::timestamp::date
+  END;
+$$;
+
+
 CREATE OR REPLACE VIEW v_ceo_total_friction AS
 SELECT
-  (call_datetime::timestamptz)::date AS call_date,
+  app_call_date(call_datetime::text) AS call_date,
   pipeline_name,
   COALESCE(
     NULLIF(market, ''),
@@ -18,7 +37,7 @@ WHERE call_type IN ('intro_call', 'intro_followup', 'sales_call', 'sales_followu
 
 CREATE OR REPLACE VIEW v_ceo_talk_time_per_lead_by_pipeline AS
 SELECT
-  (call_datetime::timestamptz)::date AS call_date,
+  app_call_date(call_datetime::text) AS call_date,
   pipeline_name,
   COALESCE(
     NULLIF(market, ''),
@@ -59,7 +78,7 @@ FROM v_ceo_talk_time_per_lead_by_pipeline;
 
 CREATE OR REPLACE VIEW v_cmo_intro_friction_vs_traffic_manager AS
 SELECT
-  (call_datetime::timestamptz)::date AS call_date,
+  app_call_date(call_datetime::text) AS call_date,
   COALESCE(NULLIF(mkt_market, ''), NULLIF(market, ''), 'Unknown') AS mkt_market,
   mkt_manager,
   pipeline_name,
@@ -74,7 +93,7 @@ WHERE call_type IN ('intro_call', 'intro_followup')
 
 CREATE OR REPLACE VIEW v_cmo_traffic_viscosity_vs_intro_friction AS
 SELECT
-  (call_datetime::timestamptz)::date AS call_date,
+  app_call_date(call_datetime::text) AS call_date,
   mkt_manager,
   pipeline_name,
   market,
@@ -88,7 +107,7 @@ WHERE mkt_manager IS NOT NULL
 
 CREATE OR REPLACE VIEW v_cmo_intro_friction_traffic_manager_market_pipeline AS
 SELECT
-  (call_datetime::timestamptz)::date AS call_date,
+  app_call_date(call_datetime::text) AS call_date,
   COALESCE(NULLIF(mkt_market, ''), NULLIF(market, ''), 'Unknown') AS mkt_market,
   mkt_manager,
   pipeline_name,
@@ -99,7 +118,7 @@ WHERE call_type IN ('intro_call', 'intro_followup')
   AND mkt_manager IS NOT NULL
   AND mkt_manager <> ''
 GROUP BY
-  (call_datetime::timestamptz)::date,
+  app_call_date(call_datetime::text),
   COALESCE(NULLIF(mkt_market, ''), NULLIF(market, ''), 'Unknown'),
   mkt_manager,
   pipeline_name;
@@ -134,7 +153,7 @@ SELECT
   r.mkt_market,
   r.mkt_manager,
   r.call_datetime,
-  (r.call_datetime::timestamptz)::date AS call_date,
+  app_call_date(r.call_datetime::text) AS call_date,
   COALESCE(
     NULLIF(r.market, ''),
     CASE
@@ -174,8 +193,10 @@ AS $$
   WITH base AS (
     SELECT *
     FROM v_ceo_total_friction
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   )
@@ -232,8 +253,10 @@ AS $$
   WITH base AS (
     SELECT *
     FROM v_ceo_talk_time_per_lead_by_pipeline
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND minutes IS NOT NULL
@@ -296,8 +319,10 @@ AS $$
       (NULLIF("Average_quality"::text, '')::numeric) AS average_quality,
       next_step_type
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   )
@@ -344,8 +369,10 @@ AS $$
         ELSE 'Defined Next Step'
       END AS outcome_category
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   )
@@ -385,8 +412,10 @@ AS $$
       AND pipeline_name IS NOT NULL
       AND trim(pipeline_name) <> ''
       AND call_type IN ('intro_call','sales_call','intro_followup','sales_followup')
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   ),
@@ -476,8 +505,10 @@ AS $$
   filtered AS (
     SELECT *
     FROM base
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -517,8 +548,10 @@ AS $$
       lead_id,
       call_type
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   ),
   filtered AS (
@@ -568,8 +601,10 @@ AS $$
       call_type
     FROM v_app_calls_norm
     WHERE call_type IN ('intro_call', 'intro_followup')
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   ),
   filtered AS (
@@ -596,6 +631,130 @@ AS $$
 $$;
 
 
+CREATE TABLE IF NOT EXISTS call_attributes (
+  call_id_norm text NOT NULL,
+  attr_type text NOT NULL,
+  attr_value text NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_attributes_type_value ON call_attributes (attr_type, attr_value);
+CREATE INDEX IF NOT EXISTS idx_call_attributes_call_id_norm ON call_attributes (call_id_norm);
+CREATE INDEX IF NOT EXISTS idx_calls_raw_call_id_norm ON "Algonova_Calls_Raw" (app_normalize_call_id(call_id::text));
+
+
+-- Rebuilds call_attributes for the given normalized call ids (or the whole table when NULL).
+-- attr_type is stored lower-cased: 'goal' <- parent_goals, 'objection' <- objection_list, 'fear' <- parent_fears.
+CREATE OR REPLACE FUNCTION app_refresh_call_attributes(call_ids_norm text[] DEFAULT NULL)
+RETURNS bigint
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  inserted bigint;
+BEGIN
+  IF call_ids_norm IS NULL THEN
+    TRUNCATE call_attributes;
+  ELSIF cardinality(call_ids_norm) = 0 THEN
+    RETURN 0;
+  ELSE
+    DELETE FROM call_attributes ca
+    WHERE ca.call_id_norm = ANY(call_ids_norm);
+  END IF;
+
+  INSERT INTO call_attributes (call_id_norm, attr_type, attr_value)
+  SELECT
+    app_normalize_call_id(r.call_id::text),
+    x.attr_type,
+    trim(x.attr_value)
+  FROM "Algonova_Calls_Raw" r
+  CROSS JOIN LATERAL (
+    SELECT 'goal', unnest(string_to_array(r.parent_goals, ';'))
+    UNION ALL
+    SELECT 'objection', unnest(string_to_array(r.objection_list, ';'))
+    UNION ALL
+    SELECT 'fear', unnest(string_to_array(r.parent_fears, ';'))
+  ) AS x(attr_type, attr_value)
+  WHERE r.call_id IS NOT NULL
+    AND app_normalize_call_id(r.call_id::text) <> ''
+    AND trim(x.attr_value) <> ''
+    AND (call_ids_norm IS NULL OR app_normalize_call_id(r.call_id::text) = ANY(call_ids_norm));
+
+  GET DIAGNOSTICS inserted = ROW_COUNT;
+  RETURN inserted;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION app_sync_call_attributes()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  keys text[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT app_normalize_call_id(n.call_id::text))
+    INTO keys
+    FROM new_rows n;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(DISTINCT app_normalize_call_id(o.call_id::text))
+    INTO keys
+    FROM old_rows o;
+  ELSE
+    -- EXCEPT compares NULLs as equal and is planned as a hash set operation, so a bulk UPDATE
+    -- that leaves the attribute columns alone costs two hashed passes, not a nested loop.
+    SELECT array_agg(DISTINCT app_normalize_call_id(d.call_id::text))
+    INTO keys
+    FROM (
+      (
+        SELECT call_id, parent_goals, objection_list, parent_fears FROM new_rows
+        EXCEPT
+        SELECT call_id, parent_goals, objection_list, parent_fears FROM old_rows
+      )
+      UNION ALL
+      (
+        SELECT call_id, parent_goals, objection_list, parent_fears FROM old_rows
+        EXCEPT
+        SELECT call_id, parent_goals, objection_list, parent_fears FROM new_rows
+      )
+    ) d;
+  END IF;
+
+  keys := array_remove(keys, '');
+  IF keys IS NOT NULL AND cardinality(keys) > 0 THEN
+    PERFORM app_refresh_call_attributes(keys);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+
+DROP TRIGGER IF EXISTS trg_call_attributes_insert ON "Algonova_Calls_Raw";
+CREATE TRIGGER trg_call_attributes_insert
+AFTER INSERT ON "Algonova_Calls_Raw"
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION app_sync_call_attributes();
+
+DROP TRIGGER IF EXISTS trg_call_attributes_update ON "Algonova_Calls_Raw";
+CREATE TRIGGER trg_call_attributes_update
+AFTER UPDATE ON "Algonova_Calls_Raw"
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION app_sync_call_attributes();
+
+DROP TRIGGER IF EXISTS trg_call_attributes_delete ON "Algonova_Calls_Raw";
+CREATE TRIGGER trg_call_attributes_delete
+AFTER DELETE ON "Algonova_Calls_Raw"
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION app_sync_call_attributes();
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM call_attributes) THEN
+    PERFORM app_refresh_call_attributes();
+  END IF;
+END;
+$$;
+
+
 CREATE OR REPLACE FUNCTION rpc_cmo_entity_frequency(
   attr_type text,
   date_start date DEFAULT NULL,
@@ -622,29 +781,96 @@ AS $$
     FROM v_app_calls_norm
     WHERE call_id IS NOT NULL
       AND trim(call_id::text) <> ''
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
   ),
-  attrs AS (
+  joined AS (
+    SELECT
+      c.pipeline_name,
+      a.attr_value,
+      c.call_id_norm
+    FROM calls c
+    JOIN call_attributes a ON a.call_id_norm = c.call_id_norm
+    WHERE a.attr_type = lower(rpc_cmo_entity_frequency.attr_type)
+  ),
+  totals AS (
+    SELECT pipeline_name, COUNT(DISTINCT call_id_norm)::int AS total_calls
+    FROM calls
+    GROUP BY pipeline_name
+  ),
+  agg AS (
+    SELECT
+      pipeline_name,
+      attr_value,
+      COUNT(DISTINCT call_id_norm)::int AS calls_with_attr,
+      COUNT(*)::int AS mentions
+    FROM joined
+    GROUP BY pipeline_name, attr_value
+  )
+  SELECT
+    a.pipeline_name,
+    a.attr_value,
+    a.calls_with_attr,
+    a.mentions,
+    t.total_calls,
+    COALESCE((a.calls_with_attr::numeric / NULLIF(t.total_calls, 0)), 0) AS frequency
+  FROM agg a
+  JOIN totals t ON t.pipeline_name = a.pipeline_name;
+$$;
+
+
+CREATE OR REPLACE FUNCTION rpc_cmo_entity_frequency_multi(
+  attr_types text[],
+  date_start date DEFAULT NULL,
+  date_end date DEFAULT NULL,
+  markets text[] DEFAULT NULL,
+  pipelines text[] DEFAULT NULL
+)
+RETURNS TABLE (
+  attr_type text,
+  pipeline_name text,
+  attr_value text,
+  calls_with_attr int,
+  mentions int,
+  total_calls int,
+  frequency numeric
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH calls AS (
     SELECT
       app_normalize_call_id(call_id::text) AS call_id_norm,
-      attr_value
-    FROM v_analytics_attributes_frequency
-    WHERE attr_value IS NOT NULL
-      AND trim(attr_value) <> ''
-      AND call_id IS NOT NULL
+      pipeline_name
+    FROM v_app_calls_norm
+    WHERE call_id IS NOT NULL
       AND trim(call_id::text) <> ''
-      AND lower(attr_type) = lower(rpc_cmo_entity_frequency.attr_type)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
+      AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
+      AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
+  ),
+  requested AS (
+    SELECT DISTINCT
+      req AS attr_type,
+      lower(req) AS attr_key
+    FROM unnest(attr_types) AS req
   ),
   joined AS (
     SELECT
+      r.attr_type,
       c.pipeline_name,
       a.attr_value,
       c.call_id_norm
     FROM calls c
-    JOIN attrs a ON a.call_id_norm = c.call_id_norm
+    JOIN call_attributes a ON a.call_id_norm = c.call_id_norm
+    JOIN requested r ON r.attr_key = a.attr_type
   ),
   totals AS (
     SELECT pipeline_name, COUNT(DISTINCT call_id_norm)::int AS total_calls
@@ -653,14 +879,16 @@ AS $$
   ),
   agg AS (
     SELECT
+      attr_type,
       pipeline_name,
       attr_value,
       COUNT(DISTINCT call_id_norm)::int AS calls_with_attr,
       COUNT(*)::int AS mentions
     FROM joined
-    GROUP BY pipeline_name, attr_value
+    GROUP BY attr_type, pipeline_name, attr_value
   )
   SELECT
+    a.attr_type,
     a.pipeline_name,
     a.attr_value,
     a.calls_with_attr,
@@ -696,8 +924,10 @@ AS $$
       (NULLIF(call_duration_sec::text, '')::numeric) AS call_duration_sec,
       (NULLIF("Average_quality"::text, '')::numeric) AS average_quality
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -742,8 +972,10 @@ AS $$
       audio_url,
       kommo_link
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -797,8 +1029,10 @@ AS $$
       audio_url,
       kommo_link
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -840,8 +1074,10 @@ AS $$
       call_type,
       (NULLIF(call_duration_sec::text, '')::numeric) AS call_duration_sec
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -910,8 +1146,10 @@ AS $$
       call_type,
       (NULLIF(call_duration_sec::text, '')::numeric) AS call_duration_sec
     FROM v_app_calls_norm
-    WHERE (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+    WHERE (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -988,8 +1226,10 @@ AS $$
     WHERE call_date IS NOT NULL
       AND manager IS NOT NULL
       AND trim(manager) <> ''
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -1039,8 +1279,10 @@ AS $$
     FROM v_app_calls_norm
     WHERE manager IS NOT NULL
       AND trim(manager) <> ''
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -1098,8 +1340,10 @@ AS $$
     FROM v_app_calls_norm
     WHERE pipeline_name IS NOT NULL
       AND trim(pipeline_name) <> ''
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -1169,8 +1413,10 @@ AS $$
       AND trim(manager) <> ''
       AND pipeline_name IS NOT NULL
       AND trim(pipeline_name) <> ''
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
@@ -1239,8 +1485,10 @@ AS $$
     WHERE manager IS NOT NULL
       AND trim(manager) <> ''
       AND call_type IN ('intro_call', 'sales_call', 'intro_followup', 'sales_followup')
-      AND (date_start IS NULL OR call_date >= date_start)
-      AND (date_end IS NULL OR call_date <= date_end)
+      AND (
+        call_date BETWEEN COALESCE(date_start, '-infinity'::date) AND COALESCE(date_end, 'infinity'::date)
+        OR (call_date IS NULL AND date_start IS NULL AND date_end IS NULL)
+      )
       AND (markets IS NULL OR cardinality(markets) = 0 OR computed_market = ANY(markets))
       AND (pipelines IS NULL OR cardinality(pipelines) = 0 OR pipeline_name = ANY(pipelines))
       AND (managers IS NULL OR cardinality(managers) = 0 OR manager = ANY(managers))
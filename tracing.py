@@ -0,0 +1,198 @@
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+
+TRACE_DIR = os.getenv("TRACE_SPANS_DIR") or os.path.join(os.getcwd(), ".cache", "traces")
+TRACE_FILE = "spans.jsonl"
+TRACE_MAX_BYTES = int(os.getenv("TRACE_SPANS_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("TRACE_SPANS_BACKUPS", "5"))
+ENABLED = str(os.getenv("DASHBOARD_TRACING", "1")).strip().lower() not in {"0", "false", "no", "off"}
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "sales-dashboard")
+SCOPE_NAME = "dashboard.tracing"
+
+_current: contextvars.ContextVar = contextvars.ContextVar("dashboard_span", default=None)
+_logger = None
+_logger_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent", "start_unix_ns", "_t0", "end_unix_ns",
+                 "attributes", "error", "is_section", "open_section")
+
+    def __init__(self, name: str, trace: list, parent: "Span | None", is_section: bool = False):
+        self.name = name
+        self.trace = trace  # [trace_id, finished spans] shared by every span of one render
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.start_unix_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        self.end_unix_ns = None
+        self.attributes: dict = {}
+        self.error = None
+        self.is_section = is_section
+        self.open_section = None
+
+    def set_attribute(self, key: str, value) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.end_unix_ns is not None:
+            return
+        if self.open_section is not None:
+            self.open_section.end()
+        self.end_unix_ns = self.start_unix_ns + (time.perf_counter_ns() - self._t0)
+        self.trace[1].append(self)
+
+
+class _NoSpan:
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _attr_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(s: Span) -> dict:
+    out = {
+        "traceId": s.trace[0],
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(s.start_unix_ns),
+        "endTimeUnixNano": str(s.end_unix_ns),
+        "attributes": [{"key": k, "value": _attr_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+    }
+    if s.parent is not None:
+        out["parentSpanId"] = s.parent.span_id
+    return out
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(TRACE_DIR, TRACE_FILE),
+                maxBytes=TRACE_MAX_BYTES,
+                backupCount=TRACE_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("dashboard.tracing.export")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def _export(spans: list) -> None:
+    # One OTLP/JSON ExportTraceServiceRequest per line, the format of the collector's file exporter.
+    payload = {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [_otlp_span(s) for s in spans]}],
+        }]
+    }
+    try:
+        _get_logger().info(json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str))
+    except Exception:
+        pass
+
+
+@contextmanager
+def _run_span(s: Span):
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        # st.rerun()/st.stop() raise control-flow exceptions; only real errors mark the span.
+        if isinstance(e, Exception) and type(e).__module__.split(".")[0] != "streamlit":
+            s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Root span of one page render; every span finished inside it is exported as one line."""
+    if not ENABLED:
+        yield _NO_SPAN
+        return
+    root = Span(name, [secrets.token_hex(16), []], None)
+    for k, v in attributes.items():
+        root.set_attribute(k, v)
+    try:
+        with _run_span(root):
+            yield root
+    finally:
+        _export(root.trace[1])
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child of the current span; a no-op outside trace()."""
+    parent = _current.get()
+    if parent is None:
+        yield _NO_SPAN
+        return
+    s = Span(name, parent.trace, parent)
+    for k, v in attributes.items():
+        s.set_attribute(k, v)
+    with _run_span(s):
+        yield s
+
+
+def section(name: str) -> None:
+    """Start a section span that lasts until the next section() or the end of the enclosing span.
+
+    Lets dashboards mark sections in place instead of nesting each one in a with-block.
+    """
+    cur = _current.get()
+    if cur is None:
+        return
+    parent = cur.parent if cur.is_section else cur
+    if cur.is_section:
+        cur.end()
+    s = Span(name, parent.trace, parent, is_section=True)
+    parent.open_section = s
+    _current.set(s)
+
+
+def traced(name: str | None = None):
+    """Decorator form of span(), named after the function by default."""
+
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -2,6 +2,7 @@
 import pandas as pd
 import plotly.express as px
 from database import rpc_df
+from tracing import section, span, traced
 from app_i18n import call_type_label, market_label, pipeline_label, t
 from views.shared_ui import render_hint
 
@@ -10,6 +11,7 @@ def _plotly_template():
     return "plotly_dark" if st.session_state.get("ui_theme_v1", "dark") == "dark" else "plotly_white"
 
 
+@traced()
 def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
     st.markdown(f"<h1 style='text-align:center;'>{t('ceo.title')}</h1>", unsafe_allow_html=True)
     date_start = date_range[0] if len(date_range) == 2 else None
@@ -41,6 +43,7 @@ def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
 
     st.markdown("---")
     st.markdown("<div id='total-friction'></div>", unsafe_allow_html=True)
+    section("total-friction")
     st.subheader(t("ceo.total_friction"))
     render_hint(t("ceo.total_friction_hint"))
 
@@ -57,30 +60,32 @@ def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
             "Sales Friction": t("cso.metric.avg_sales_friction"),
         }
     ).fillna(fr_sql["type"].astype(str))
-    fig_fr = px.bar(
-        fr_sql,
-        x="market_display",
-        y="friction_index",
-        color="type_display",
-        barmode="group",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        custom_data=["primaries", "followups", "calls_in_calc"],
-        labels={"friction_index": t("ceo.total_market_friction"), "market_display": t("label.market"), "type_display": ""},
-    )
-    fig_fr.update_traces(
-        hovertemplate=(
-            f"{t('label.market')}: "+"%{x}<br>"
-            f"{t('label.type')}: "+"%{fullData.name}<br>"
-            f"{t('ceo.total_market_friction')}: "+"%{y:.2f}<br>"
-            f"{t('label.primary_calls')}: "+"%{customdata[0]}<br>"
-            f"{t('label.repeat_calls')}: "+"%{customdata[1]}<br>"
-            f"{t('label.calls_in_calc')}: "+"%{customdata[2]}<extra></extra>"
+    with span("plotly total-friction"):
+        fig_fr = px.bar(
+            fr_sql,
+            x="market_display",
+            y="friction_index",
+            color="type_display",
+            barmode="group",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            custom_data=["primaries", "followups", "calls_in_calc"],
+            labels={"friction_index": t("ceo.total_market_friction"), "market_display": t("label.market"), "type_display": ""},
         )
-    )
-    st.plotly_chart(fig_fr, use_container_width=True)
+        fig_fr.update_traces(
+            hovertemplate=(
+                f"{t('label.market')}: "+"%{x}<br>"
+                f"{t('label.type')}: "+"%{fullData.name}<br>"
+                f"{t('ceo.total_market_friction')}: "+"%{y:.2f}<br>"
+                f"{t('label.primary_calls')}: "+"%{customdata[0]}<br>"
+                f"{t('label.repeat_calls')}: "+"%{customdata[1]}<br>"
+                f"{t('label.calls_in_calc')}: "+"%{customdata[2]}<extra></extra>"
+            )
+        )
+        st.plotly_chart(fig_fr, use_container_width=True)
 
     st.markdown("<div id='vague-index-by-market'></div>", unsafe_allow_html=True)
+    section("vague-index-by-market")
     st.subheader(t("ceo.vague_index_market"))
     render_hint(t("ceo.vague_hint"))
     vi = rpc_df("rpc_ceo_vague_index_by_market", rpc_params)
@@ -88,21 +93,23 @@ def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
     if not vi.empty:
         vi["outcome_display"] = vi["outcome_category"].map({"Defined Next Step": t("ceo.defined_next_step"), "Vague": t("ceo.vague")}).fillna(vi["outcome_category"])
         vi["market_display"] = vi["market"].apply(market_label)
-    fig_vi = px.bar(
-        vi,
-        x="market_display" if not vi.empty else "market",
-        y="count",
-        color="outcome_display" if not vi.empty else "outcome_category",
-        barmode="relative",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        color_discrete_map={t("ceo.defined_next_step"): "#7d3cff", t("ceo.vague"): "#e74c3c"},
-    )
-    fig_vi.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title=t("label.market"), legend_title="")
-    st.plotly_chart(fig_vi, use_container_width=True)
+    with span("plotly vague-index"):
+        fig_vi = px.bar(
+            vi,
+            x="market_display" if not vi.empty else "market",
+            y="count",
+            color="outcome_display" if not vi.empty else "outcome_category",
+            barmode="relative",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            color_discrete_map={t("ceo.defined_next_step"): "#7d3cff", t("ceo.vague"): "#e74c3c"},
+        )
+        fig_vi.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title=t("label.market"), legend_title="")
+        st.plotly_chart(fig_vi, use_container_width=True)
 
     st.markdown("---")
     st.markdown("<div id='one-call-close-rate-by-pipeline'></div>", unsafe_allow_html=True)
+    section("one-call-close-rate-by-pipeline")
     st.subheader(t("ceo.occ_rate"))
     render_hint(t("ceo.occ_hint"))
     occ = rpc_df("rpc_ceo_one_call_close_rate_by_pipeline", rpc_params)
@@ -111,18 +118,20 @@ def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
     else:
         occ = occ.copy()
         occ["funnel_display"] = occ["pipeline_name"].apply(pipeline_label)
-        fig_occ = px.bar(
-            occ.sort_values("occ_rate_pct", ascending=False),
-            x="funnel_display",
-            y="occ_rate_pct",
-            template=_plotly_template(),
-            pattern_shape_sequence=[""],
-            hover_data=["occ_leads", "total_leads"],
-            labels={"funnel_display": t("label.funnel"), "occ_rate_pct": t("label.share_pct")},
-        )
-        st.plotly_chart(fig_occ, use_container_width=True)
+        with span("plotly one-call-close-rate"):
+            fig_occ = px.bar(
+                occ.sort_values("occ_rate_pct", ascending=False),
+                x="funnel_display",
+                y="occ_rate_pct",
+                template=_plotly_template(),
+                pattern_shape_sequence=[""],
+                hover_data=["occ_leads", "total_leads"],
+                labels={"funnel_display": t("label.funnel"), "occ_rate_pct": t("label.share_pct")},
+            )
+            st.plotly_chart(fig_occ, use_container_width=True)
 
     st.markdown("<div id='talk-time-per-lead-by-pipeline'></div>", unsafe_allow_html=True)
+    section("talk-time-per-lead-by-pipeline")
     st.subheader(t("ceo.call_type_per_lead"))
     render_hint(t("ceo.call_type_per_lead_hint"))
 
@@ -138,58 +147,61 @@ def render_ceo_dashboard(date_range, selected_markets, selected_pipelines):
     tt_sql = tt_sql.merge(calls_total, on="pipeline_name", how="left")
     tt_sql["share_calls_pct"] = (tt_sql["calls_type"] / tt_sql["calls_total_pipeline"].replace(0, pd.NA) * 100).fillna(0.0)
 
-    fig_share = px.bar(
-        tt_sql,
-        x="pipeline_display",
-        y="share_calls_pct",
-        color="call_type_display",
-        barmode="relative",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        custom_data=["leads_total", "calls_type", "total_minutes_type", "avg_minutes_per_call_type", "avg_minutes_per_lead_type", "total_minutes_pipeline"],
-        labels={"pipeline_display": t("label.funnel"), "share_calls_pct": t("label.share_pct")},
-    )
-    fig_share.update_layout(yaxis_title=t("label.share_pct"), xaxis_title=t("label.funnel"), legend_title="")
-    fig_share.update_traces(
-        hovertemplate=(
-            f"{t('label.funnel')}: "+"%{x}<br>"
-            f"{t('label.type')}: "+"%{fullData.name}<br>"
-            f"{t('label.share_pct')}: "+"%{y:.2f}<br>"
-            f"{t('label.avg_minutes_per_call')}: "+"%{customdata[3]:.2f}<br>"
-            f"{t('label.avg_minutes_per_lead')}: "+"%{customdata[4]:.2f}<br>"
-            f"{t('label.total_leads')}: "+"%{customdata[0]}<br>"
-            f"{t('label.calls')} ({t('label.type').lower()}): "+"%{customdata[1]}<br>"
-            f"{t('label.total_minutes_type')}: "+"%{customdata[2]:.1f}<br>"
-            f"{t('label.total_minutes_funnel')}: "+"%{customdata[5]:.1f}<extra></extra>"
+    with span("plotly talk-time-per-lead"):
+        fig_share = px.bar(
+            tt_sql,
+            x="pipeline_display",
+            y="share_calls_pct",
+            color="call_type_display",
+            barmode="relative",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            custom_data=["leads_total", "calls_type", "total_minutes_type", "avg_minutes_per_call_type", "avg_minutes_per_lead_type", "total_minutes_pipeline"],
+            labels={"pipeline_display": t("label.funnel"), "share_calls_pct": t("label.share_pct")},
+        )
+        fig_share.update_layout(yaxis_title=t("label.share_pct"), xaxis_title=t("label.funnel"), legend_title="")
+        fig_share.update_traces(
+            hovertemplate=(
+                f"{t('label.funnel')}: "+"%{x}<br>"
+                f"{t('label.type')}: "+"%{fullData.name}<br>"
+                f"{t('label.share_pct')}: "+"%{y:.2f}<br>"
+                f"{t('label.avg_minutes_per_call')}: "+"%{customdata[3]:.2f}<br>"
+                f"{t('label.avg_minutes_per_lead')}: "+"%{customdata[4]:.2f}<br>"
+                f"{t('label.total_leads')}: "+"%{customdata[0]}<br>"
+                f"{t('label.calls')} ({t('label.type').lower()}): "+"%{customdata[1]}<br>"
+                f"{t('label.total_minutes_type')}: "+"%{customdata[2]:.1f}<br>"
+                f"{t('label.total_minutes_funnel')}: "+"%{customdata[5]:.1f}<extra></extra>"
+            )
         )
-    )
-    st.plotly_chart(fig_share, use_container_width=True)
+        st.plotly_chart(fig_share, use_container_width=True)
 
     st.markdown("<div id='total-talk-time-by-pipeline'></div>", unsafe_allow_html=True)
+    section("total-talk-time-by-pipeline")
     st.subheader(t("ceo.total_talk_time"))
     render_hint(t("ceo.total_talk_time_hint"))
-    fig_tot = px.bar(
-        tt_sql,
-        x="pipeline_display",
-        y="share_calls_pct",
-        color="call_type_display",
-        barmode="relative",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        custom_data=["leads_total", "calls_type", "total_minutes_type", "total_minutes_pipeline"],
-        labels={"pipeline_display": t("label.funnel"), "share_calls_pct": t("label.share_pct")},
-    )
-    fig_tot.update_layout(yaxis_title=t("label.share_pct"), xaxis_title=t("label.funnel"), legend_title="")
-    fig_tot.update_traces(
-        hovertemplate=(
-            f"{t('label.funnel')}: "+"%{x}<br>"
-            f"{t('label.type')}: "+"%{fullData.name}<br>"
-            f"{t('label.share_pct')}: "+"%{y:.2f}<br>"
-            f"{t('label.total_leads')}: "+"%{customdata[0]}<br>"
-            f"{t('label.calls')} ({t('label.type').lower()}): "+"%{customdata[1]}<br>"
-            f"{t('label.total_minutes_type')}: "+"%{customdata[2]:.1f}<br>"
-            f"{t('label.total_minutes_funnel')}: "+"%{customdata[3]:.1f}<extra></extra>"
+    with span("plotly total-talk-time"):
+        fig_tot = px.bar(
+            tt_sql,
+            x="pipeline_display",
+            y="share_calls_pct",
+            color="call_type_display",
+            barmode="relative",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            custom_data=["leads_total", "calls_type", "total_minutes_type", "total_minutes_pipeline"],
+            labels={"pipeline_display": t("label.funnel"), "share_calls_pct": t("label.share_pct")},
+        )
+        fig_tot.update_layout(yaxis_title=t("label.share_pct"), xaxis_title=t("label.funnel"), legend_title="")
+        fig_tot.update_traces(
+            hovertemplate=(
+                f"{t('label.funnel')}: "+"%{x}<br>"
+                f"{t('label.type')}: "+"%{fullData.name}<br>"
+                f"{t('label.share_pct')}: "+"%{y:.2f}<br>"
+                f"{t('label.total_leads')}: "+"%{customdata[0]}<br>"
+                f"{t('label.calls')} ({t('label.type').lower()}): "+"%{customdata[1]}<br>"
+                f"{t('label.total_minutes_type')}: "+"%{customdata[2]:.1f}<br>"
+                f"{t('label.total_minutes_funnel')}: "+"%{customdata[3]:.1f}<extra></extra>"
+            )
         )
-    )
-    st.plotly_chart(fig_tot, use_container_width=True)
+        st.plotly_chart(fig_tot, use_container_width=True)
 
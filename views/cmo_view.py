@@ -2,7 +2,10 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import local_engine
+from attribute_frequency import compute_attribute_frequency
 from database import fetch_view_data, rpc_df
+from tracing import section, span, traced
 from app_i18n import market_label, pipeline_label, t
 from views.shared_ui import render_hint
 
@@ -15,13 +18,6 @@ def _traffic_chart_bgcolor() -> str:
     return "#111111" if _plotly_template() == "plotly_dark" else "#ffffff"
 
 
-def _normalize_call_id(series: pd.Series) -> pd.Series:
-    s = series.astype(str).str.strip()
-    s = s.str.replace(r"[{}]", "", regex=True)
-    s = s.str.replace(r"^[\"']+|[\"']+$", "", regex=True)
-    return s
-
-
 def _entity_heatmap_colorscale(attr_type: str):
     base = _traffic_chart_bgcolor()
     t0 = str(attr_type or "").strip().lower()
@@ -37,110 +33,63 @@ def _entity_heatmap_colorscale(attr_type: str):
 def _fetch_attribute_frequency_for_heatmap(attr_type: str, date_range, selected_markets, selected_pipelines) -> pd.DataFrame:
     date_start = date_range[0] if date_range and len(date_range) == 2 else None
     date_end = date_range[1] if date_range and len(date_range) == 2 else None
-    df_rpc = rpc_df(
-        "rpc_cmo_entity_frequency",
-        {
-            "attr_type": attr_type,
-            "date_start": date_start.isoformat() if date_start else None,
-            "date_end": date_end.isoformat() if date_end else None,
-            "markets": selected_markets or [],
-            "pipelines": selected_pipelines or [],
-        },
-    )
+    rpc_params = {
+        "attr_type": attr_type,
+        "date_start": date_start.isoformat() if date_start else None,
+        "date_end": date_end.isoformat() if date_end else None,
+        "markets": selected_markets or [],
+        "pipelines": selected_pipelines or [],
+    }
+    df_rpc = rpc_df("rpc_cmo_entity_frequency", rpc_params)
     if not df_rpc.empty:
-        df_rpc.attrs["entity_source"] = "rpc_cmo_entity_frequency"
+        # rpc_df already degrades to the last good result or the local engine; attrs["source"] says which.
+        source = df_rpc.attrs.get("source", "rpc")
+        df_rpc.attrs["entity_source"] = "rpc_cmo_entity_frequency" if source == "rpc" else source
         return df_rpc
 
     df_calls = fetch_view_data("Algonova_Calls_Raw")
     if df_calls.empty:
         return pd.DataFrame()
     df_attrs = fetch_view_data("v_analytics_attributes_frequency")
-    df_calls = df_calls.copy()
-    if "pipeline_name" not in df_calls.columns or "call_id" not in df_calls.columns:
-        return pd.DataFrame()
+    local_engine.ensure_snapshot("Algonova_Calls_Raw", df_calls)
+    local_engine.ensure_snapshot("v_analytics_attributes_frequency", df_attrs)
 
-    df_calls["call_id"] = _normalize_call_id(df_calls["call_id"])
-    df_calls = df_calls[df_calls["call_id"] != ""].copy()
-    if df_calls.empty:
-        return pd.DataFrame()
+    return compute_attribute_frequency(df_calls, df_attrs, attr_type, date_range, selected_markets, selected_pipelines)
 
-    if "call_datetime" in df_calls.columns:
-        call_date = pd.to_datetime(df_calls["call_datetime"], errors="coerce", utc=True).dt.date
-    elif "date" in df_calls.columns:
-        call_date = pd.to_datetime(df_calls["date"], errors="coerce").dt.date
-    else:
-        call_date = pd.Series([pd.NaT] * len(df_calls))
-    df_calls["call_date"] = call_date
-
-    df_calls["pipeline_name"] = df_calls["pipeline_name"].astype(str).str.strip()
-    market_col = df_calls["market"] if "market" in df_calls.columns else pd.Series([""] * len(df_calls))
-    market_col = market_col.astype(str).str.strip()
-    pipeline_col = df_calls["pipeline_name"].astype(str)
-    pipeline_market = pipeline_col.str.split("|").str[0].str.split(" ").str[0].str.strip()
-    df_calls["market_norm"] = market_col.where(market_col != "", pipeline_market)
-
-    mask = pd.Series([True] * len(df_calls))
-    if date_range and len(date_range) == 2:
-        mask = mask & (df_calls["call_date"] >= date_range[0]) & (df_calls["call_date"] <= date_range[1])
-    if selected_markets:
-        mask = mask & df_calls["market_norm"].isin(selected_markets)
-    if selected_pipelines:
-        mask = mask & df_calls["pipeline_name"].isin(selected_pipelines)
-
-    df_calls = df_calls[mask].copy()
-    if df_calls.empty:
-        return pd.DataFrame()
 
-    agg = pd.DataFrame()
-    if not df_attrs.empty and {"call_id", "attr_type", "attr_value"}.issubset(df_attrs.columns):
-        df_attrs = df_attrs.copy()
-        df_attrs["call_id"] = _normalize_call_id(df_attrs["call_id"])
-        df_attrs["attr_type"] = df_attrs["attr_type"].astype(str).str.strip()
-        df_attrs["attr_value"] = df_attrs["attr_value"].astype(str).str.strip()
-        if "market" in df_attrs.columns:
-            df_attrs["market"] = df_attrs["market"].astype(str).str.strip()
-        df_attrs = df_attrs[
-            (df_attrs["attr_type"].str.lower() == str(attr_type).lower())
-            & (df_attrs["attr_value"] != "")
-            & (df_attrs["call_id"] != "")
-        ].copy()
-        if not df_attrs.empty:
-            df_join = df_attrs.merge(df_calls[["call_id", "pipeline_name", "market_norm"]], on="call_id", how="inner")
-            if not df_join.empty:
-                if selected_markets:
-                    market_attr = df_join["market"] if "market" in df_join.columns else pd.Series([""] * len(df_join))
-                    market_attr = market_attr.astype(str).str.strip()
-                    market_final = market_attr.where(market_attr != "", df_join["market_norm"].astype(str).str.strip())
-                    df_join = df_join[market_final.isin(selected_markets)].copy()
-                if not df_join.empty:
-                    totals = df_calls.groupby("pipeline_name")["call_id"].nunique().rename("total_calls")
-                    agg = (
-                        df_join.groupby(["pipeline_name", "attr_value"])
-                        .agg(calls_with_attr=("call_id", "nunique"), mentions=("call_id", "size"))
-                        .reset_index()
-                    )
-                    agg = agg.merge(totals, on="pipeline_name", how="left")
-                    agg["frequency"] = (agg["calls_with_attr"] / agg["total_calls"].replace(0, pd.NA)).fillna(0.0)
+def _fetch_attribute_frequency_tables(attr_types: list[str], date_range, selected_markets, selected_pipelines) -> dict[str, pd.DataFrame]:
+    date_start = date_range[0] if date_range and len(date_range) == 2 else None
+    date_end = date_range[1] if date_range and len(date_range) == 2 else None
+    df_rpc = rpc_df(
+        "rpc_cmo_entity_frequency_multi",
+        {
+            "attr_types": list(attr_types),
+            "date_start": date_start.isoformat() if date_start else None,
+            "date_end": date_end.isoformat() if date_end else None,
+            "markets": selected_markets or [],
+            "pipelines": selected_pipelines or [],
+        },
+    )
+    if df_rpc.empty or "attr_type" not in df_rpc.columns:
+        return {a: _fetch_attribute_frequency_for_heatmap(a, date_range, selected_markets, selected_pipelines) for a in attr_types}
 
-    if agg.empty:
-        return pd.DataFrame()
-    return agg
+    attr_key = df_rpc["attr_type"].astype(str).str.strip().str.lower()
+    source = df_rpc.attrs.get("source", "rpc")
+    tables = {}
+    for a in attr_types:
+        part = df_rpc[attr_key == str(a).lower()].drop(columns=["attr_type"]).reset_index(drop=True)
+        part.attrs["entity_source"] = "rpc_cmo_entity_frequency_multi" if source == "rpc" else source
+        tables[a] = part
+    return tables
 
 
-def _render_attribute_frequency_heatmap(attr_type: str, title: str, colorscale, date_range, selected_markets, selected_pipelines):
-    attr_label_map = {"Goal": t("cmo.attr.goal"), "Objection": t("cmo.attr.objection"), "Fear": t("cmo.attr.fear")}
-    attr_label = attr_label_map.get(attr_type, attr_type)
-    df = _fetch_attribute_frequency_for_heatmap(attr_type, date_range, selected_markets, selected_pipelines)
-    if df.empty:
-        st.warning(t("cmo.no_data_heatmap_attr", attr_type=attr_type))
-        return
-
+def _prepare_attribute_heatmap(df: pd.DataFrame):
+    """Frequency table -> (attr_value x pipeline frequency matrix, hover customdata); None when nothing is left."""
     df["attr_value"] = df["attr_value"].astype(str).str.strip()
     df["pipeline_name"] = df["pipeline_name"].astype(str).str.strip()
     df = df[(df["attr_value"] != "") & (df["pipeline_name"] != "")].copy()
     if df.empty:
-        st.warning(t("cmo.no_valid_values_attr", attr_type=attr_type))
-        return
+        return None
 
     df["pipeline_display"] = df["pipeline_name"].apply(pipeline_label)
     df["mentions_per_call"] = (df["mentions"] / df["calls_with_attr"].replace(0, pd.NA)).fillna(0.0).round(2)
@@ -160,8 +109,6 @@ def _render_attribute_frequency_heatmap(attr_type: str, title: str, colorscale,
     mentions_per_call = mentions_per_call.reindex(index=z.index, columns=z.columns, fill_value=0.0)
     mention_share = mention_share.reindex(index=z.index, columns=z.columns, fill_value=0.0)
 
-    zmax = float(z.values.max()) if z.size else 1.0
-    zmax = min(1.0, max(0.25, zmax))
     custom = []
     for y in z.index:
         row = []
@@ -177,50 +124,102 @@ def _render_attribute_frequency_heatmap(attr_type: str, title: str, colorscale,
             )
         custom.append(row)
 
+    return z, custom
+
+
+def _prepare_intro_friction_heatmap(by_mm: pd.DataFrame):
+    """rpc_cmo_intro_friction_heatmap rows -> (market x traffic manager friction matrix, hover customdata)."""
+    by_mm["intro_calls"] = pd.to_numeric(by_mm.get("intro_calls"), errors="coerce").fillna(0).astype(int)
+    by_mm["intro_flups"] = pd.to_numeric(by_mm.get("intro_flups"), errors="coerce").fillna(0).astype(int)
+    by_mm["calls_in_calc"] = pd.to_numeric(by_mm.get("calls_in_calc"), errors="coerce").fillna(0).astype(int) if "calls_in_calc" in by_mm.columns else (by_mm["intro_calls"] + by_mm["intro_flups"]).astype(int)
+    by_mm["intro_friction_index"] = pd.to_numeric(by_mm.get("intro_friction_index"), errors="coerce").fillna(0).round(2)
+    by_mm["mkt_market"] = by_mm["mkt_market"].astype(str).str.strip()
+    by_mm["mkt_manager"] = by_mm["mkt_manager"].astype(str).str.strip()
+    by_mm = by_mm[(~by_mm["mkt_market"].isin({"", "Unknown", "0", "nan", "None"})) & (~by_mm["mkt_manager"].isin({"", "0", "nan", "None"}))].copy()
+    if by_mm.empty:
+        return None
+
+    by_mm["mkt_market_display"] = by_mm["mkt_market"].apply(market_label)
+    friction = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_friction_index").fillna(0)
+    calls = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_calls").fillna(0).astype(int)
+    flups = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_flups").fillna(0).astype(int)
+    calls_in_calc = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="calls_in_calc").fillna(0).astype(int)
+    calls = calls.reindex(index=friction.index, columns=friction.columns, fill_value=0)
+    flups = flups.reindex(index=friction.index, columns=friction.columns, fill_value=0)
+    calls_in_calc = calls_in_calc.reindex(index=friction.index, columns=friction.columns, fill_value=0)
+
+    custom = []
+    for y in friction.index:
+        row = []
+        for x in friction.columns:
+            row.append([int(calls.loc[y, x]), int(flups.loc[y, x]), int(calls_in_calc.loc[y, x])])
+        custom.append(row)
+    return friction, custom
+
+
+def _render_attribute_frequency_heatmap(attr_type: str, title: str, colorscale, df: pd.DataFrame):
+    attr_label_map = {"Goal": t("cmo.attr.goal"), "Objection": t("cmo.attr.objection"), "Fear": t("cmo.attr.fear")}
+    attr_label = attr_label_map.get(attr_type, attr_type)
+    if df.empty:
+        st.warning(t("cmo.no_data_heatmap_attr", attr_type=attr_type))
+        return
+
+    prepared = _prepare_attribute_heatmap(df)
+    if prepared is None:
+        st.warning(t("cmo.no_valid_values_attr", attr_type=attr_type))
+        return
+    z, custom = prepared
+
+    zmax = float(z.values.max()) if z.size else 1.0
+    zmax = min(1.0, max(0.25, zmax))
+
     st.subheader(title)
-    fig = go.Figure(
-        data=[
-            go.Heatmap(
-                z=z.values,
-                x=list(z.columns),
-                y=list(z.index),
-                customdata=custom,
-                colorscale=colorscale,
-                zmin=0,
-                zmax=zmax,
-                showscale=True,
-                colorbar=dict(title=t("label.frequency"), tickformat=".0%"),
-                hovertemplate=(
-                    f"{attr_label}: %{{y}}<br>"
-                    f"{t('label.funnel')}: "+"%{x}<br>"
-                    f"{t('cmo.calls_with_entity')}: "+"%{customdata[0]}<br>"
-                    f"{t('label.total_calls')}: "+"%{customdata[1]}<br>"
-                    f"{t('cmo.mentions')}: "+"%{customdata[2]}<br>"
-                    f"{t('cmo.mentions_per_call')}: "+"%{customdata[3]:.2f}<br>"
-                    f"{t('cmo.share_mentions_funnel')}: "+"%{customdata[4]:.1%}<br>"
-                    f"{t('label.frequency')}: "+"%{z:.1%}<br>"
-                    f"{t('cmo.formula_frequency')}<extra></extra>"
-                ),
-            )
-        ]
-    )
-    fig.update_layout(
-        template=_plotly_template(),
-        margin=dict(l=10, r=10, t=10, b=90),
-        paper_bgcolor=_traffic_chart_bgcolor(),
-        plot_bgcolor=_traffic_chart_bgcolor(),
-        xaxis_title=t("label.funnel"),
-        yaxis_title=attr_label,
-        height=max(520, 24 * len(z.index) + 260),
-    )
-    fig.update_xaxes(tickangle=-35, automargin=True)
-    fig.update_yaxes(automargin=True)
-    st.plotly_chart(fig, use_container_width=True)
+    with span("plotly attribute-heatmap"):
+        fig = go.Figure(
+            data=[
+                go.Heatmap(
+                    z=z.values,
+                    x=list(z.columns),
+                    y=list(z.index),
+                    customdata=custom,
+                    colorscale=colorscale,
+                    zmin=0,
+                    zmax=zmax,
+                    showscale=True,
+                    colorbar=dict(title=t("label.frequency"), tickformat=".0%"),
+                    hovertemplate=(
+                        f"{attr_label}: %{{y}}<br>"
+                        f"{t('label.funnel')}: "+"%{x}<br>"
+                        f"{t('cmo.calls_with_entity')}: "+"%{customdata[0]}<br>"
+                        f"{t('label.total_calls')}: "+"%{customdata[1]}<br>"
+                        f"{t('cmo.mentions')}: "+"%{customdata[2]}<br>"
+                        f"{t('cmo.mentions_per_call')}: "+"%{customdata[3]:.2f}<br>"
+                        f"{t('cmo.share_mentions_funnel')}: "+"%{customdata[4]:.1%}<br>"
+                        f"{t('label.frequency')}: "+"%{z:.1%}<br>"
+                        f"{t('cmo.formula_frequency')}<extra></extra>"
+                    ),
+                )
+            ]
+        )
+        fig.update_layout(
+            template=_plotly_template(),
+            margin=dict(l=10, r=10, t=10, b=90),
+            paper_bgcolor=_traffic_chart_bgcolor(),
+            plot_bgcolor=_traffic_chart_bgcolor(),
+            xaxis_title=t("label.funnel"),
+            yaxis_title=attr_label,
+            height=max(520, 24 * len(z.index) + 260),
+        )
+        fig.update_xaxes(tickangle=-35, automargin=True)
+        fig.update_yaxes(automargin=True)
+        st.plotly_chart(fig, use_container_width=True)
 
 
+@traced()
 def render_cmo_analytics(date_range, selected_markets, selected_pipelines):
     st.markdown(f"<h1 style='text-align:center;'>{t('cmo.title')}</h1>", unsafe_allow_html=True)
     st.markdown("<div id='traffic-viscosity-vs-intro-friction'></div>", unsafe_allow_html=True)
+    section("traffic-viscosity-vs-intro-friction")
     st.subheader(t("cmo.section.traffic_visc"))
     render_hint(t("cmo.hint.traffic_visc"))
 
@@ -256,46 +255,48 @@ def render_cmo_analytics(date_range, selected_markets, selected_pipelines):
     long_df["mkt_market"] = long_df["mkt_market"].fillna(t("cmo.unknown")).astype(str).str.strip()
     long_df["mkt_market_display"] = long_df["mkt_market"].apply(market_label)
 
-    fig_bar = px.bar(
-        long_df,
-        x="mkt_manager",
-        y="value",
-        color="metric",
-        barmode="group",
-        text="mkt_market_display",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        labels={"mkt_manager": t("cmo.traffic_manager"), "value": t("cmo.index")},
-        custom_data=["mkt_market_display", "total_calls", "total_leads", "intro_primaries", "intro_followups"],
-    )
-    fig_bar.update_traces(textposition="inside", texttemplate="%{text}")
-    fig_bar.for_each_trace(
-        lambda tr: tr.update(
-            hovertemplate=(
-                f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
-                f"{t('label.market')}: "+"%{customdata[0]}<br>"
-                f"{t('cmo.viscosity_index')}: "+"%{y:.2f}<br>"
-                f"{t('cmo.total_calls')}: "+"%{customdata[1]}<br>"
-                f"{t('cmo.total_leads')}: "+"%{customdata[2]}<br>"
-                f"{t('cmo.formula_calls_per_lead')}<extra></extra>"
-            )
-            if tr.name == t("cmo.viscosity_index")
-            else (
-                f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
-                f"{t('label.market')}: "+"%{customdata[0]}<br>"
-                    f"{t('cmo.intro_friction_index')}: "+"%{y:.2f}<br>"
-                    f"{t('cmo.intro_primaries')}: "+"%{customdata[3]}<br>"
-                    f"{t('cmo.intro_followups')}: "+"%{customdata[4]}<br>"
+    with span("plotly traffic-viscosity"):
+        fig_bar = px.bar(
+            long_df,
+            x="mkt_manager",
+            y="value",
+            color="metric",
+            barmode="group",
+            text="mkt_market_display",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            labels={"mkt_manager": t("cmo.traffic_manager"), "value": t("cmo.index")},
+            custom_data=["mkt_market_display", "total_calls", "total_leads", "intro_primaries", "intro_followups"],
+        )
+        fig_bar.update_traces(textposition="inside", texttemplate="%{text}")
+        fig_bar.for_each_trace(
+            lambda tr: tr.update(
+                hovertemplate=(
+                    f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
+                    f"{t('label.market')}: "+"%{customdata[0]}<br>"
+                    f"{t('cmo.viscosity_index')}: "+"%{y:.2f}<br>"
                     f"{t('cmo.total_calls')}: "+"%{customdata[1]}<br>"
-                    f"{t('cmo.formula_intro_friction')}<extra></extra>"
+                    f"{t('cmo.total_leads')}: "+"%{customdata[2]}<br>"
+                    f"{t('cmo.formula_calls_per_lead')}<extra></extra>"
                 )
+                if tr.name == t("cmo.viscosity_index")
+                else (
+                    f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
+                    f"{t('label.market')}: "+"%{customdata[0]}<br>"
+                        f"{t('cmo.intro_friction_index')}: "+"%{y:.2f}<br>"
+                        f"{t('cmo.intro_primaries')}: "+"%{customdata[3]}<br>"
+                        f"{t('cmo.intro_followups')}: "+"%{customdata[4]}<br>"
+                        f"{t('cmo.total_calls')}: "+"%{customdata[1]}<br>"
+                        f"{t('cmo.formula_intro_friction')}<extra></extra>"
+                    )
+            )
         )
-    )
-    fig_bar.update_layout(xaxis_title=t("cmo.traffic_manager"), margin=dict(l=10, r=10, t=10, b=80))
-    fig_bar.update_xaxes(tickangle=-35, automargin=True)
-    st.plotly_chart(fig_bar, use_container_width=True)
+        fig_bar.update_layout(xaxis_title=t("cmo.traffic_manager"), margin=dict(l=10, r=10, t=10, b=80))
+        fig_bar.update_xaxes(tickangle=-35, automargin=True)
+        st.plotly_chart(fig_bar, use_container_width=True)
 
     st.markdown("<div id='intro-friction-traffic-manager'></div>", unsafe_allow_html=True)
+    section("intro-friction-traffic-manager")
     st.subheader(t("cmo.section.intro_friction"))
     render_hint(t("cmo.hint.intro_friction"))
     with st.spinner(t("cmo.loading_heatmap")):
@@ -313,76 +314,62 @@ def render_cmo_analytics(date_range, selected_markets, selected_pipelines):
         st.warning(t("cmo.no_data_heatmap"))
         return
 
-    by_mm["intro_calls"] = pd.to_numeric(by_mm.get("intro_calls"), errors="coerce").fillna(0).astype(int)
-    by_mm["intro_flups"] = pd.to_numeric(by_mm.get("intro_flups"), errors="coerce").fillna(0).astype(int)
-    by_mm["calls_in_calc"] = pd.to_numeric(by_mm.get("calls_in_calc"), errors="coerce").fillna(0).astype(int) if "calls_in_calc" in by_mm.columns else (by_mm["intro_calls"] + by_mm["intro_flups"]).astype(int)
-    by_mm["intro_friction_index"] = pd.to_numeric(by_mm.get("intro_friction_index"), errors="coerce").fillna(0).round(2)
-    by_mm["mkt_market"] = by_mm["mkt_market"].astype(str).str.strip()
-    by_mm["mkt_manager"] = by_mm["mkt_manager"].astype(str).str.strip()
-    by_mm = by_mm[(~by_mm["mkt_market"].isin({"", "Unknown", "0", "nan", "None"})) & (~by_mm["mkt_manager"].isin({"", "0", "nan", "None"}))].copy()
-    if by_mm.empty:
+    prepared = _prepare_intro_friction_heatmap(by_mm)
+    if prepared is None:
         st.warning(t("cmo.no_valid_market_manager"))
         return
-
-    by_mm["mkt_market_display"] = by_mm["mkt_market"].apply(market_label)
-    friction = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_friction_index").fillna(0)
-    calls = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_calls").fillna(0).astype(int)
-    flups = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="intro_flups").fillna(0).astype(int)
-    calls_in_calc = by_mm.pivot(index="mkt_market_display", columns="mkt_manager", values="calls_in_calc").fillna(0).astype(int)
-    calls = calls.reindex(index=friction.index, columns=friction.columns, fill_value=0)
-    flups = flups.reindex(index=friction.index, columns=friction.columns, fill_value=0)
-    calls_in_calc = calls_in_calc.reindex(index=friction.index, columns=friction.columns, fill_value=0)
-
-    custom = []
-    for y in friction.index:
-        row = []
-        for x in friction.columns:
-            row.append([int(calls.loc[y, x]), int(flups.loc[y, x]), int(calls_in_calc.loc[y, x])])
-        custom.append(row)
-
-    fig_hm = go.Figure(
-        data=[
-            go.Heatmap(
-                z=friction.values,
-                x=list(friction.columns),
-                y=list(friction.index),
-                customdata=custom,
-                colorscale="Reds",
-                zmin=0,
-                showscale=True,
-                colorbar=dict(title=t("cmo.intro_friction"), tickformat=".2f"),
-                hovertemplate=(
-                    f"{t('label.market')}: "+"%{y}<br>"
-                    f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
-                    f"{t('cmo.intro_primaries')}: "+"%{customdata[0]}<br>"
-                    f"{t('cmo.intro_followups')}: "+"%{customdata[1]}<br>"
-                    f"{t('label.calls_in_calc')}: "+"%{customdata[2]}<br>"
-                    f"{t('cmo.intro_friction')}: "+"%{z:.2f}<br>"
-                    f"{t('cmo.formula_intro_friction')}<extra></extra>"
-                ),
-            )
-        ]
-    )
-    fig_hm.update_layout(
-        template=_plotly_template(),
-        margin=dict(l=10, r=10, t=10, b=90),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        xaxis_title=t("cmo.traffic_manager"),
-        yaxis_title=t("label.market"),
-        height=max(480, 28 * len(friction.index) + 220),
-    )
-    fig_hm.update_xaxes(tickangle=-35, automargin=True)
-    fig_hm.update_yaxes(automargin=True)
-    st.plotly_chart(fig_hm, use_container_width=True)
+    friction, custom = prepared
+
+    with span("plotly intro-friction-heatmap"):
+        fig_hm = go.Figure(
+            data=[
+                go.Heatmap(
+                    z=friction.values,
+                    x=list(friction.columns),
+                    y=list(friction.index),
+                    customdata=custom,
+                    colorscale="Reds",
+                    zmin=0,
+                    showscale=True,
+                    colorbar=dict(title=t("cmo.intro_friction"), tickformat=".2f"),
+                    hovertemplate=(
+                        f"{t('label.market')}: "+"%{y}<br>"
+                        f"{t('cmo.traffic_manager')}: "+"%{x}<br>"
+                        f"{t('cmo.intro_primaries')}: "+"%{customdata[0]}<br>"
+                        f"{t('cmo.intro_followups')}: "+"%{customdata[1]}<br>"
+                        f"{t('label.calls_in_calc')}: "+"%{customdata[2]}<br>"
+                        f"{t('cmo.intro_friction')}: "+"%{z:.2f}<br>"
+                        f"{t('cmo.formula_intro_friction')}<extra></extra>"
+                    ),
+                )
+            ]
+        )
+        fig_hm.update_layout(
+            template=_plotly_template(),
+            margin=dict(l=10, r=10, t=10, b=90),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            xaxis_title=t("cmo.traffic_manager"),
+            yaxis_title=t("label.market"),
+            height=max(480, 28 * len(friction.index) + 220),
+        )
+        fig_hm.update_xaxes(tickangle=-35, automargin=True)
+        fig_hm.update_yaxes(automargin=True)
+        st.plotly_chart(fig_hm, use_container_width=True)
 
     st.markdown("<div id='attribute-frequency-heatmaps'></div>", unsafe_allow_html=True)
+    section("attribute-frequency-heatmaps")
     render_hint(t("cmo.section.entity_heatmaps_hint"))
+    with st.spinner(t("cmo.loading_heatmap")):
+        entity_tables = _fetch_attribute_frequency_tables(["Goal", "Objection", "Fear"], date_range, selected_markets, selected_pipelines)
     st.markdown("<div id='goal-heatmap'></div>", unsafe_allow_html=True)
-    _render_attribute_frequency_heatmap("Goal", t("cmo.section.goal"), _entity_heatmap_colorscale("Goal"), date_range, selected_markets, selected_pipelines)
+    section("goal-heatmap")
+    _render_attribute_frequency_heatmap("Goal", t("cmo.section.goal"), _entity_heatmap_colorscale("Goal"), entity_tables["Goal"])
     st.markdown("<div id='objection-heatmap'></div>", unsafe_allow_html=True)
-    _render_attribute_frequency_heatmap("Objection", t("cmo.section.objection"), _entity_heatmap_colorscale("Objection"), date_range, selected_markets, selected_pipelines)
+    section("objection-heatmap")
+    _render_attribute_frequency_heatmap("Objection", t("cmo.section.objection"), _entity_heatmap_colorscale("Objection"), entity_tables["Objection"])
     st.markdown("<div id='fear-heatmap'></div>", unsafe_allow_html=True)
-    _render_attribute_frequency_heatmap("Fear", t("cmo.section.fear"), _entity_heatmap_colorscale("Fear"), date_range, selected_markets, selected_pipelines)
+    section("fear-heatmap")
+    _render_attribute_frequency_heatmap("Fear", t("cmo.section.fear"), _entity_heatmap_colorscale("Fear"), entity_tables["Fear"])
 
 
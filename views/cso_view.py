@@ -2,7 +2,8 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from database import fetch_view_data, rpc_df
+from database import fetch_view_data, friction_counts, rpc_df
+from tracing import section, span, traced
 from app_i18n import call_type_label, market_label, pipeline_label, t
 from views.shared_ui import render_hint
 
@@ -26,27 +27,24 @@ def _load_cso_quality_df(date_range, selected_markets, selected_pipelines, selec
     if df.empty:
         return df
 
-    out = df.copy()
-    out["call_datetime"] = pd.to_datetime(out.get("call_datetime"), errors="coerce", utc=True)
-    out = out[out["call_datetime"].notna()].copy()
-    if out.empty:
-        return out
-
+    # Every filter goes into one mask so the frame is sliced once instead of copied per step.
+    call_dt = pd.to_datetime(df.get("call_datetime", pd.Series(index=df.index, dtype="object")), errors="coerce", utc=True)
+    mask = call_dt.notna()
     if date_range and len(date_range) == 2:
         start_ts = pd.to_datetime(date_range[0]).tz_localize("UTC")
         end_ts = pd.to_datetime(date_range[1]).tz_localize("UTC") + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
-        out = out[(out["call_datetime"] >= start_ts) & (out["call_datetime"] <= end_ts)].copy()
+        mask &= (call_dt >= start_ts) & (call_dt <= end_ts)
     if selected_markets:
-        out = out[out["market"].astype(str).isin(selected_markets)].copy()
+        mask &= df["market"].astype(str).isin(selected_markets)
     if selected_pipelines:
-        out = out[out["pipeline_name"].astype(str).isin(selected_pipelines)].copy()
+        mask &= df["pipeline_name"].astype(str).isin(selected_pipelines)
     if selected_managers:
-        out = out[out["manager"].astype(str).isin(selected_managers)].copy()
-    if out.empty:
-        return out
+        mask &= df["manager"].astype(str).isin(selected_managers)
+    manager = df["manager"].astype(str).str.strip()
+    mask &= manager != ""
 
-    out["manager"] = out["manager"].astype(str).str.strip()
-    out = out[out["manager"] != ""].copy()
+    # assign() returns a frame of its own, so the column writes below never touch a slice of the cached result.
+    out = (df if mask.all() else df.loc[mask]).assign(call_datetime=call_dt[mask], manager=manager[mask])
     if out.empty:
         return out
 
@@ -63,6 +61,7 @@ def _load_cso_quality_df(date_range, selected_markets, selected_pipelines, selec
 def _render_cso_sales_quality(date_range, selected_markets, selected_pipelines, selected_managers=None):
     st.markdown("---")
     st.markdown("<div id='sales-quality'></div>", unsafe_allow_html=True)
+    section("sales-quality")
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.sales_quality')}</h2>", unsafe_allow_html=True)
     render_hint(t("cso.hint.sales_quality"))
 
@@ -108,11 +107,17 @@ def _render_cso_sales_quality(date_range, selected_markets, selected_pipelines,
             discovery=("sales_discovery_score_n", "mean"),
             objection=("sales_objection_score_n", "mean"),
             next_action=("followup_next_action_score_n", "mean"),
-            sales_calls=("call_type", lambda s: int((s == "sales_call").sum())),
-            followup_calls=("call_type", lambda s: int(s.isin(["intro_followup", "sales_followup"]).sum())),
         )
         .reset_index()
     )
+    counts = friction_counts(qdf, [["manager"]], ["sales_call"], ["intro_followup", "sales_followup"])[0]
+    mgr = mgr.merge(
+        counts.rename(columns={"primaries": "sales_calls", "followups": "followup_calls"})[
+            ["manager", "sales_calls", "followup_calls"]
+        ],
+        on="manager",
+        how="left",
+    )
     mgr = mgr[mgr["calls"] >= 30].copy()
     if not mgr.empty:
         score_cols = ["avg_quality", "control", "discovery", "objection", "next_action"]
@@ -160,19 +165,21 @@ def _render_cso_sales_quality(date_range, selected_markets, selected_pipelines,
         trend_long = trend_long[trend_long["value"].notna()].copy()
         if not trend_long.empty:
             st.markdown(f"### {t('cso.sales_quality.timeline')}")
-            fig_t = px.line(
-                trend_long,
-                x="call_week",
-                y="value",
-                color="metric",
-                markers=True,
-                template=_plotly_template(),
-                labels={"call_week": t("label.date"), "value": t("cso.sales_quality.yaxis"), "metric": ""},
-            )
-            fig_t.update_layout(legend_title="")
-            st.plotly_chart(fig_t, use_container_width=True)
+            with span("plotly sales-quality-trend"):
+                fig_t = px.line(
+                    trend_long,
+                    x="call_week",
+                    y="value",
+                    color="metric",
+                    markers=True,
+                    template=_plotly_template(),
+                    labels={"call_week": t("label.date"), "value": t("cso.sales_quality.yaxis"), "metric": ""},
+                )
+                fig_t.update_layout(legend_title="")
+                st.plotly_chart(fig_t, use_container_width=True)
 
 
+@traced()
 def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selected_managers=None):
     st.markdown(f"<h1 style='text-align:center;'>{t('cso.title')}</h1>", unsafe_allow_html=True)
     date_start = date_range[0] if len(date_range) == 2 else None
@@ -188,6 +195,7 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
     _render_cso_sales_quality(date_range, selected_markets, selected_pipelines, selected_managers)
 
     st.markdown("<div id='operations-feed'></div>", unsafe_allow_html=True)
+    section("operations-feed")
     df_kpi = rpc_df("rpc_cso_ops_kpis", params)
     if df_kpi.empty:
         st.warning(t("cso.no_data"))
@@ -218,29 +226,30 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         df_mgr["call_type_display"] = pd.Categorical(df_mgr["call_type_display"], categories=type_order, ordered=True)
         df_mgr = df_mgr.sort_values(["manager", "call_type_display"])
         df_mgr["label_calls"] = df_mgr.apply(lambda r: str(int(r["total_calls"])) if r["call_type_display"] == type_order[-1] else "", axis=1)
-        fig_ops = px.bar(
-            df_mgr,
-            y="manager",
-            x="minutes",
-            color="call_type_display",
-            orientation="h",
-            template=_plotly_template(),
-            pattern_shape_sequence=[""],
-            title=t("cso.chart.talk_time_manager"),
-            hover_data=["calls", "call_type_display", "total_calls"],
-            text="label_calls",
-        )
-        fig_ops.update_traces(
-            hovertemplate=(
-                f"{t('label.manager')}: "+"%{y}<br>"
-                f"{t('label.type')}: "+"%{customdata[1]}<br>"
-                f"{t('label.minutes')}: "+"%{x:.1f}<br>"
-                f"{t('label.calls')}: "+"%{customdata[0]}<br>"
-                f"{t('cso.kpi.total_calls')}: "+"%{customdata[2]}<extra></extra>"
+        with span("plotly operations-feed"):
+            fig_ops = px.bar(
+                df_mgr,
+                y="manager",
+                x="minutes",
+                color="call_type_display",
+                orientation="h",
+                template=_plotly_template(),
+                pattern_shape_sequence=[""],
+                title=t("cso.chart.talk_time_manager"),
+                hover_data=["calls", "call_type_display", "total_calls"],
+                text="label_calls",
             )
-        )
-        fig_ops.update_layout(yaxis_title="", xaxis_title=t("label.minutes"), legend_title="")
-        st.plotly_chart(fig_ops, use_container_width=True)
+            fig_ops.update_traces(
+                hovertemplate=(
+                    f"{t('label.manager')}: "+"%{y}<br>"
+                    f"{t('label.type')}: "+"%{customdata[1]}<br>"
+                    f"{t('label.minutes')}: "+"%{x:.1f}<br>"
+                    f"{t('label.calls')}: "+"%{customdata[0]}<br>"
+                    f"{t('cso.kpi.total_calls')}: "+"%{customdata[2]}<extra></extra>"
+                )
+            )
+            fig_ops.update_layout(yaxis_title="", xaxis_title=t("label.minutes"), legend_title="")
+            st.plotly_chart(fig_ops, use_container_width=True)
 
     df_pipe = rpc_df("rpc_cso_calls_by_pipeline", params)
     if not df_pipe.empty and {"pipeline_name", "call_type_group", "calls", "minutes", "total_minutes"}.issubset(df_pipe.columns):
@@ -251,32 +260,34 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         df_pipe["call_type_display"] = pd.Categorical(df_pipe["call_type_display"], categories=type_order, ordered=True)
         df_pipe = df_pipe.sort_values(["pipeline_display", "call_type_display"])
         df_pipe["label_minutes"] = df_pipe.apply(lambda r: f"{float(r['total_minutes']):.1f}" if r["call_type_display"] == type_order[-1] else "", axis=1)
-        fig_pipe = px.bar(
-            df_pipe,
-            y="pipeline_display",
-            x="calls",
-            color="call_type_display",
-            orientation="h",
-            template=_plotly_template(),
-            pattern_shape_sequence=[""],
-            title=t("cso.chart.total_calls_funnel"),
-            hover_data=["minutes", "call_type_display", "total_minutes"],
-            text="label_minutes",
-        )
-        fig_pipe.update_traces(
-            hovertemplate=(
-                f"{t('label.funnel')}: "+"%{y}<br>"
-                f"{t('label.type')}: "+"%{customdata[1]}<br>"
-                f"{t('label.calls')}: "+"%{x}<br>"
-                f"{t('label.minutes')}: "+"%{customdata[0]:.1f}<br>"
-                f"{t('label.total_minutes_funnel')}: "+"%{customdata[2]:.1f}<extra></extra>"
+        with span("plotly pipeline-mix"):
+            fig_pipe = px.bar(
+                df_pipe,
+                y="pipeline_display",
+                x="calls",
+                color="call_type_display",
+                orientation="h",
+                template=_plotly_template(),
+                pattern_shape_sequence=[""],
+                title=t("cso.chart.total_calls_funnel"),
+                hover_data=["minutes", "call_type_display", "total_minutes"],
+                text="label_minutes",
             )
-        )
-        fig_pipe.update_layout(yaxis_title="", xaxis_title=t("label.calls"), legend_title="")
-        st.plotly_chart(fig_pipe, use_container_width=True)
+            fig_pipe.update_traces(
+                hovertemplate=(
+                    f"{t('label.funnel')}: "+"%{y}<br>"
+                    f"{t('label.type')}: "+"%{customdata[1]}<br>"
+                    f"{t('label.calls')}: "+"%{x}<br>"
+                    f"{t('label.minutes')}: "+"%{customdata[0]:.1f}<br>"
+                    f"{t('label.total_minutes_funnel')}: "+"%{customdata[2]:.1f}<extra></extra>"
+                )
+            )
+            fig_pipe.update_layout(yaxis_title="", xaxis_title=t("label.calls"), legend_title="")
+            st.plotly_chart(fig_pipe, use_container_width=True)
 
     st.markdown("---")
     st.markdown("<div id='manager-productivity-timeline'></div>", unsafe_allow_html=True)
+    section("manager-productivity-timeline")
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.manager_timeline')}</h2>", unsafe_allow_html=True)
     daily = rpc_df("rpc_cso_manager_productivity_timeline", params)
     if daily.empty:
@@ -286,36 +297,38 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         daily["call_date"] = pd.to_datetime(daily["call_date"], errors="coerce").dt.date
         daily["total_minutes"] = pd.to_numeric(daily.get("total_minutes"), errors="coerce").fillna(0.0)
         market_color_map = {"CZ": "#1f77b4", "SK": "#d62728", "RUK": "#2ca02c", "Others": "#9467bd"}
-        fig = go.Figure()
-        for manager in sorted(daily["manager"].dropna().unique().tolist()):
-            sub = daily[daily["manager"] == manager].sort_values("call_date")
-            if sub.empty:
-                continue
-            market = str(sub["computed_market"].iloc[0])
-            fig.add_trace(
-                go.Scatter(
-                    x=sub["call_date"],
-                    y=sub["total_minutes"],
-                    mode="lines+markers",
-                    name=str(manager),
-                    marker={"size": 9},
-                    line={"color": market_color_map.get(market, "#9467bd")},
-                    customdata=sub[["computed_market", "intro_calls", "intro_flup", "sales_calls", "sales_flup"]].to_numpy(),
-                    hovertemplate=(
-                        f"{t('label.date')}: "+"%{x}<br>"
-                        f"{t('label.manager')}: "+"%{fullData.name} (%{customdata[0]})<br>"
-                        f"{t('cso.kpi.intro_calls')}: "+"%{customdata[1]}<br>"
-                        f"{t('cso.kpi.intro_flup')}: "+"%{customdata[2]}<br>"
-                        f"{t('cso.kpi.sales_calls')}: "+"%{customdata[3]}<br>"
-                        f"{t('cso.kpi.sales_flup')}: "+"%{customdata[4]}<extra></extra>"
-                    ),
+        with span("plotly manager-timeline"):
+            fig = go.Figure()
+            for manager in sorted(daily["manager"].dropna().unique().tolist()):
+                sub = daily[daily["manager"] == manager].sort_values("call_date")
+                if sub.empty:
+                    continue
+                market = str(sub["computed_market"].iloc[0])
+                fig.add_trace(
+                    go.Scatter(
+                        x=sub["call_date"],
+                        y=sub["total_minutes"],
+                        mode="lines+markers",
+                        name=str(manager),
+                        marker={"size": 9},
+                        line={"color": market_color_map.get(market, "#9467bd")},
+                        customdata=sub[["computed_market", "intro_calls", "intro_flup", "sales_calls", "sales_flup"]].to_numpy(),
+                        hovertemplate=(
+                            f"{t('label.date')}: "+"%{x}<br>"
+                            f"{t('label.manager')}: "+"%{fullData.name} (%{customdata[0]})<br>"
+                            f"{t('cso.kpi.intro_calls')}: "+"%{customdata[1]}<br>"
+                            f"{t('cso.kpi.intro_flup')}: "+"%{customdata[2]}<br>"
+                            f"{t('cso.kpi.sales_calls')}: "+"%{customdata[3]}<br>"
+                            f"{t('cso.kpi.sales_flup')}: "+"%{customdata[4]}<extra></extra>"
+                        ),
+                    )
                 )
-            )
-        fig.update_layout(template=_plotly_template(), yaxis_title=t("label.minutes"), xaxis_title=t("label.date"), legend_title=t("label.manager"))
-        st.plotly_chart(fig, use_container_width=True)
+            fig.update_layout(template=_plotly_template(), yaxis_title=t("label.minutes"), xaxis_title=t("label.date"), legend_title=t("label.manager"))
+            st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
     st.markdown("<div id='call-control'></div>", unsafe_allow_html=True)
+    section("call-control")
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.call_control')}</h2>", unsafe_allow_html=True)
     render_hint(t("cso.hint.call_control"))
     col_v1, col_v2 = st.columns([3, 2])
@@ -325,19 +338,20 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         if not df_control.empty:
             data_chart = df_control[df_control["outcome_category"].isin(["Defined", "Vague"])].copy()
             data_chart["outcome_display"] = data_chart["outcome_category"].map({"Defined": t("ceo.defined_next_step"), "Vague": t("ceo.vague")})
-            fig_vague = px.bar(
-                data_chart,
-                x="manager",
-                y="count",
-                color="outcome_display",
-                title=f"{t('ceo.defined_next_step')} vs {t('ceo.vague')}",
-                barmode="relative",
-                color_discrete_map={t("ceo.defined_next_step"): "#2ecc71", t("ceo.vague"): "#e74c3c"},
-                pattern_shape_sequence=[""],
-                hover_data=["total_calls"],
-            )
-            fig_vague.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title="")
-            st.plotly_chart(fig_vague, use_container_width=True)
+            with span("plotly outcome-mix"):
+                fig_vague = px.bar(
+                    data_chart,
+                    x="manager",
+                    y="count",
+                    color="outcome_display",
+                    title=f"{t('ceo.defined_next_step')} vs {t('ceo.vague')}",
+                    barmode="relative",
+                    color_discrete_map={t("ceo.defined_next_step"): "#2ecc71", t("ceo.vague"): "#e74c3c"},
+                    pattern_shape_sequence=[""],
+                    hover_data=["total_calls"],
+                )
+                fig_vague.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title="")
+                st.plotly_chart(fig_vague, use_container_width=True)
             st.caption(t("cso.caption.outcome_definitions"))
 
     with col_v2:
@@ -358,6 +372,7 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
 
     st.markdown("---")
     st.markdown("<div id='friction-and-resistance'></div>", unsafe_allow_html=True)
+    section("friction-and-resistance")
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.friction_resistance')}</h2>", unsafe_allow_html=True)
     render_hint(t("cso.hint.friction_resistance"))
 
@@ -370,18 +385,19 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         df_fric["type_display"] = df_fric["type"].map({"Intro Friction": t("cso.metric.avg_intro_friction"), "Sales Friction": t("cso.metric.avg_sales_friction")}).fillna(df_fric["type"].astype(str))
         col1, col2 = st.columns([2, 1])
         with col1:
-            fig_friction = px.bar(
-                df_fric,
-                x="funnel_display",
-                y="value",
-                color="type_display",
-                barmode="group",
-                title=t("cso.chart.friction_by_funnel"),
-                pattern_shape_sequence=[""],
-                hover_data=["total_calls"],
-            )
-            fig_friction.update_layout(yaxis_title=t("cso.chart.friction_by_funnel"), xaxis_title="")
-            st.plotly_chart(fig_friction, use_container_width=True)
+            with span("plotly manager-friction"):
+                fig_friction = px.bar(
+                    df_fric,
+                    x="funnel_display",
+                    y="value",
+                    color="type_display",
+                    barmode="group",
+                    title=t("cso.chart.friction_by_funnel"),
+                    pattern_shape_sequence=[""],
+                    hover_data=["total_calls"],
+                )
+                fig_friction.update_layout(yaxis_title=t("cso.chart.friction_by_funnel"), xaxis_title="")
+                st.plotly_chart(fig_friction, use_container_width=True)
 
         with col2:
             intro_calls_seg = int(kpi.get("intro_calls") or 0)
@@ -400,24 +416,26 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
             bubble_stats = bubble_stats.copy()
             bubble_stats["market_display"] = bubble_stats["computed_market"].apply(market_label)
             bubble_stats["funnel_display"] = bubble_stats["pipeline_name"].apply(pipeline_label)
-            fig_bubble = px.scatter(
-                bubble_stats,
-                x="defined_rate_pct",
-                y="friction_index",
-                size="total_calls",
-                color="market_display",
-                hover_name="manager",
-                template=_plotly_template(),
-                size_max=60,
-                labels={"defined_rate_pct": t("cso.table.defined_pct"), "friction_index": t("cso.chart.friction_by_funnel"), "total_calls": t("label.calls"), "market_display": t("label.market")},
-                hover_data=["funnel_display", "total_calls", "average_quality", "primaries", "followups", "defined_primaries"],
-            )
-            fig_bubble.add_vline(x=bubble_stats["defined_rate_pct"].mean(), line_dash="dot", annotation_text=t("cso.avg_defined"))
-            fig_bubble.add_hline(y=bubble_stats["friction_index"].mean(), line_dash="dot", annotation_text=t("cso.avg_friction"))
-            st.plotly_chart(fig_bubble, use_container_width=True)
+            with span("plotly friction-bubble"):
+                fig_bubble = px.scatter(
+                    bubble_stats,
+                    x="defined_rate_pct",
+                    y="friction_index",
+                    size="total_calls",
+                    color="market_display",
+                    hover_name="manager",
+                    template=_plotly_template(),
+                    size_max=60,
+                    labels={"defined_rate_pct": t("cso.table.defined_pct"), "friction_index": t("cso.chart.friction_by_funnel"), "total_calls": t("label.calls"), "market_display": t("label.market")},
+                    hover_data=["funnel_display", "total_calls", "average_quality", "primaries", "followups", "defined_primaries"],
+                )
+                fig_bubble.add_vline(x=bubble_stats["defined_rate_pct"].mean(), line_dash="dot", annotation_text=t("cso.avg_defined"))
+                fig_bubble.add_hline(y=bubble_stats["friction_index"].mean(), line_dash="dot", annotation_text=t("cso.avg_friction"))
+                st.plotly_chart(fig_bubble, use_container_width=True)
 
     st.markdown("---")
     st.markdown("<div id='discovery-depth-index'></div>", unsafe_allow_html=True)
+    section("discovery-depth-index")
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.discovery_depth')}</h2>", unsafe_allow_html=True)
     st.caption(t("cso.caption.discovery_depth"))
     df_dd = rpc_df("rpc_cso_discovery_depth", params)
@@ -431,31 +449,32 @@ def render_cso_dashboard(date_range, selected_markets, selected_pipelines, selec
         chart_rows.append({"manager": row["manager"], "Bucket": t("cso.bucket.with_objections"), "value": int(row["with_objections_calls"]), "market": row.get("market"), "avg_quality": row.get("avg_quality"), "no_objections_calls": int(row["no_objections_calls"]), "with_objections_calls": int(row["with_objections_calls"]), "total_calls": int(row["total_calls"])})
 
     chart_df = pd.DataFrame(chart_rows)
-    fig_dd = px.bar(
-        chart_df,
-        x="manager",
-        y="value",
-        color="Bucket",
-        template=_plotly_template(),
-        pattern_shape_sequence=[""],
-        barmode="relative",
-        labels={"value": t("label.share_pct")},
-        custom_data=["no_objections_calls", "with_objections_calls", "total_calls", "market", "avg_quality"],
-    )
-    fig_dd.update_traces(
-        hovertemplate=(
-            f"{t('label.manager')}: "+"%{x}<br>"
-            f"{t('label.segment')}: "+"%{fullData.name}<br>"
-            f"{t('label.share_pct')}: "+"%{y:.1f}<br>"
-            f"{t('cso.bucket.no_objections')}: "+"%{customdata[0]}<br>"
-            f"{t('cso.bucket.with_objections')}: "+"%{customdata[1]}<br>"
-            f"{t('cso.kpi.total_calls')}: "+"%{customdata[2]}<br>"
-            f"{t('label.market')}: "+"%{customdata[3]}<br>"
-            f"{t('label.avg_quality')}: "+"%{customdata[4]:.2f}<extra></extra>"
+    with span("plotly discovery-depth"):
+        fig_dd = px.bar(
+            chart_df,
+            x="manager",
+            y="value",
+            color="Bucket",
+            template=_plotly_template(),
+            pattern_shape_sequence=[""],
+            barmode="relative",
+            labels={"value": t("label.share_pct")},
+            custom_data=["no_objections_calls", "with_objections_calls", "total_calls", "market", "avg_quality"],
         )
-    )
-    fig_dd.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title="", legend_title="")
-    st.plotly_chart(fig_dd, use_container_width=True)
+        fig_dd.update_traces(
+            hovertemplate=(
+                f"{t('label.manager')}: "+"%{x}<br>"
+                f"{t('label.segment')}: "+"%{fullData.name}<br>"
+                f"{t('label.share_pct')}: "+"%{y:.1f}<br>"
+                f"{t('cso.bucket.no_objections')}: "+"%{customdata[0]}<br>"
+                f"{t('cso.bucket.with_objections')}: "+"%{customdata[1]}<br>"
+                f"{t('cso.kpi.total_calls')}: "+"%{customdata[2]}<br>"
+                f"{t('label.market')}: "+"%{customdata[3]}<br>"
+                f"{t('label.avg_quality')}: "+"%{customdata[4]:.2f}<extra></extra>"
+            )
+        )
+        fig_dd.update_layout(barnorm="percent", yaxis_title=t("label.share_pct"), xaxis_title="", legend_title="")
+        st.plotly_chart(fig_dd, use_container_width=True)
 
     st.markdown(f"<h2 style='text-align:center;'>{t('cso.section.no_objections_rating')}</h2>", unsafe_allow_html=True)
     lb = df_dd.copy()
@@ -0,0 +1,115 @@
+﻿import json
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from app_i18n import t
+from database import get_breaker_states, get_perf_calls, get_perf_summary, reset_perf_stats
+
+CACHE_COLORS = {"hit": "#4C78A8", "miss": "#F58518"}
+ERROR_COLOR = "#E45756"
+
+
+def _plotly_template():
+    return "plotly_dark" if st.session_state.get("ui_theme_v1", "dark") == "dark" else "plotly_white"
+
+
+def _render_waterfall(calls: list[dict]):
+    st.markdown(f"### {t('dev.waterfall')}")
+    if not calls:
+        st.info(t("dev.no_calls"))
+        return
+
+    df = pd.DataFrame(calls)
+    df["params"] = df["params"].apply(lambda p: json.dumps(p, ensure_ascii=False, default=str))
+    labels = [f"{i + 1}. {f}: {n}" for i, (f, n) in enumerate(zip(df["function"], df["name"]))]
+    colors = [ERROR_COLOR if e else CACHE_COLORS.get(c, "#999999") for c, e in zip(df["cache"], df["error"])]
+    fig = go.Figure(
+        go.Bar(
+            y=labels,
+            x=df["duration_ms"],
+            base=df["start_ms"],
+            orientation="h",
+            marker_color=colors,
+            customdata=df[["cache", "rows", "params"]].to_numpy(),
+            hovertemplate="%{y}<br>%{x:.1f} ms, %{customdata[0]}<br>rows: %{customdata[1]}<br>%{customdata[2]}<extra></extra>",
+        )
+    )
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(
+        template=_plotly_template(),
+        height=80 + 24 * len(df),
+        xaxis_title=t("dev.axis_ms"),
+        margin=dict(l=10, r=10, t=10, b=40),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        t(
+            "dev.waterfall_caption",
+            calls=len(df),
+            hits=int((df["cache"] == "hit").sum()),
+            ms=f"{df['duration_ms'].sum():.0f}",
+        )
+    )
+
+    table = df[["function", "name", "cache", "duration_ms", "rows", "bytes", "params"]].copy()
+    table.columns = [
+        t("dev.col.function"),
+        t("dev.col.name"),
+        t("dev.col.cache"),
+        t("dev.col.duration_ms"),
+        t("dev.col.rows"),
+        t("dev.col.bytes"),
+        t("dev.col.params"),
+    ]
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+
+def _render_aggregates(summary: pd.DataFrame):
+    st.markdown(f"### {t('dev.aggregates')}")
+    if summary.empty:
+        st.info(t("dev.no_stats"))
+        return
+
+    table = summary.copy()
+    table["hit_rate"] = (table["hit_rate"] * 100).round(1).astype(str) + "%"
+    table.columns = [
+        t("dev.col.function"),
+        t("dev.col.name"),
+        t("dev.col.calls"),
+        t("dev.col.hit_rate"),
+        t("dev.col.errors"),
+        t("dev.col.p50_ms"),
+        t("dev.col.p95_ms"),
+        t("dev.col.total_ms"),
+        t("dev.col.avg_rows"),
+        t("dev.col.avg_bytes"),
+    ]
+    st.dataframe(table.round(1), hide_index=True, use_container_width=True)
+    if st.button(t("dev.reset_stats")):
+        reset_perf_stats()
+        st.rerun()
+
+
+def _render_breakers(states: pd.DataFrame):
+    if states.empty:
+        return
+    st.markdown(f"### {t('dev.breakers')}")
+    table = states[["name", "state", "consecutive_failures", "retry_in_sec", "short_circuited", "last_error"]].copy()
+    table.columns = [
+        t("dev.col.name"),
+        t("dev.col.state"),
+        t("dev.col.failures"),
+        t("dev.col.retry_in_sec"),
+        t("dev.col.short_circuited"),
+        t("dev.col.last_error"),
+    ]
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+
+def render_dev_panel():
+    st.markdown("---")
+    st.markdown(f"<h2 style='text-align:center;'>{t('dev.title')}</h2>", unsafe_allow_html=True)
+    _render_waterfall(get_perf_calls())
+    _render_aggregates(get_perf_summary())
+    _render_breakers(get_breaker_states())
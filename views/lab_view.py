@@ -1,8 +1,10 @@
 ﻿import streamlit as st
 from database import fetch_view_data
+from tracing import traced
 from app_i18n import t
 
 
+@traced()
 def render_data_lab():
     st.title(t("lab.title"))
 